@@ -1,15 +1,55 @@
+import bisect
 import sqlite3
 import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 import pytz
-import hashlib
-import secrets
 import base64
+import binascii
+import numpy as np
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidTag
 import os
 import sys
 
+from services import passwords
+from services.search_index import MemoSearchIndex
+from services.face_gallery import (FaceGallery, decode_embeddings,
+                                   upgrade_embeddings)
+
+
+# 在数据库中排序分页的字段 -> (数据库列, 该列在备忘录行中的位置)
+# 标题是密文，按标题排序在解密后于内存中完成，见 get_memo_page
+MEMO_SORT_COLUMNS = {
+    "created_time": ("created_time", 2),
+    "modified_time": ("modified_time", 3),
+}
+
+# 不读取正文的摘要投影，列顺序与完整行一致，content 列为 NULL
+MEMO_SUMMARY_COLUMNS = ("id, user_id, created_time, modified_time, title, "
+                        "NULL AS content, category")
+
+
+# 旧格式（AES-CBC，"iv:密文" 文本）使用的密钥，AES 对象在所有加解密调用间复用
+# 新格式的用户密钥也由它派生；密钥写在源码中，加密只起混淆作用，见 load_user_key
+_AES_KEY = b"ThisIsA32ByteKeyForAES256Encrypt"
+_AES = algorithms.AES(_AES_KEY)
+
+# 备忘录存储格式：版本字节 + 12字节随机数 + AES-256-GCM 密文（含16字节认证标签）
+CIPHER_VERSION_AESGCM = 1
+_NONCE_SIZE = 12
+
+
+def title_sort_key(title):
+    """由明文标题生成排序键（只在内存中使用，不写入数据库）"""
+    return (title or "").strip().lower()
+
 
 def resource_path(relative_path):
     """获取资源的绝对路径，适用于开发环境和PyInstaller打包后的环境"""
@@ -23,22 +63,354 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+class MemoCache:
+    """已解密备忘录的LRU缓存
+
+    以 (memo_id, modified_time) 为键缓存解密后的标题和内容，
+    按明文字符数限制内存占用，超出上限时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, max_chars=32 * 1024 * 1024):
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._keys_by_id = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, memo_id, modified_time):
+        key = (memo_id, modified_time)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, memo_id, modified_time, title, content):
+        key = (memo_id, modified_time)
+        with self._lock:
+            # 同一备忘录只保留最新版本
+            self._discard(memo_id)
+            self._entries[key] = (title, content)
+            self._keys_by_id[memo_id] = key
+            self._size += self._entry_size(title, content)
+
+            while self._size > self.max_chars and len(self._entries) > 1:
+                (old_id, _), (old_title, old_content) = self._entries.popitem(
+                    last=False)
+                self._keys_by_id.pop(old_id, None)
+                self._size -= self._entry_size(old_title, old_content)
+
+    def invalidate(self, memo_id):
+        with self._lock:
+            self._discard(memo_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._size = 0
+
+    def _discard(self, memo_id):
+        key = self._keys_by_id.pop(memo_id, None)
+        if key is not None:
+            title, content = self._entries.pop(key)
+            self._size -= self._entry_size(title, content)
+
+    @staticmethod
+    def _entry_size(title, content):
+        return len(title or "") + len(content or "")
+
+
+class MemoTitleOrder:
+    """一个用户的备忘录按标题排序的 (标题排序键, id) 列表
+
+    标题是密文，首次按标题排序时解密一次构建，之后随备忘录的增删改同步更新，
+    翻页只需在有序列表中二分定位，不再重复解密。只保存在内存中。
+    """
+
+    def __init__(self):
+        self._keys = []  # 有序的 (标题排序键, id)
+        self._key_by_id = {}
+        self._lock = threading.Lock()
+
+    def reset(self, titles):
+        """由 [(memo_id, 标题), ...] 一次性重建列表"""
+        keys = sorted((title_sort_key(title), memo_id)
+                      for memo_id, title in titles)
+        with self._lock:
+            self._keys = keys
+            self._key_by_id = {key[1]: key for key in keys}
+
+    def add(self, memo_id, title):
+        """加入或更新备忘录的标题"""
+        key = (title_sort_key(title), memo_id)
+        with self._lock:
+            self._discard(memo_id)
+            bisect.insort(self._keys, key)
+            self._key_by_id[memo_id] = key
+
+    def remove(self, memo_id):
+        with self._lock:
+            self._discard(memo_id)
+
+    def page(self, descending=False, after=None, limit=50):
+        """返回 (备忘录ID列表, 下一页游标)，游标为上一页最后一项的 (标题排序键, id)"""
+        with self._lock:
+            if descending:
+                end = (len(self._keys) if after is None else
+                       bisect.bisect_left(self._keys, tuple(after)))
+                start = max(0, end - limit)
+                keys = self._keys[start:end][::-1]
+                more = start > 0
+            else:
+                start = (0 if after is None else
+                         bisect.bisect_right(self._keys, tuple(after)))
+                keys = self._keys[start:start + limit]
+                more = start + limit < len(self._keys)
+        return [memo_id for _, memo_id in keys], (keys[-1] if more else None)
+
+    def _discard(self, memo_id):
+        key = self._key_by_id.pop(memo_id, None)
+        if key is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+
+class ConnectionPool:
+    """进程级SQLite连接池
+
+    每个数据库文件只创建一个连接池：表结构只初始化一次，开启WAL模式，
+    读连接在线程间复用，所有写操作通过唯一的写连接串行执行。
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path, max_idle_readers=4):
+        self.db_path = db_path
+        self.max_idle_readers = max_idle_readers
+        self.schema_ready = False
+        self.memo_cache = MemoCache()
+        self.search_indexes = {}  # user_id -> MemoSearchIndex
+        self.title_orders = {}  # user_id -> MemoTitleOrder
+        self.search_lock = threading.Lock()
+        self.user_keys = {}  # user_id -> 用户数据密钥（AESGCM）
+        self.key_lock = threading.Lock()
+        self.face_gallery = None  # 已录入的人脸特征库，首次人脸登录时构建
+        self.face_lock = threading.Lock()
+
+        self._idle_readers = []
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode = WAL")
+
+    @classmethod
+    def get(cls, db_name):
+        """获取（必要时创建）指定数据库文件的连接池"""
+        db_path = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+        with cls._pools_lock:
+            pool = cls._pools.get(db_path)
+            if pool is None:
+                pool = cls(db_path)
+                cls._pools[db_path] = pool
+            return pool
+
+    @classmethod
+    def close_all(cls):
+        """关闭所有连接池（程序退出时调用）"""
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.close()
+            cls._pools.clear()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path,
+                               timeout=10,
+                               check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def ensure_schema(self, initializer):
+        """只在连接池首次使用时执行一次结构迁移"""
+        if self.schema_ready:
+            return
+        with self._write_lock:
+            if not self.schema_ready:
+                initializer()
+                self.schema_ready = True
+
+    @contextmanager
+    def reader(self):
+        """借出一个读连接，用完后归还以便复用"""
+        with self._readers_lock:
+            conn = self._idle_readers.pop() if self._idle_readers else None
+        if conn is None:
+            conn = self._connect()
+
+        try:
+            yield conn.cursor()
+        finally:
+            with self._readers_lock:
+                if len(self._idle_readers) < self.max_idle_readers:
+                    self._idle_readers.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    @contextmanager
+    def writer(self):
+        """获取唯一的写连接，退出时提交，出错时回滚"""
+        with self._write_lock:
+            cursor = self._writer.cursor()
+            try:
+                yield cursor
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def close(self):
+        """关闭连接池中的所有连接"""
+        with self._readers_lock:
+            for conn in self._idle_readers:
+                conn.close()
+            self._idle_readers.clear()
+        with self._write_lock:
+            self._writer.close()
+
+
 class DatabaseManager:
 
     def __init__(self, db_name="smart_memo.db"):
         """初始化数据库管理器"""
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
-
-        self.cursor.execute("PRAGMA foreign_keys = ON")
+        # 连接由进程级连接池统一管理，创建管理器不再重复连接和建表
+        self.pool = ConnectionPool.get(db_name)
 
         # 设置时区为本地时区
         self.local_tz = pytz.timezone("Asia/Shanghai")
 
-        self._initialize_database()
+        # 新密码哈希使用的迭代次数，低于该值的旧哈希在登录时重新计算
+        self.password_iterations = passwords.DEFAULT_ITERATIONS
+
+        self.pool.ensure_schema(self._migrate)
+
+    def _read(self):
+        return self.pool.reader()
+
+    @property
+    def memo_cache(self):
+        return self.pool.memo_cache
+
+    def get_search_index(self, user_id):
+        """获取用户的全文检索索引，首次使用时由解密后的备忘录构建"""
+        with self.pool.search_lock:
+            index = self.pool.search_indexes.get(user_id)
+            if index is None:
+                index = MemoSearchIndex()
+                memos = self.get_memos(user_id=user_id)
+                for memo, (title, content) in zip(memos,
+                                                  self.decrypt_memos(memos)):
+                    index.add(memo[0], title, content, memo[6])
+                self.pool.search_indexes[user_id] = index
+            return index
+
+    def get_title_order(self, user_id):
+        """获取用户备忘录的标题顺序，首次使用时解密所有标题构建"""
+        with self.pool.search_lock:
+            order = self.pool.title_orders.get(user_id)
+            if order is None:
+                order = MemoTitleOrder()
+                with self._read() as cursor:
+                    cursor.execute(
+                        f"SELECT {MEMO_SUMMARY_COLUMNS} FROM memos "
+                        "WHERE user_id = ?", (user_id, ))
+                    rows = cursor.fetchall()
+                order.reset(
+                    (row[0], title)
+                    for row, (title, _) in zip(rows, self.decrypt_memos(rows)))
+                self.pool.title_orders[user_id] = order
+            return order
+
+    def get_face_gallery(self):
+        """获取人脸特征库，首次使用时解码所有用户的人脸数据"""
+        with self.pool.face_lock:
+            if self.pool.face_gallery is None:
+                gallery = FaceGallery()
+                for user in self.get_users_with_face_data():
+                    self._add_face_to_gallery(gallery, user["id"],
+                                              user["username"],
+                                              user["face_data"])
+                self.pool.face_gallery = gallery
+            return self.pool.face_gallery
+
+    @staticmethod
+    def _add_face_to_gallery(gallery, user_id, username, face_data):
+        try:
+            gallery.set_user(user_id, username, decode_embeddings(face_data))
+        except (TypeError, ValueError) as e:
+            print(f"处理用户 {username} 的人脸特征时出错: {e}")
+
+    def _reindex_memo(self, memo_id):
+        """备忘录内容变化后同步更新已构建的检索索引和标题顺序"""
+        if not self.pool.search_indexes and not self.pool.title_orders:
+            return
+        memo = self.get_memo_by_id(memo_id)
+        if memo is None:
+            return
+        index = self.pool.search_indexes.get(memo["user_id"])
+        if index is not None:
+            index.add(memo_id, memo["title"], memo["content"],
+                      memo["category"])
+        order = self.pool.title_orders.get(memo["user_id"])
+        if order is not None:
+            order.add(memo_id, memo["title"])
+
+    def _unindex_memo(self, memo_id):
+        for index in list(self.pool.search_indexes.values()):
+            index.remove(memo_id)
+        for order in list(self.pool.title_orders.values()):
+            order.remove(memo_id)
+
+    def _write(self):
+        return self.pool.writer()
+
+    def _migrations(self):
+        """按版本号排列的结构迁移，新的迁移追加到末尾"""
+        return [
+            (1, self._migrate_v1),
+            (2, self._migrate_v2),
+            (3, self._migrate_v3),
+        ]
+
+    def _migrate(self):
+        """执行尚未应用的结构迁移
 
-    def _initialize_database(self):
-        """创建必要的表和触发器"""
+        当前版本记录在 PRAGMA user_version 中。每个迁移在单独的事务中执行，
+        并在同一事务中更新版本号；数据库已是最新版本时不执行任何DDL。
+        """
+        migrations = self._migrations()
+        with self._read() as cursor:
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+        if version >= migrations[-1][0]:
+            return
+
+        for target, migration in migrations:
+            if target <= version:
+                continue
+            with self._write() as cursor:
+                cursor.execute("BEGIN IMMEDIATE")
+                # 其他进程可能已经完成了该迁移
+                cursor.execute("PRAGMA user_version")
+                if cursor.fetchone()[0] >= target:
+                    continue
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {target}")
+            print(f"数据库结构已升级到版本 {target}")
+
+    def _migrate_v1(self, cursor):
+        """创建必要的表、触发器和索引（兼容未记录版本号的旧数据库）"""
         # 创建用户表
         create_user_table = """
         CREATE TABLE IF NOT EXISTS users (
@@ -102,13 +474,54 @@ class DatabaseManager:
         );
         """
 
-        self.cursor.execute(create_user_table)
-        self.cursor.execute(create_memo_table)
-        self.cursor.execute(create_trigger)
-        self.cursor.execute(create_todo_table)
-        self.cursor.execute(create_tag_table)
-
-        self.conn.commit()
+        cursor.execute(create_user_table)
+        cursor.execute(create_memo_table)
+        cursor.execute(create_trigger)
+        cursor.execute(create_todo_table)
+        cursor.execute(create_tag_table)
+
+        self._create_indexes(cursor)
+
+    def _migrate_v2(self, cursor):
+        """备忘录改用按用户派生密钥的 AES-GCM 格式，旧数据在读取时逐步迁移"""
+        cursor.execute("ALTER TABLE users ADD COLUMN key_salt BLOB")
+        # 修改时间改由 update_memo 显式更新，重新加密旧数据时不改变修改时间
+        cursor.execute("DROP TRIGGER IF EXISTS update_memo_time")
+
+    def _migrate_v3(self, cursor):
+        """人脸特征由 JSON 文本改为带版本头的二进制格式"""
+        cursor.execute("SELECT id, face_data FROM users "
+                       "WHERE typeof(face_data) = 'text'")
+        for user_id, face_data in cursor.fetchall():
+            try:
+                face_data = upgrade_embeddings(face_data)
+            except (KeyError, TypeError, ValueError):
+                continue  # 无法解析的旧数据保持原样
+            cursor.execute("UPDATE users SET face_data = ? WHERE id = ?",
+                           (face_data, user_id))
+
+    def _create_indexes(self, cursor):
+        """为按用户查询的常用路径建立索引（v1 迁移的一部分）
+
+        各索引对应的查询见 tests/test_query_plans.py。
+        迁移执行后不能再修改：这里的语句要逐字写出，不依赖运行时常量，
+        新增或调整索引放到新的迁移中。
+        """
+        # 备忘录分页按 (排序字段, id) 定位，同时用于按用户统计和列出备忘录
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_memos_user_created_time "
+                       "ON memos (user_id, created_time, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_memos_user_modified_time "
+                       "ON memos (user_id, modified_time, id)")
+
+        # 待办列表的排序顺序：置顶 > 未完成 > 截止日期 > 创建时间
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_todos_user_order
+            ON todos (user_id, is_pinned DESC, is_done, deadline, created_time)
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_todos_user_category "
+                       "ON todos (user_id, category)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tags_user_created "
+                       "ON tags (user_id, created_time)")
 
     def create_user(
             self,
@@ -129,22 +542,22 @@ class DatabaseManager:
 
             register_time = datetime.now(
                 self.local_tz).strftime("%Y-%m-%d %H:%M:%S")
-            self.cursor.execute(
-                """
-                INSERT INTO users 
-                (username, password, face_data, avatar, register_time)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (
-                    username,
-                    hashed_pwd,
-                    encoded_face_data,
-                    avatar,
-                    register_time,
-                ),
-            )
+            with self._write() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO users 
+                    (username, password, face_data, avatar, register_time)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    (
+                        username,
+                        hashed_pwd,
+                        encoded_face_data,
+                        avatar,
+                        register_time,
+                    ),
+                )
 
-            self.conn.commit()
             print(f"用户 {username} 创建成功")
             return True
         except sqlite3.IntegrityError:
@@ -156,42 +569,91 @@ class DatabaseManager:
 
     def create_memo(self, user_id, title, content, category):
         """创建备忘录"""
-        encrypted_title = self.encrypt(title)
-        encrypted_content = self.encrypt(content)
-
-        self.cursor.execute(
-            """
-            INSERT INTO memos 
-            (user_id, title, content, category)
-            VALUES (?, ?, ?, ?)
-        """,
-            (user_id, encrypted_title, encrypted_content, category),
-        )
-        self.conn.commit()
+        encrypted_title = self.encrypt_for_user(user_id, title)
+        encrypted_content = self.encrypt_for_user(user_id, content)
+
+        with self._write() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO memos 
+                (user_id, title, content, category)
+                VALUES (?, ?, ?, ?)
+            """,
+                (user_id, encrypted_title, encrypted_content, category),
+            )
+            memo_id = cursor.lastrowid
+        self.memo_cache.invalidate(memo_id)
+        index = self.pool.search_indexes.get(user_id)
+        if index is not None:
+            index.add(memo_id, title, content, category)
+        order = self.pool.title_orders.get(user_id)
+        if order is not None:
+            order.add(memo_id, title)
         print("备忘录创建成功")
-        return self.cursor.lastrowid
+        return memo_id
+
+    def create_memos_bulk(self,
+                          user_id,
+                          memos,
+                          progress_callback=None,
+                          batch_size=500,
+                          replace=False):
+        """批量创建备忘录，所有记录在同一个事务中写入
+
+        memos 为 (title, content, category) 元组列表，
+        progress_callback(已完成数量, 总数) 在每批写入后调用。
+        replace 为 True 时先在同一事务中删除用户原有的备忘录。
+        返回创建的备忘录数量，出错时整体回滚（原有备忘录保持不变）。
+        """
+        memos = list(memos)
+        total = len(memos)
+        if not total and not replace:
+            return 0
+
+        # 先派生密钥，避免在持有写锁时等待密钥锁
+        self.load_user_key(user_id)
+        with self._write() as cursor:
+            if replace:
+                cursor.execute("DELETE FROM memos WHERE user_id = ?",
+                               (user_id, ))
+            for start in range(0, total, batch_size):
+                batch = memos[start:start + batch_size]
+                encrypted = self.encrypt_many_for_user(
+                    user_id, (text for title, content, _ in batch
+                              for text in (title, content)))
+                rows = [(user_id, encrypted[2 * i], encrypted[2 * i + 1],
+                         category) for i, (_, _, category) in enumerate(batch)]
+                cursor.executemany(
+                    """
+                    INSERT INTO memos 
+                    (user_id, title, content, category)
+                    VALUES (?, ?, ?, ?)
+                """, rows)
+                if progress_callback:
+                    progress_callback(start + len(rows), total)
+
+        if replace:
+            self.memo_cache.clear()
+        # 检索索引和标题顺序在下次使用时重新构建
+        self.pool.search_indexes.pop(user_id, None)
+        self.pool.title_orders.pop(user_id, None)
+        print(f"批量创建备忘录成功，共 {total} 条")
+        return total
 
     def get_memo_by_id(self, memo_id):
         """
         根据备忘录ID获取完整的备忘录信息
         """
         try:
-            self.cursor.execute("SELECT * FROM memos WHERE id = ?",
-                                (memo_id, ))
-            memo = self.cursor.fetchone()
+            with self._read() as cursor:
+                cursor.execute("SELECT * FROM memos WHERE id = ?",
+                               (memo_id, ))
+                memo = cursor.fetchone()
 
             if not memo:
                 return None
 
-            return {
-                "id": memo[0],
-                "user_id": memo[1],
-                "created_time": memo[2],
-                "modified_time": memo[3],
-                "title": self.decrypt(memo[4]),
-                "content": self.decrypt(memo[5]),
-                "category": memo[6],
-            }
+            return self._memo_row_to_dict(memo)
         except Exception as e:
             print(f"获取备忘录数据时出错: {str(e)}")
             return None
@@ -199,9 +661,12 @@ class DatabaseManager:
     def delete_memos_by_user(self, user_id):
         """删除用户的所有备忘录"""
         try:
-            self.cursor.execute("DELETE FROM memos WHERE user_id = ?",
-                                (user_id, ))
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute("DELETE FROM memos WHERE user_id = ?",
+                               (user_id, ))
+            self.memo_cache.clear()
+            self.pool.search_indexes.pop(user_id, None)
+            self.pool.title_orders.pop(user_id, None)
             return True
         except sqlite3.Error as e:
             print(f"删除备忘录失败: {e}")
@@ -210,9 +675,11 @@ class DatabaseManager:
     def delete_memo(self, memo_id):
         """删除指定ID的备忘录"""
         try:
-            self.cursor.execute("DELETE FROM memos WHERE id = ?", (memo_id, ))
-            self.conn.commit()
-            deleted_rows = self.cursor.rowcount
+            with self._write() as cursor:
+                cursor.execute("DELETE FROM memos WHERE id = ?", (memo_id, ))
+                deleted_rows = cursor.rowcount
+            self.memo_cache.invalidate(memo_id)
+            self._unindex_memo(memo_id)
             return deleted_rows > 0
         except sqlite3.Error as e:
             print(f"删除备忘录失败: {e}")
@@ -221,49 +688,106 @@ class DatabaseManager:
     def add_todo(self, user_id, task, deadline, category="未分类"):
         """添加待办事项（带分类）"""
         try:
-            self.cursor.execute(
-                """INSERT INTO todos 
-                (user_id, task, deadline, category) 
-                VALUES (?, ?, ?, ?)""",
-                (user_id, task, deadline, category),
-            )
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute(
+                    """INSERT INTO todos 
+                    (user_id, task, deadline, category) 
+                    VALUES (?, ?, ?, ?)""",
+                    (user_id, task, deadline, category),
+                )
+                todo_id = cursor.lastrowid
             print("待办创建成功")
-            return self.cursor.lastrowid
+            return todo_id
         except sqlite3.Error as e:
             print(f"添加待办失败: {e}")
             return None
 
+    def add_todos_bulk(self, user_id, todos, progress_callback=None,
+                       batch_size=500):
+        """批量添加待办事项，所有记录在同一个事务中写入
+
+        todos 为 (task, deadline, category) 元组列表，
+        progress_callback(已完成数量, 总数) 每处理 batch_size 条调用一次。
+        每条记录使用单独的保存点，写入失败的记录（如缺少截止日期）被跳过，
+        不影响其他记录。返回 (添加数量, 跳过数量)。
+        """
+        todos = list(todos)
+        total = len(todos)
+        if not total:
+            return 0, 0
+
+        added = skipped = 0
+        try:
+            with self._write() as cursor:
+                # 保存点需要在外层事务中使用，否则 RELEASE 会直接提交
+                if not cursor.connection.in_transaction:
+                    cursor.execute("BEGIN")
+                for done, (task, deadline, category) in enumerate(todos, 1):
+                    cursor.execute("SAVEPOINT todo_row")
+                    try:
+                        cursor.execute(
+                            """INSERT INTO todos 
+                            (user_id, task, deadline, category) 
+                            VALUES (?, ?, ?, ?)""",
+                            (user_id, task, deadline, category),
+                        )
+                        added += 1
+                    except sqlite3.Error as e:
+                        cursor.execute("ROLLBACK TO todo_row")
+                        skipped += 1
+                        print(f"跳过无效的待办 {task!r}: {e}")
+                    cursor.execute("RELEASE todo_row")
+                    if progress_callback and (done % batch_size == 0
+                                              or done == total):
+                        progress_callback(done, total)
+            print(f"批量创建待办成功，共 {added} 条，跳过 {skipped} 条")
+            return added, skipped
+        except sqlite3.Error as e:
+            print(f"批量添加待办失败: {e}")
+            return 0, total
+
     def update_todo_pin_status(self, todo_id, is_pinned):
         """更新待办置顶状态"""
         try:
-            self.cursor.execute(
-                "UPDATE todos SET is_pinned = ? WHERE id = ?",
-                (1 if is_pinned else 0, todo_id),
-            )
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with self._write() as cursor:
+                cursor.execute(
+                    "UPDATE todos SET is_pinned = ? WHERE id = ?",
+                    (1 if is_pinned else 0, todo_id),
+                )
+                return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"更新待办置顶状态失败: {e}")
             return False
 
+    def is_todo_pinned(self, todo_id):
+        """检查待办是否已置顶"""
+        try:
+            with self._read() as cursor:
+                cursor.execute("SELECT is_pinned FROM todos WHERE id = ?",
+                               (todo_id, ))
+                result = cursor.fetchone()
+            return bool(result[0]) if result else False
+        except sqlite3.Error as e:
+            print(f"检查待办置顶状态失败: {e}")
+            return False
+
     def update_todo_status(self, todo_id, is_done):
         """更新待办完成状态"""
         try:
-            if is_done:
-                # 标记为已完成，记录完成时间
-                self.cursor.execute(
-                    "UPDATE todos SET is_done = 1, completed_time = datetime('now', 'localtime') WHERE id = ?",
-                    (todo_id, ),
-                )
-            else:
-                # 标记为未完成，清除完成时间
-                self.cursor.execute(
-                    "UPDATE todos SET is_done = 0, completed_time = NULL WHERE id = ?",
-                    (todo_id, ),
-                )
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with self._write() as cursor:
+                if is_done:
+                    # 标记为已完成，记录完成时间
+                    cursor.execute(
+                        "UPDATE todos SET is_done = 1, completed_time = datetime('now', 'localtime') WHERE id = ?",
+                        (todo_id, ),
+                    )
+                else:
+                    # 标记为未完成，清除完成时间
+                    cursor.execute(
+                        "UPDATE todos SET is_done = 0, completed_time = NULL WHERE id = ?",
+                        (todo_id, ),
+                    )
+                return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"更新待办状态失败: {e}")
             return False
@@ -285,8 +809,9 @@ class DatabaseManager:
             # 排序优先级：置顶 > 未完成 > 截止日期
             query += " ORDER BY is_pinned DESC, is_done ASC, deadline ASC, created_time ASC"
 
-            self.cursor.execute(query, tuple(params))
-            return self.cursor.fetchall()
+            with self._read() as cursor:
+                cursor.execute(query, tuple(params))
+                return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"获取待办失败: {e}")
             return []
@@ -294,9 +819,9 @@ class DatabaseManager:
     def delete_todo(self, todo_id):
         """删除待办事项"""
         try:
-            self.cursor.execute("DELETE FROM todos WHERE id = ?", (todo_id, ))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with self._write() as cursor:
+                cursor.execute("DELETE FROM todos WHERE id = ?", (todo_id, ))
+                return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"删除待办失败: {e}")
             return False
@@ -304,19 +829,21 @@ class DatabaseManager:
     def get_todo_categories(self, user_id):
         """获取用户的所有待办分类"""
         try:
-            self.cursor.execute(
-                "SELECT DISTINCT category FROM todos WHERE user_id = ?",
-                (user_id, ))
-            return [row[0] for row in self.cursor.fetchall()]
+            with self._read() as cursor:
+                cursor.execute(
+                    "SELECT DISTINCT category FROM todos WHERE user_id = ?",
+                    (user_id, ))
+                return [row[0] for row in cursor.fetchall()]
         except sqlite3.Error as e:
             print(f"获取分类失败: {e}")
             return []
 
     def get_certain_user(self, username):
         """获取特定用户信息"""
-        self.cursor.execute("SELECT * FROM users WHERE username = ?",
-                            (username, ))
-        user_data = self.cursor.fetchone()
+        with self._read() as cursor:
+            cursor.execute("SELECT * FROM users WHERE username = ?",
+                           (username, ))
+            user_data = cursor.fetchone()
         user_dict = {
             "id": user_data[0],
             "username": user_data[1],
@@ -327,10 +854,11 @@ class DatabaseManager:
 
     def get_users_with_face_data(self):
         """获取所有具有人脸识别数据的用户"""
-        self.cursor.execute(
-            "SELECT id, username, face_data, register_time FROM users WHERE face_data IS NOT NULL"
-        )
-        users = self.cursor.fetchall()
+        with self._read() as cursor:
+            cursor.execute(
+                "SELECT id, username, face_data, register_time FROM users WHERE face_data IS NOT NULL"
+            )
+            users = cursor.fetchall()
 
         # 将元组列表转换为字典列表
         result = []
@@ -347,20 +875,23 @@ class DatabaseManager:
 
     def get_memo_count(self, user_id):
         """获取用户的备忘录数量"""
-        self.cursor.execute("SELECT COUNT(*) FROM memos WHERE user_id = ?",
-                            (user_id, ))
-        return self.cursor.fetchone()[0]
+        with self._read() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM memos WHERE user_id = ?",
+                           (user_id, ))
+            return cursor.fetchone()[0]
 
     def get_todo_count(self, user_id):
-        self.cursor.execute("SELECT COUNT(*) FROM todos WHERE user_id = ?",
-                            (user_id, ))
-        return self.cursor.fetchone()[0]
+        with self._read() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM todos WHERE user_id = ?",
+                           (user_id, ))
+            return cursor.fetchone()[0]
 
     def check_password(self, username, password):
         """检查密码是否正确"""
-        self.cursor.execute("SELECT password FROM users WHERE username = ?",
-                            (username, ))
-        result = self.cursor.fetchone()
+        with self._read() as cursor:
+            cursor.execute("SELECT password FROM users WHERE username = ?",
+                           (username, ))
+            result = cursor.fetchone()
 
         if not result:
             return False
@@ -370,40 +901,31 @@ class DatabaseManager:
 
     def verify_password(self, password, stored_password):
         """验证密码是否与存储的哈希匹配"""
-        import hashlib
-        import base64
-
-        # 从存储的字符串中分离盐和哈希
-        try:
-            salt_b64, hash_b64 = stored_password.split(":")
-            salt = base64.b64decode(salt_b64)
-            stored_hash = base64.b64decode(hash_b64)
-        except (ValueError, base64.Error):
-            return False
-
-        # 使用相同参数重新计算哈希
-        hash_obj = hashlib.pbkdf2_hmac("sha256",
-                                       password.encode("utf-8"),
-                                       salt,
-                                       100000,
-                                       dklen=64)
-
-        import hmac
-
-        return hmac.compare_digest(hash_obj, stored_hash)
+        return passwords.verify_password(password, stored_password)
 
     def update_memo(self, memo_id, title=None, content=None, category=None):
         """更新备忘录内容"""
         update_parts = []
         values = []
 
+        if title is not None or content is not None:
+            # 标题和内容使用备忘录所属用户的密钥加密
+            with self._read() as cursor:
+                cursor.execute("SELECT user_id FROM memos WHERE id = ?",
+                               (memo_id, ))
+                row = cursor.fetchone()
+            if row is None:
+                print(f"备忘录 ID {memo_id} 不存在或未更改")
+                return False
+            user_id = row[0]
+
         if title is not None:
-            encrypted_title = self.encrypt(title)
+            encrypted_title = self.encrypt_for_user(user_id, title)
             update_parts.append("title = ?")
             values.append(encrypted_title)
 
         if content is not None:
-            encrypted_content = self.encrypt(content)
+            encrypted_content = self.encrypt_for_user(user_id, content)
             update_parts.append("content = ?")
             values.append(encrypted_content)
 
@@ -415,13 +937,17 @@ class DatabaseManager:
             print("没有提供要更新的内容")
             return False
 
+        update_parts.append("modified_time = datetime('now', 'localtime')")
         query = f"UPDATE memos SET {', '.join(update_parts)} WHERE id = ?"
         values.append(memo_id)
 
-        self.cursor.execute(query, values)
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute(query, values)
+            updated_rows = cursor.rowcount
+        self.memo_cache.invalidate(memo_id)
 
-        if self.cursor.rowcount > 0:
+        if updated_rows > 0:
+            self._reindex_memo(memo_id)
             print(f"备忘录 ID {memo_id} 更新成功")
             return True
         else:
@@ -431,8 +957,11 @@ class DatabaseManager:
     def update_user(self, user_id, **kwargs):
         """更新用户信息"""
         # 首先检查用户是否存在
-        self.cursor.execute("SELECT id FROM users WHERE id = ?", (user_id, ))
-        if not self.cursor.fetchone():
+        with self._read() as cursor:
+            cursor.execute("SELECT username FROM users WHERE id = ?",
+                           (user_id, ))
+            user = cursor.fetchone()
+        if user is None:
             print(f"用户ID {user_id} 不存在")
             return False
 
@@ -461,8 +990,9 @@ class DatabaseManager:
         if "password" in update_fields:
             update_fields["password"] = self.hash(update_fields["password"])
 
-        if "face_data" in update_fields and update_fields[
-                "face_data"] is not None:
+        # 二进制人脸特征直接保存
+        if "face_data" in update_fields and isinstance(
+                update_fields["face_data"], str):
             if update_fields["face_data"].startswith(
                     "{") or update_fields["face_data"].startswith("["):
                 pass
@@ -479,13 +1009,16 @@ class DatabaseManager:
         values.append(user_id)  # 添加WHERE子句的参数
 
         try:
-            self.cursor.execute(query, values)
-            self.conn.commit()
+            with self._write() as cursor:
+                cursor.execute(query, values)
+
+                cursor.execute("SELECT id FROM users WHERE id = ?",
+                               (user_id, ))
+                user_found = cursor.fetchone() is not None
 
-            self.cursor.execute("SELECT id FROM users WHERE id = ?",
-                                (user_id, ))
-            if self.cursor.fetchone():
+            if user_found:
                 print(f"用户ID {user_id} 更新成功")
+                self._refresh_face_gallery(user_id, user[0], update_fields)
                 return True
             else:
                 print(f"更新后无法找到用户ID {user_id}")
@@ -494,39 +1027,145 @@ class DatabaseManager:
             print(f"更新用户时出错: {e}")
             return False
 
+    def _refresh_face_gallery(self, user_id, username, update_fields):
+        """用户信息变化后同步更新已构建的人脸特征库"""
+        gallery = self.pool.face_gallery
+        if gallery is None:
+            return
+        username = update_fields.get("username", username)
+        if "face_data" not in update_fields:
+            gallery.rename_user(user_id, username)
+        elif update_fields["face_data"] is None:
+            gallery.remove_user(user_id)
+        else:
+            self._add_face_to_gallery(gallery, user_id, username,
+                                      update_fields["face_data"])
+
     def get_memos(self, user_id=None):
         """获取备忘录列表，可选按用户ID过滤"""
-        if user_id:
-            self.cursor.execute("SELECT * FROM memos WHERE user_id = ?",
-                                (user_id, ))
-        else:
-            self.cursor.execute("SELECT * FROM memos")
+        with self._read() as cursor:
+            if user_id:
+                cursor.execute("SELECT * FROM memos WHERE user_id = ?",
+                               (user_id, ))
+            else:
+                cursor.execute("SELECT * FROM memos")
 
-        memos = self.cursor.fetchall()
+            memos = cursor.fetchall()
         return memos
 
+    def get_memo_page(self,
+                      user_id,
+                      sort="modified_time",
+                      descending=True,
+                      after=None,
+                      limit=50,
+                      summary=True):
+        """按页获取用户的备忘录（键集分页）
+
+        sort 可选 created_time、modified_time、title。时间排序在数据库中完成；
+        标题是密文，按标题排序时读取用户全部摘要行，解密标题后在内存中排序，
+        数据库中不保存任何明文标题信息。
+        after 为上一页返回的游标，summary 为 True 时不读取正文（content 为 None）。
+        返回 (备忘录行列表, 下一页游标)，没有更多数据时游标为 None。
+        """
+        if sort == "title":
+            return self._get_memo_page_by_title(user_id, descending, after,
+                                                limit, summary)
+        if sort not in MEMO_SORT_COLUMNS:
+            raise ValueError(f"不支持的排序字段: {sort}")
+        column, sort_index = MEMO_SORT_COLUMNS[sort]
+
+        columns = MEMO_SUMMARY_COLUMNS if summary else "*"
+        order = "DESC" if descending else "ASC"
+        query = f"SELECT {columns} FROM memos WHERE user_id = ?"
+        params = [user_id]
+        if after is not None:
+            # 从上一页最后一行之后继续，(排序值, id) 保证顺序唯一
+            query += f" AND ({column}, id) {'<' if descending else '>'} (?, ?)"
+            params.extend(after)
+        query += f" ORDER BY {column} {order}, id {order} LIMIT ?"
+        params.append(limit)
+
+        with self._read() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        if len(rows) < limit:
+            return rows, None
+        last = rows[-1]
+        return rows, (last[sort_index], last[0])
+
+    def _get_memo_page_by_title(self, user_id, descending, after, limit,
+                                summary):
+        """按解密后的标题排序分页，游标为 (标题排序键, id)，只保存在内存中"""
+        memo_ids, cursor = self.get_title_order(user_id).page(
+            descending, after, limit)
+        return self.get_memos_by_ids(memo_ids, summary), cursor
+
+    def get_memo_content(self, memo):
+        """获取备忘录行的正文，摘要行（不含正文）按需从数据库读取"""
+        content = self.decrypt_memo(memo)[1]
+        if content is not None:
+            return content
+
+        with self._read() as cursor:
+            cursor.execute("SELECT * FROM memos WHERE id = ?", (memo[0], ))
+            row = cursor.fetchone()
+        return self.decrypt_memo(row)[1] if row else ""
+
+    def search_memos(self, user_id, query, limit=None):
+        """全文检索用户的备忘录（标题、内容、分类），按相关度排序返回数据库行"""
+        return self.get_memos_by_ids(
+            self.get_search_index(user_id).search(query, limit))
+
+    def get_memos_by_ids(self, memo_ids, summary=False):
+        """按给定顺序返回备忘录数据库行，不存在的ID会被跳过
+
+        summary 为 True 时返回不含正文的摘要行。
+        """
+        if not memo_ids:
+            return []
+
+        columns = MEMO_SUMMARY_COLUMNS if summary else "*"
+        rows = {}
+        with self._read() as cursor:
+            # 分批查询，避免超过SQLite的参数数量上限
+            for start in range(0, len(memo_ids), 500):
+                batch = memo_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                cursor.execute(
+                    f"SELECT {columns} FROM memos WHERE id IN ({placeholders})",
+                    batch)
+                rows.update((row[0], row) for row in cursor.fetchall())
+
+        return [rows[memo_id] for memo_id in memo_ids if memo_id in rows]
+
+    def get_memo_versions(self, user_id):
+        """返回用户所有备忘录的 {memo_id: 修改时间}，只读索引不读正文"""
+        with self._read() as cursor:
+            cursor.execute(
+                "SELECT id, modified_time FROM memos WHERE user_id = ?",
+                (user_id, ))
+            return dict(cursor.fetchall())
+
     def get_recent_memos(self, user_id, limit=10):
         """获取用户最近的备忘录"""
         try:
-            self.cursor.execute(
-                """
-                SELECT id, user_id, created_time, modified_time, title, content, category 
-                FROM memos 
-                WHERE user_id = ?
-                ORDER BY modified_time DESC
-                LIMIT ?
-                """, (user_id, limit))
-            memos = self.cursor.fetchall()
-
-            return [{
-                'id': memo[0],
-                'user_id': memo[1],
-                'created_time': memo[2],
-                'modified_time': memo[3],
-                'title': self.decrypt(memo[4]),
-                'content': self.decrypt(memo[5]),
-                'category': memo[6]
-            } for memo in memos]
+            with self._read() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, user_id, created_time, modified_time, title, content, category 
+                    FROM memos 
+                    WHERE user_id = ?
+                    ORDER BY modified_time DESC
+                    LIMIT ?
+                    """, (user_id, limit))
+                memos = cursor.fetchall()
+
+            return [
+                self._memo_row_to_dict(memo, decrypted) for memo, decrypted in
+                zip(memos, self.decrypt_memos(memos))
+            ]
 
         except Exception as e:
             print(f"获取用户最近备忘录失败: {str(e)}")
@@ -535,13 +1174,14 @@ class DatabaseManager:
     def get_user_tags(self, user_id):
         """获取用户的所有标签"""
         try:
-            self.cursor.execute(
-                """SELECT id, tag_name, created_time 
-                FROM tags 
-                WHERE user_id = ? 
-                ORDER BY created_time DESC""", (user_id, ))
-
-            tags = self.cursor.fetchall()
+            with self._read() as cursor:
+                cursor.execute(
+                    """SELECT id, tag_name, created_time 
+                    FROM tags 
+                    WHERE user_id = ? 
+                    ORDER BY created_time DESC""", (user_id, ))
+
+                tags = cursor.fetchall()
             result = []
 
             for tag in tags:
@@ -567,22 +1207,22 @@ class DatabaseManager:
                 print("标签名称不能为空")
                 return False, None
 
-            # 检查标签是否已存在
-            self.cursor.execute(
-                "SELECT id FROM tags WHERE user_id = ? AND tag_name = ?",
-                (user_id, tag_name))
+            with self._write() as cursor:
+                # 检查标签是否已存在
+                cursor.execute(
+                    "SELECT id FROM tags WHERE user_id = ? AND tag_name = ?",
+                    (user_id, tag_name))
 
-            existing_tag = self.cursor.fetchone()
-            if existing_tag:
-                print(f"标签 '{tag_name}' 已存在")
-                return True, existing_tag[0]
+                existing_tag = cursor.fetchone()
+                if existing_tag:
+                    print(f"标签 '{tag_name}' 已存在")
+                    return True, existing_tag[0]
 
-            self.cursor.execute(
-                "INSERT INTO tags (user_id, tag_name) VALUES (?, ?)",
-                (user_id, tag_name))
+                cursor.execute(
+                    "INSERT INTO tags (user_id, tag_name) VALUES (?, ?)",
+                    (user_id, tag_name))
 
-            self.conn.commit()
-            new_tag_id = self.cursor.lastrowid
+                new_tag_id = cursor.lastrowid
             print(f"标签 '{tag_name}' 创建成功")
             return True, new_tag_id
 
@@ -592,11 +1232,12 @@ class DatabaseManager:
 
     def account_login(self, username, password):
         """用户登录，返回用户信息字典或None"""
-        self.cursor.execute(
-            "SELECT id, username, password, avatar, register_time FROM users WHERE username = ?",
-            (username, ),
-        )
-        user_data = self.cursor.fetchone()
+        with self._read() as cursor:
+            cursor.execute(
+                "SELECT id, username, password, avatar, register_time FROM users WHERE username = ?",
+                (username, ),
+            )
+            user_data = cursor.fetchone()
 
         if not user_data:
             print(f"用户 {username} 不存在")
@@ -606,6 +1247,14 @@ class DatabaseManager:
         stored_password = user_data[2]
         if self.verify_password(password, stored_password):
             print(f"用户 {username} 登录成功")
+            # 旧格式或迭代次数偏低的哈希按当前参数重新计算
+            if passwords.needs_rehash(stored_password,
+                                      self.password_iterations):
+                with self._write() as cursor:
+                    cursor.execute(
+                        "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                        (self.hash(password), user_data[0], stored_password),
+                    )
             # 转换为字典格式，便于使用和理解
             user_dict = {
                 "id": user_data[0],
@@ -619,37 +1268,109 @@ class DatabaseManager:
             return None
 
     def hash(self, text):
-        # 生成一个随机盐值
-        salt = secrets.token_bytes(32)
+        """计算密码哈希（"pbkdf2$迭代次数$盐$哈希" 格式）"""
+        return passwords.hash_password(text, self.password_iterations)
+
+    def load_user_key(self, user_id):
+        """获取用户的数据密钥
 
-        hash_obj = hashlib.pbkdf2_hmac(
-            "sha256",
-            text.encode("utf-8"),
-            salt,
-            100000,
-            dklen=64,
-        )
+        密钥由源码中固定的 _AES_KEY 和用户的随机盐（保存在同一数据库中）经 HKDF 派生，
+        首次使用时计算一次并缓存在内存中。
+
+        注意：这只是混淆，不是静态数据保护。拿到数据库文件和本程序源码的人可以
+        派生出每个用户的密钥并解密全部备忘录。按用户派生只是隔离各用户的密文
+        （一个用户的密文不能在另一个用户下解密），并借助 GCM 发现被篡改的数据。
+        人脸登录没有可用于派生密钥的秘密，因此没有改用由密码派生的密钥。
+        """
+        cipher = self.pool.user_keys.get(user_id)
+        if cipher is not None:
+            return cipher
+
+        with self.pool.key_lock:
+            cipher = self.pool.user_keys.get(user_id)
+            if cipher is not None:
+                return cipher
+
+            with self._write() as cursor:
+                # 旧用户没有密钥盐，首次使用时生成
+                cursor.execute(
+                    "UPDATE users SET key_salt = ? WHERE id = ? AND key_salt IS NULL",
+                    (os.urandom(16), user_id),
+                )
+                cursor.execute("SELECT key_salt FROM users WHERE id = ?",
+                               (user_id, ))
+                row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"用户ID {user_id} 不存在")
+
+            key = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=row[0],
+                info=f"smart-memo:memo:{user_id}".encode("utf-8"),
+            ).derive(_AES_KEY)
+            cipher = AESGCM(key)
+            self.pool.user_keys[user_id] = cipher
+            return cipher
+
+    def encrypt_for_user(self, user_id, text):
+        """使用用户密钥加密文本，返回新格式的二进制密文"""
+        if text is None:
+            return None
 
-        salt_b64 = base64.b64encode(salt).decode("utf-8")
-        hash_b64 = base64.b64encode(hash_obj).decode("utf-8")
+        nonce = os.urandom(_NONCE_SIZE)
+        cipher = self.load_user_key(user_id)
+        return (bytes([CIPHER_VERSION_AESGCM]) + nonce +
+                cipher.encrypt(nonce, text.encode("utf-8"), None))
+
+    def encrypt_many_for_user(self, user_id, texts):
+        """批量使用用户密钥加密文本"""
+        texts = list(texts)
+        cipher = self.load_user_key(user_id)
+        nonces = os.urandom(_NONCE_SIZE * len(texts))
+        version = bytes([CIPHER_VERSION_AESGCM])
+        results = []
+        for i, text in enumerate(texts):
+            if text is None:
+                results.append(None)
+                continue
+            nonce = nonces[i * _NONCE_SIZE:(i + 1) * _NONCE_SIZE]
+            results.append(version + nonce +
+                           cipher.encrypt(nonce, text.encode("utf-8"), None))
+        return results
+
+    def decrypt_for_user(self, user_id, value):
+        """解密备忘录字段，新格式用用户密钥校验解密，旧格式文本交给 decrypt"""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return self.decrypt(value)
 
-        return f"{salt_b64}:{hash_b64}"
+        value = bytes(value)
+        if not value or value[0] != CIPHER_VERSION_AESGCM:
+            print("解密错误: 不支持的密文版本")
+            return ""
+        try:
+            nonce = value[1:1 + _NONCE_SIZE]
+            plaintext = self.load_user_key(user_id).decrypt(
+                nonce, value[1 + _NONCE_SIZE:], None)
+            return plaintext.decode("utf-8")
+        except (InvalidTag, UnicodeDecodeError):
+            print("解密错误: 数据校验失败")
+            return ""
 
     def encrypt(self, text):
-        """使用AES-256-CBC模式加密文本"""
+        """使用AES-256-CBC模式加密文本（旧格式，备忘录请使用 encrypt_for_user）"""
         if text is None:
             return None
 
-        plaintext = text.encode("utf-8")
-
         # 生成随机16字节IV
-        iv = os.urandom(16)
+        return self._encrypt_with_iv(text, os.urandom(16))
 
-        key = b"ThisIsA32ByteKeyForAES256Encrypt"
+    def _encrypt_with_iv(self, text, iv):
+        plaintext = text.encode("utf-8")
 
-        cipher = Cipher(algorithms.AES(key),
-                        modes.CBC(iv),
-                        backend=default_backend())
+        cipher = Cipher(_AES, modes.CBC(iv), backend=default_backend())
         encryptor = cipher.encryptor()
 
         # PKCS7填充
@@ -660,11 +1381,22 @@ class DatabaseManager:
 
         ciphertext = encryptor.update(padded_data) + encryptor.finalize()
 
-        iv_b64 = base64.b64encode(iv).decode("utf-8")
-        ciphertext_b64 = base64.b64encode(ciphertext).decode("utf-8")
+        iv_b64 = binascii.b2a_base64(iv, newline=False).decode("ascii")
+        ciphertext_b64 = binascii.b2a_base64(ciphertext,
+                                             newline=False).decode("ascii")
 
         return f"{iv_b64}:{ciphertext_b64}"
 
+    def encrypt_many(self, texts):
+        """批量加密文本，结果与逐条调用 encrypt 的格式相同"""
+        texts = list(texts)
+        # 一次生成所有IV
+        ivs = os.urandom(16 * len(texts))
+        return [
+            None if text is None else self._encrypt_with_iv(
+                text, ivs[i * 16:i * 16 + 16]) for i, text in enumerate(texts)
+        ]
+
     def decrypt(self, encrypted_text):
         """解密AES-256-CBC加密的文本"""
         if encrypted_text is None:
@@ -679,11 +1411,7 @@ class DatabaseManager:
             iv = base64.b64decode(iv_b64)
             ciphertext = base64.b64decode(ciphertext_b64)
 
-            key = b"ThisIsA32ByteKeyForAES256Encrypt"
-
-            cipher = Cipher(algorithms.AES(key),
-                            modes.CBC(iv),
-                            backend=default_backend())
+            cipher = Cipher(_AES, modes.CBC(iv), backend=default_backend())
             decryptor = cipher.decryptor()
 
             # 解密
@@ -698,6 +1426,164 @@ class DatabaseManager:
             print(f"解密错误: {e}")
             return encrypted_text  # 返回原始文本作为降级处理
 
+    def decrypt_many(self, encrypted_texts):
+        """批量解密，结果与逐条调用 decrypt 相同
+
+        CBC 解密的每个明文块等于该密文块经AES解密后与前一个密文块（首块为IV）异或，
+        因此把所有密文拼接后只做一次AES解密，再整体异或，
+        省去逐条创建解密器的开销。无法按常规格式解析的密文仍逐条调用 decrypt。
+        """
+        encrypted_texts = list(encrypted_texts)
+        results = [None] * len(encrypted_texts)
+
+        pending = []  # (位置, 密文)
+        blocks = []
+        chains = []  # 每条密文对应的前一块：IV + 除最后一块外的密文
+        for i, encrypted_text in enumerate(encrypted_texts):
+            if encrypted_text is None:
+                continue
+            try:
+                iv_b64, ciphertext_b64 = encrypted_text.split(":")
+                iv = binascii.a2b_base64(iv_b64)
+                ciphertext = binascii.a2b_base64(ciphertext_b64)
+            except (ValueError, binascii.Error):
+                results[i] = self.decrypt(encrypted_text)
+                continue
+            if len(iv) != 16 or not ciphertext or len(ciphertext) % 16:
+                results[i] = self.decrypt(encrypted_text)
+                continue
+
+            pending.append((i, len(ciphertext)))
+            blocks.append(ciphertext)
+            chains.append(iv)
+            chains.append(ciphertext[:-16])
+
+        if not pending:
+            return results
+
+        decryptor = Cipher(_AES, modes.ECB(),
+                           backend=default_backend()).decryptor()
+        decrypted = decryptor.update(b"".join(blocks)) + decryptor.finalize()
+        padded_all = np.bitwise_xor(
+            np.frombuffer(decrypted, dtype=np.uint8),
+            np.frombuffer(b"".join(chains), dtype=np.uint8),
+        ).tobytes()
+
+        offset = 0
+        for i, length in pending:
+            padded_data = padded_all[offset:offset + length]
+            offset += length
+            padding_length = padded_data[-1]
+            try:
+                results[i] = padded_data[:-padding_length].decode("utf-8")
+            except UnicodeDecodeError:
+                results[i] = self.decrypt(encrypted_texts[i])
+        return results
+
+    def decrypt_memo(self, memo):
+        """解密备忘录行的标题和内容，优先使用缓存
+
+        memo 为 (id, user_id, created_time, modified_time, title, content, ...)
+        形式的数据库行，返回 (title, content)；摘要行的 content 为 None。
+        """
+        memo_id, modified_time = memo[0], memo[3]
+        cached = self.memo_cache.get(memo_id, modified_time)
+        if cached is not None:
+            return cached
+
+        title = self.decrypt_for_user(memo[1], memo[4])
+        if memo[5] is None:
+            # 摘要行不含正文，只解密标题，不写入缓存
+            return title, None
+        content = self.decrypt_for_user(memo[1], memo[5])
+        self.memo_cache.put(memo_id, modified_time, title, content)
+        self._upgrade_legacy_memos([(memo, title, content)])
+        return title, content
+
+    def decrypt_memos(self, memos):
+        """批量解密备忘录行，返回 [(title, content), ...]，未命中缓存的行一次性解密"""
+        results = [None] * len(memos)
+        missing = []
+        for i, memo in enumerate(memos):
+            cached = self.memo_cache.get(memo[0], memo[3])
+            if cached is not None:
+                results[i] = cached
+            elif memo[5] is None:
+                results[i] = (self.decrypt_for_user(memo[1], memo[4]), None)
+            else:
+                missing.append(i)
+
+        if missing:
+            values = []
+            for i in missing:
+                values.append(memos[i][4])
+                values.append(memos[i][5])
+
+            # 旧格式的密文一次性批量解密，新格式逐条校验解密
+            plaintexts = [None] * len(values)
+            legacy = [k for k, value in enumerate(values) if isinstance(value, str)]
+            for k, text in zip(legacy,
+                               self.decrypt_many(values[k] for k in legacy)):
+                plaintexts[k] = text
+            for k, value in enumerate(values):
+                if value is not None and not isinstance(value, str):
+                    user_id = memos[missing[k // 2]][1]
+                    plaintexts[k] = self.decrypt_for_user(user_id, value)
+
+            upgrades = []
+            for n, i in enumerate(missing):
+                title, content = plaintexts[2 * n], plaintexts[2 * n + 1]
+                self.memo_cache.put(memos[i][0], memos[i][3], title, content)
+                results[i] = (title, content)
+                upgrades.append((memos[i], title, content))
+            self._upgrade_legacy_memos(upgrades)
+        return results
+
+    def _upgrade_legacy_memos(self, entries):
+        """把旧格式的备忘录重新加密为新格式
+
+        entries 为 [(备忘录行, 标题明文, 内容明文), ...]，只处理仍为旧格式的行；
+        更新时比较原密文，避免覆盖期间被修改的备忘录。
+        """
+        updates = []
+        for memo, title, content in entries:
+            old_title, old_content = memo[4], memo[5]
+            if not isinstance(old_title, str) and not isinstance(
+                    old_content, str):
+                continue
+            # 旧格式解密失败时返回原文，这类数据保持原样
+            if title == old_title or content == old_content:
+                continue
+            updates.append((
+                self.encrypt_for_user(memo[1], title),
+                self.encrypt_for_user(memo[1], content),
+                memo[0],
+                old_title,
+                old_content,
+            ))
+        if not updates:
+            return
+
+        try:
+            with self._write() as cursor:
+                cursor.executemany(
+                    """UPDATE memos SET title = ?, content = ?
+                    WHERE id = ? AND title = ? AND content = ?""", updates)
+        except sqlite3.Error as e:
+            print(f"更新备忘录加密格式失败: {e}")
+
+    def _memo_row_to_dict(self, memo, decrypted=None):
+        title, content = decrypted or self.decrypt_memo(memo)
+        return {
+            "id": memo[0],
+            "user_id": memo[1],
+            "created_time": memo[2],
+            "modified_time": memo[3],
+            "title": title,
+            "content": content,
+            "category": memo[6],
+        }
+
     def format_datetime(self, datetime_str):
         """格式化日期时间为易读格式"""
         if datetime_str:
@@ -711,30 +1597,28 @@ class DatabaseManager:
     def get_all_memos_by_user(self, user_id):
         """获取用户的所有备忘录"""
         try:
-            self.cursor.execute(
-                """
-                SELECT id, user_id, created_time, modified_time, title, content, category 
-                FROM memos 
-                WHERE user_id = ?
-                ORDER BY modified_time DESC
-                """, (user_id, ))
-            memos = self.cursor.fetchall()
-
-            return [{
-                'id': memo[0],
-                'user_id': memo[1],
-                'created_time': memo[2],
-                'modified_time': memo[3],
-                'title': self.decrypt(memo[4]),
-                'content': self.decrypt(memo[5]),
-                'category': memo[6]
-            } for memo in memos]
+            with self._read() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, user_id, created_time, modified_time, title, content, category 
+                    FROM memos 
+                    WHERE user_id = ?
+                    ORDER BY modified_time DESC
+                    """, (user_id, ))
+                memos = cursor.fetchall()
+
+            return [
+                self._memo_row_to_dict(memo, decrypted) for memo, decrypted in
+                zip(memos, self.decrypt_memos(memos))
+            ]
 
         except Exception as e:
             print(f"获取用户备忘录失败: {str(e)}")
             return []
 
     def close(self):
-        """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
+        """释放数据库管理器
+
+        连接由连接池统一管理并在进程内复用，这里不再真正关闭连接，
+        保留该方法以兼容现有调用。
+        """
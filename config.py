@@ -59,6 +59,41 @@ class MyConfig(QConfig):
         "",
         restart=False
     )
+    # 密码哈希的 PBKDF2 迭代次数，调高后旧哈希会在用户下次登录时重新计算
+    passwordIterations = RangeConfigItem(
+        "Security", "PasswordIterations", 600000, validator=RangeValidator(100000, 5000000), restart=False
+    )
+    # 登录窗口显示时在后台预加载人脸识别模型（仅在模型已下载时）
+    faceModelWarmup = ConfigItem(
+        "Face", "ModelWarmup", True, validator=BoolValidator(), restart=False
+    )
+    # 人脸检测后端：haar 级联分类器，yunet 为 OpenCV DNN 模型（更准确，稍慢）
+    faceDetector = OptionsConfigItem(
+        "Face", "Detector", "haar", OptionsValidator(["haar", "yunet"]), restart=False
+    )
+    # 人脸录入时每次前向计算的图像数
+    faceEmbeddingBatchSize = RangeConfigItem(
+        "Face", "EmbeddingBatchSize", 8, validator=RangeValidator(1, 32), restart=False
+    )
+    # 人脸录入时额外保存的模板：none 只保存原始特征，mean 平均特征，medoid 中心样本
+    # 保存模板后人脸登录只与模板比对
+    faceTemplate = OptionsConfigItem(
+        "Face", "Template", "none", OptionsValidator(["none", "mean", "medoid"]), restart=False
+    )
+    # 缓存润色、待办提取等模式的 AI 响应，相同请求直接返回上次结果（只保存在内存中）
+    aiCacheEnabled = ConfigItem(
+        "AI", "CacheEnabled", True, validator=BoolValidator(), restart=False
+    )
+    aiCacheTtlHours = RangeConfigItem(
+        "AI", "CacheTtlHours", 168, validator=RangeValidator(1, 720), restart=False
+    )
+    aiCacheSizeMb = RangeConfigItem(
+        "AI", "CacheSizeMb", 32, validator=RangeValidator(1, 512), restart=False
+    )
+    # 同时进行的 AI 请求数上限
+    aiMaxConcurrency = RangeConfigItem(
+        "AI", "MaxConcurrency", 3, validator=RangeValidator(1, 8), restart=True
+    )
 
 
 cfg = MyConfig()
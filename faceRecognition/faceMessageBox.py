@@ -3,13 +3,11 @@ import numpy as np
 import os
 import sys
 import time
-import json
-import urllib.request
 from config import cfg
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel
 from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QThread, QMutex, QWaitCondition
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QThread, QMutex
 
 from qfluentwidgets import (
     MessageBoxBase,
@@ -25,6 +23,10 @@ from qfluentwidgets import (
 )
 
 from Database import DatabaseManager
+from services.face_embedder import get_face_embedder, build_template
+from services.face_gallery import encode_embeddings
+from faceRecognition.detection import FaceDetectionStage, create_face_detector
+from faceRecognition.pipeline import FramePipeline, QualityStage, CollectStage
 
 
 def resource_path(relative_path):
@@ -83,9 +85,10 @@ class CameraThread(QThread):
                 self.mutex.unlock()
                 break
 
+            # read() 每次返回新的数组，帧发出后不再被修改，无需复制
             ret, frame = self.cap.read()
             if ret:
-                self.frameReady.emit(frame.copy())
+                self.frameReady.emit(frame)
 
             self.mutex.unlock()
             self.msleep(20)
@@ -98,143 +101,58 @@ class CameraThread(QThread):
         self.mutex.unlock()
 
 
-class FaceProcessThread(QThread):
-    """人脸处理线程 - 负责检测和处理人脸"""
+class FaceProcessThread(FramePipeline):
+    """人脸处理线程 - 检测 → 质量 → 采集"""
 
     faceDetected = pyqtSignal(np.ndarray, tuple)
     faceProcessed = pyqtSignal(int, int)
     processingComplete = pyqtSignal()
-    faceQualityFeedback = pyqtSignal(tuple, bool)
 
-    def __init__(self, cascade_path, threshold, required_faces, user_id,
-                 username):
+    def __init__(self, threshold, required_faces, user_id, username):
         super().__init__()
-        self.cascade_path = cascade_path
-
-        try:
-            cascade_file = resource_path(cascade_path)
-            self.face_cascade = cv2.CascadeClassifier(cascade_file)
-
-            if self.face_cascade.empty():
-                # 尝试使用OpenCV内置路径
-                print(f"使用路径 {cascade_file} 加载级联分类器失败，尝试内置路径...")
-                cv2_path = os.path.join(os.path.dirname(cv2.__file__), "data")
-                backup_path = os.path.join(
-                    cv2_path, "haarcascade_frontalface_default.xml")
-                self.face_cascade = cv2.CascadeClassifier(backup_path)
-
-                if self.face_cascade.empty():
-                    print(f"内置路径 {backup_path} 加载失败，尝试打包后路径...")
-                    # 尝试打包后的标准位置
-                    pkg_path = resource_path(
-                        "cv2/data/haarcascade_frontalface_default.xml")
-                    self.face_cascade = cv2.CascadeClassifier(pkg_path)
-                    print(
-                        f"打包路径 {pkg_path} 加载状态: {'成功' if not self.face_cascade.empty() else '失败'}"
-                    )
-        except Exception as e:
-            print(f"加载级联分类器出错: {str(e)}")
-            self.face_cascade = None
-
         self.threshold = threshold
         self.required_faces = required_faces
         self.user_id = user_id
         self.username = username
-        self.face_images = []
-        self.frame = None
-        self.new_frame_available = False
-        self.running = False
-        self.face_count = 0
-        self.mutex = QMutex()
-        self.condition = QWaitCondition()
+        self.collector = CollectStage(required_faces)
+        detector = create_face_detector(cfg.get(cfg.faceDetector))
+        self.stages = [
+            FaceDetectionStage(detector),
+            QualityStage(threshold),
+            self.collector,
+        ]
+
+    @property
+    def face_images(self):
+        return self.collector.face_images
+
+    @property
+    def face_count(self):
+        return len(self.collector.face_images)
 
     def process_frame(self, frame):
         """接收新帧进行处理"""
-        self.mutex.lock()
-        self.frame = frame.copy()
-        self.new_frame_available = True
-        self.condition.wakeOne()
-        self.mutex.unlock()
+        self.submit(frame)
 
     def start_processing(self):
         """启动处理"""
-        self.mutex.lock()
-        self.face_count = 0
-        self.running = True
-        self.mutex.unlock()
-
-        if not self.isRunning():
-            self.start()
+        self.start_pipeline()
 
     def stop_processing(self):
         """停止处理"""
-        self.mutex.lock()
-        self.running = False
-        self.condition.wakeOne()
-        self.mutex.unlock()
-        self.wait()
-
-    def run(self):
-        """线程主循环"""
-        while True:
-            self.mutex.lock()
-
-            if not self.running:
-                self.mutex.unlock()
-                break
-
-            if not self.new_frame_available:
-                self.condition.wait(self.mutex)
-                if not self.running:
-                    self.mutex.unlock()
-                    break
-
-            # 获取当前帧进行处理
-            current_frame = self.frame.copy()
-            self.new_frame_available = False
-            current_count = self.face_count
-            self.mutex.unlock()
-
-            gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(gray,
-                                                       scaleFactor=1.1,
-                                                       minNeighbors=5,
-                                                       minSize=(30, 30))
+        self.stop_pipeline()
 
-            # 处理检测到的人脸
-            for x, y, w, h in faces:
-                face_area = w * h
-
-                is_good_quality = face_area > self.threshold
-                self.faceQualityFeedback.emit((x, y, w, h), is_good_quality)
-
-                if is_good_quality and current_count < self.required_faces:
-                    self.mutex.lock()
-                    if self.face_count >= self.required_faces:
-                        self.mutex.unlock()
-                        continue
-
-                    # 提取人脸
-                    face_img = current_frame[y:y + h, x:x + w]
-
-                    self.face_images.append(face_img.copy())
-
-                    self.face_count += 1
-                    current_count = self.face_count
-
-                    self.faceDetected.emit(face_img, (x, y, w, h))
-
-                    self.faceProcessed.emit(current_count, self.required_faces)
-
-                    self.mutex.unlock()
+    def handle_result(self, context):
+        if not context.collected:
+            return
 
-                    self.msleep(500)
-                    break
+        self.faceDetected.emit(context.face_image, context.box)
+        self.faceProcessed.emit(self.face_count, self.required_faces)
 
-            # 检查是否完成所需数量
-            if current_count >= self.required_faces:
-                self.processingComplete.emit()
-                break
+        # 检查是否完成所需数量
+        if self.face_count >= self.required_faces:
+            self.processingComplete.emit()
+            self.stop_processing()
 
 
 class FaceRegistrationMessageBox(MessageBoxBase):
@@ -245,9 +163,6 @@ class FaceRegistrationMessageBox(MessageBoxBase):
         self.user_id = user_id
         self.username = username
 
-        self.face_cascade_path = resource_path(
-            "cv2/data/haarcascade_frontalface_default.xml")
-
         # 面部捕获相关变量
         self.required_faces = 5
         self.face_quality_threshold = 2500
@@ -256,7 +171,6 @@ class FaceRegistrationMessageBox(MessageBoxBase):
         self.camera_thread.frameReady.connect(self.update_frame)
 
         self.face_thread = FaceProcessThread(
-            self.face_cascade_path,
             self.face_quality_threshold,
             self.required_faces,
             self.user_id,
@@ -266,6 +180,7 @@ class FaceRegistrationMessageBox(MessageBoxBase):
         self.face_thread.faceProcessed.connect(self.on_face_processed)
         self.face_thread.processingComplete.connect(self.finish_registration)
         self.face_thread.faceQualityFeedback.connect(self.on_face_quality)
+        self.face_thread.processingError.connect(self.on_processing_error)
 
         self.display_frame = None
         self.faces_feedback = []
@@ -433,7 +348,8 @@ class FaceRegistrationMessageBox(MessageBoxBase):
 
     def update_frame(self, frame):
         """接收摄像头帧并更新显示缓存"""
-        self.display_frame = frame.copy()
+        # 绘制时会先复制，这里直接保存引用
+        self.display_frame = frame
         self.face_thread.process_frame(frame)
 
     def on_face_detected(self, face_img, coords):
@@ -444,6 +360,19 @@ class FaceRegistrationMessageBox(MessageBoxBase):
         self.progress_bar.setValue(current_count)
         self.progress_label.setText(f"人脸捕获进度: {current_count}/{total_count}")
 
+    def on_processing_error(self, error):
+        """人脸处理连续出错时停止采集并提示"""
+        self.stop_capture()
+        InfoBar.error(
+            title="人脸采集出错",
+            content=f"处理摄像头画面时出错: {error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=5000,
+            parent=self,
+        )
+
     def on_face_quality(self, coords, is_good_quality):
         """更新人脸质量反馈"""
         x, y, w, h = coords
@@ -592,46 +521,21 @@ class FeatureExtractionThread(QThread):
     def run(self):
         """线程主函数"""
         try:
-            model_file = resource_path(
-                "faceRecognition/models/openface_nn4.small2.v1.t7")
-
-            if not os.path.exists(model_file):
-                model_dir = os.path.dirname(model_file)
-                if not os.path.exists(model_dir):
-                    os.makedirs(model_dir)
-                url = "https://github.com/pyannote/pyannote-data/raw/master/openface.nn4.small2.v1.t7"
-                urllib.request.urlretrieve(url, model_file)
-
-            face_net = cv2.dnn.readNetFromTorch(model_file)
-
-            face_features = []
-
-            for image in self.face_images:
-                if not self.running:
-                    return
-
-                # 检查图像有效性
-                if image is None or image.size == 0:
-                    continue
-
-                blob = cv2.dnn.blobFromImage(image,
-                                             1.0 / 255, (96, 96), (0, 0, 0),
-                                             swapRB=True,
-                                             crop=False)
-
-                face_net.setInput(blob)
-                feature_vector = face_net.forward()
-
-                # 添加到特征列表
-                face_features.append(feature_vector.flatten().tolist())
+            # 所有人脸按批次合并，一次前向计算得到一批特征
+            face_features = get_face_embedder().embed(
+                self.face_images, cfg.get(cfg.faceEmbeddingBatchSize))
+            if not len(face_features):
+                self.extractionFailed.emit("没有可用的人脸图像")
+                return
 
-            face_data_json = json.dumps(face_features)
+            template = build_template(face_features, cfg.get(cfg.faceTemplate))
+            face_data = encode_embeddings(face_features, template)
 
             if not self.running:
                 return
 
             db = DatabaseManager()
-            db.update_user(self.user_id, face_data=face_data_json)
+            db.update_user(self.user_id, face_data=face_data)
             db.close()
 
             self.face_images = []
@@ -0,0 +1,245 @@
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class FrameSlot:
+    """只保存最新一帧的单槽缓冲区
+
+    摄像头线程放入帧时直接覆盖旧帧（不复制）并唤醒处理线程，
+    处理线程在条件变量上等待新帧，不轮询；处理速度跟不上时自动丢弃中间帧。
+    """
+
+    def __init__(self):
+        self._frame = None
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def put(self, frame):
+        with self._condition:
+            self._frame = frame
+            self._condition.notify()
+
+    def take(self, timeout=None):
+        """等待并取走最新一帧，超时或缓冲区关闭时返回 None"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frame is not None or self._closed, timeout)
+            frame, self._frame = self._frame, None
+        return None if self._closed else frame
+
+    def pause(self, seconds):
+        """等待指定时间，期间到达的帧仍会覆盖旧帧；缓冲区关闭时提前返回"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed, seconds)
+
+    def open(self):
+        with self._condition:
+            self._frame = None
+            self._closed = False
+
+    def close(self):
+        """关闭缓冲区，唤醒所有等待的线程"""
+        with self._condition:
+            self._frame = None
+            self._closed = True
+            self._condition.notify_all()
+
+
+class FrameContext:
+    """一帧在各处理阶段之间传递的数据"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.faces = []  # 检测到的人脸框 [(x, y, w, h), ...]
+        self.feedback = []  # 人脸质量反馈 [((x, y, w, h), 是否合格), ...]
+        self.box = None  # 选中的人脸框
+        self.face_image = None  # 选中的人脸图像
+        self.embedding = None
+        self.match = None  # (用户ID, 用户名, 距离)
+        self.collected = False  # 人脸录入时本帧的人脸是否已被采集
+        self.cooldown = 0.0  # 处理完本帧后暂停的秒数
+
+
+class QualityStage:
+    """人脸质量阶段：面积超过阈值的人脸才继续处理，选取其中最大的一张"""
+
+    name = "quality"
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def process(self, context):
+        for box in context.faces:
+            context.feedback.append((box, box[2] * box[3] > self.threshold))
+
+        good = [box for box, is_good in context.feedback if is_good]
+        if not good:
+            return False
+
+        x, y, w, h = context.box = max(good, key=lambda b: b[2] * b[3])
+        context.face_image = context.frame[y:y + h, x:x + w]
+        return True
+
+
+class EmbedStage:
+    """特征提取阶段"""
+
+    name = "embed"
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+    def process(self, context):
+        context.embedding = self.embedder.embed_one(context.face_image)
+        return context.embedding is not None
+
+
+class MatchStage:
+    """人脸比对阶段：在人脸库中查找最接近的用户，距离低于阈值才算匹配"""
+
+    name = "match"
+
+    def __init__(self, gallery, threshold):
+        self.gallery = gallery
+        self.threshold = threshold
+
+    def process(self, context):
+        if self.gallery is None:
+            return False
+        match = self.gallery.match(context.embedding)
+        if match is None or match[2] >= self.threshold:
+            return False
+        context.match = match
+        return True
+
+
+class CollectStage:
+    """人脸采集阶段：保存合格的人脸图像，直到达到所需数量
+
+    每采集一张后暂停 interval 秒，让用户有时间调整角度，样本更多样。
+    """
+
+    name = "collect"
+
+    def __init__(self, required, interval=0.5):
+        self.required = required
+        self.interval = interval
+        self.face_images = []
+
+    def reset(self):
+        self.face_images = []
+
+    def process(self, context):
+        if len(self.face_images) >= self.required:
+            return False
+        # 复制人脸区域，避免保留整帧图像
+        self.face_images.append(context.face_image.copy())
+        context.collected = True
+        context.cooldown = self.interval
+        return True
+
+
+class FramePipeline(QThread):
+    """人脸帧处理流水线（生产者/消费者）
+
+    摄像头线程通过 submit 提交帧，处理线程按顺序执行各阶段
+    （检测 → 质量 → 特征提取 → 比对，或人脸录入时的采集），
+    任一阶段返回 False 时结束本帧。阶段对象需要提供 name 和 process(context)，
+    可选提供 reset() 和 delay()（距离下次可处理还需等待的秒数）。
+    每个阶段的耗时会被统计，平均值见 timing_report()。
+
+    处理某一帧时出现异常（如模型下载或加载失败、异常帧导致的 OpenCV 错误）只跳过该帧；
+    连续 max_failures 帧出错时停止处理并发出 processingError。
+    """
+
+    faceQualityFeedback = pyqtSignal(tuple, bool)
+    processingError = pyqtSignal(str)
+
+    def __init__(self, stages=None, max_failures=3):
+        super().__init__()
+        self.stages = stages or []
+        self.max_failures = max_failures
+        self.slot = FrameSlot()
+        self.stage_timings = {}  # 阶段名 -> (处理帧数, 总耗时秒)
+        self._resume_time = 0.0
+        self._worker_ident = None
+
+    def submit(self, frame):
+        self.slot.put(frame)
+
+    def start_pipeline(self):
+        self.slot.open()
+        self.stage_timings = {}
+        self._resume_time = 0.0
+        for stage in self.stages:
+            if hasattr(stage, "reset"):
+                stage.reset()
+
+        if not self.isRunning():
+            self.start()
+
+    def stop_pipeline(self):
+        """停止处理；在处理线程内部调用时不等待自身结束"""
+        self.slot.close()
+        if threading.get_ident() != self._worker_ident:
+            self.wait()
+
+    def timing_report(self):
+        """各阶段平均耗时（毫秒）"""
+        return {
+            name: total / count * 1000
+            for name, (count, total) in self.stage_timings.items()
+        }
+
+    def handle_result(self, context):
+        """一帧处理完成后调用（在处理线程中），子类在此发出各自的信号"""
+
+    def run(self):
+        self._worker_ident = threading.get_ident()
+        failures = 0
+        while not self.slot.closed:
+            delay = max([self._resume_time - time.perf_counter()] + [
+                stage.delay() for stage in self.stages
+                if hasattr(stage, "delay")
+            ])
+            if delay > 0:
+                self.slot.pause(delay)
+                continue
+
+            frame = self.slot.take()
+            if frame is None:
+                continue
+
+            try:
+                context = self._process(frame)
+                for box, is_good in context.feedback:
+                    self.faceQualityFeedback.emit(tuple(int(v) for v in box),
+                                                  is_good)
+                self.handle_result(context)
+            except Exception as e:
+                failures += 1
+                if failures >= self.max_failures:
+                    self.slot.close()
+                    self.processingError.emit(str(e))
+                continue
+            failures = 0
+            if context.cooldown:
+                self._resume_time = time.perf_counter() + context.cooldown
+
+    def _process(self, frame):
+        context = FrameContext(frame)
+        for stage in self.stages:
+            start = time.perf_counter()
+            proceed = stage.process(context)
+            count, total = self.stage_timings.get(stage.name, (0, 0.0))
+            self.stage_timings[stage.name] = (count + 1,
+                                              total + time.perf_counter() - start)
+            if not proceed:
+                break
+        return context
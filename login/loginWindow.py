@@ -5,6 +5,7 @@ from login.view.accountInterface import AccountInterface
 from mainWindow.mainWindow import MainWindow
 from login.view.faceInterface import FaceLoginInterface
 from config import cfg
+from Database import DatabaseManager
 from qframelesswindow import FramelessWindow, StandardTitleBar
 from PyQt5.QtGui import QIcon
 import sys, os
@@ -89,6 +90,9 @@ class LoginWindow(FramelessWindow):
         user_id = user_data["id"]
         username = user_data["username"]
 
+        # 登录后派生用户的数据密钥，之后的加解密直接使用内存中的密钥
+        DatabaseManager().load_user_key(user_id)
+
         self.hide()
         self.mainWindow = MainWindow(user_id, username)
         self.mainWindow.show()
@@ -19,7 +19,7 @@ from qfluentwidgets import (
     InfoBar,
     InfoBarPosition,
 )
-from Database import DatabaseManager
+from services.credential_service import CredentialService
 import os
 import sys
 
@@ -72,6 +72,12 @@ class AccountInterface(QFrame):
         self.error_label = BodyLabel()
         self.error_timer = QTimer()
 
+        # 密码哈希在线程池中计算，结果通过信号返回
+        self.credentialService = CredentialService(self)
+        self.credentialService.loginFinished.connect(self._on_login_finished)
+        self.credentialService.registerFinished.connect(self._on_register_finished)
+        self.credentialService.error.connect(self._on_credential_error)
+
         self.__initWidget()
         self.__initLayout()
 
@@ -201,21 +207,19 @@ class AccountInterface(QFrame):
             self.show_error("用户名和密码不能为空")
             return
 
-        db = None
-        try:
-            db = DatabaseManager()
-            user = db.account_login(username, password)
-            if user:
-                self.show_error("")
-                self.error_timer.stop()
-                user_data = {"id": user["id"], "username": user["username"]}
-                self.loginSuccess.emit(user_data)
-            else:
-                self.show_error("用户名或密码错误")
-                self.error_timer.start()
-        finally:
-            if db:
-                db.close()
+        self._set_busy(True)
+        self.credentialService.login(username, password)
+
+    def _on_login_finished(self, user):
+        self._set_busy(False)
+        if user:
+            self.show_error("")
+            self.error_timer.stop()
+            user_data = {"id": user["id"], "username": user["username"]}
+            self.loginSuccess.emit(user_data)
+        else:
+            self.show_error("用户名或密码错误")
+            self.error_timer.start()
 
     def register(self):
         username = self.register_username_input.text()
@@ -234,31 +238,39 @@ class AccountInterface(QFrame):
             self.show_error("密码长度至少为6位")
             return
 
-        db = None
-        try:
-            db = DatabaseManager()
-            success = db.create_user(username, password)
-            if not success:
-                self.show_error("用户名已存在，请更换用户名")
-                return
-
-            w = InfoBar.success(
-                title="注册成功！",
-                content="",
-                orient=Qt.Horizontal,
-                isClosable=True,
-                position=InfoBarPosition.BOTTOM_RIGHT,
-                duration=2000,
-                parent=self.parent,
-            )
-            w.show()
-            self.registerSuccess.emit(username)
-
-            # 延迟后自动切换到登录界面并填充注册的用户名
-            QTimer.singleShot(1000, lambda: self._register_success_action(username))
-        finally:
-            if db:
-                db.close()
+        self._set_busy(True)
+        self.credentialService.register(username, password)
+
+    def _on_register_finished(self, success, username):
+        self._set_busy(False)
+        if not success:
+            self.show_error("用户名已存在，请更换用户名")
+            return
+
+        w = InfoBar.success(
+            title="注册成功！",
+            content="",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=2000,
+            parent=self.parent,
+        )
+        w.show()
+        self.registerSuccess.emit(username)
+
+        # 延迟后自动切换到登录界面并填充注册的用户名
+        QTimer.singleShot(1000, lambda: self._register_success_action(username))
+
+    def _on_credential_error(self, message):
+        self._set_busy(False)
+        self.show_error(f"操作失败: {message}")
+        self.error_timer.start()
+
+    def _set_busy(self, busy):
+        """计算密码哈希期间禁用按钮，避免重复提交"""
+        self.login_button.setEnabled(not busy)
+        self.register_button.setEnabled(not busy)
 
     def _register_success_action(self, username):
         self.switch_to_login()
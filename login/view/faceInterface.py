@@ -1,6 +1,5 @@
 import cv2
 import numpy as np
-import json
 import os
 import sys
 from pathlib import Path
@@ -31,6 +30,11 @@ from qfluentwidgets import (
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 from Database import DatabaseManager
+from config import cfg
+from services.face_embedder import get_face_embedder
+from faceRecognition.detection import FaceDetectionStage, create_face_detector
+from faceRecognition.pipeline import (FramePipeline, QualityStage, EmbedStage,
+                                      MatchStage)
 
 
 class CameraThread(QThread):
@@ -70,9 +74,10 @@ class CameraThread(QThread):
                 self.mutex.unlock()
                 break
 
+            # read() 每次返回新的数组，帧发出后不再被修改，无需复制
             ret, frame = self.cap.read()
             if ret:
-                self.frameReady.emit(frame.copy())
+                self.frameReady.emit(frame)
 
             self.mutex.unlock()
             self.msleep(20)
@@ -84,152 +89,56 @@ class CameraThread(QThread):
         self.mutex.unlock()
 
 
-class FaceVerificationThread(QThread):
-    """人脸验证线程 - 负责检测和验证人脸"""
+class FaceVerificationThread(FramePipeline):
+    """人脸验证线程 - 检测 → 质量 → 特征提取 → 比对"""
 
     # 信号定义
     faceDetected = pyqtSignal(np.ndarray, tuple)
-    faceQualityFeedback = pyqtSignal(tuple, bool)
     verificationResult = pyqtSignal(bool, int, str)
 
     def __init__(self):
         super().__init__()
-        self.cascade_path = (
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
-        self.face_cascade = cv2.CascadeClassifier(self.cascade_path)
         self.threshold = 2500
         self.match_threshold = 0.5
-        self.frame = None
-        self.new_frame_available = False
-        self.running = False
-        self.users_data = []  # 存储所有用户的人脸特征
-
-        self.mutex = QMutex()
-
-        # 初始化模型
-        self.model_file = "faceRecognition/models/openface_nn4.small2.v1.t7"
-        self.ensure_model_exists()
+        self.gallery = None  # 所有用户的人脸特征库
 
         self.load_users_data()
 
-    def ensure_model_exists(self):
-        if not os.path.exists(self.model_file):
-            model_dir = os.path.dirname(self.model_file)
-            if not os.path.exists(model_dir):
-                os.makedirs(model_dir)
-            print("需要下载人脸识别模型，这可能需要一些时间...")
+        self.stages = [
+            FaceDetectionStage(create_face_detector(cfg.get(cfg.faceDetector))),
+            QualityStage(self.threshold),
+            EmbedStage(get_face_embedder()),
+            MatchStage(self.gallery, self.match_threshold),
+        ]
 
     def load_users_data(self):
         try:
             db = DatabaseManager()
-            users = db.get_users_with_face_data()
+            self.gallery = db.get_face_gallery()
             db.close()
 
-            if not users:
+            if not len(self.gallery):
                 print("数据库中没有用户人脸数据")
-                return
-
-            self.users_data = users
         except Exception as e:
             print(f"加载用户数据出错: {e}")
 
     def process_frame(self, frame):
-        self.mutex.lock()
-        self.frame = frame.copy()
-        self.new_frame_available = True
-        self.mutex.unlock()
+        self.submit(frame)
 
     def start_verification(self):
-        self.mutex.lock()
-        self.running = True
-        self.mutex.unlock()
-
-        if not self.isRunning():
-            self.start()
+        self.start_pipeline()
 
     def stop_verification(self):
-        self.mutex.lock()
-        self.running = False
-        self.mutex.unlock()
-        self.wait()  # 等待线程结束
-
-    def verify_face(self, face_image):
-        """验证人脸是否匹配数据库中的用户"""
-        face_net = cv2.dnn.readNetFromTorch(self.model_file)
-
-        blob = cv2.dnn.blobFromImage(
-            face_image, 1.0 / 255, (96, 96), (0, 0, 0), swapRB=True, crop=False
-        )
-
-        face_net.setInput(blob)
-        current_feature = face_net.forward().flatten()
-
-        best_match = None
-        min_distance = float("inf")
-
-        for user in self.users_data:
-            try:
-                user_id = user["id"]
-                username = user["username"]
-                face_data = user["face_data"]
-
-                stored_features = json.loads(face_data)
+        self.stop_pipeline()
 
-                for feature in stored_features:
-                    distance = np.linalg.norm(current_feature - np.array(feature))
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_match = (user_id, username)
-            except Exception as e:
-                print(f"处理用户 {user.get('username', 'unknown')} 的特征时出错: {e}")
+    def handle_result(self, context):
+        if context.face_image is not None:
+            self.faceDetected.emit(context.face_image, context.box)
 
-        if min_distance < self.match_threshold and best_match:
-            return True, best_match[0], best_match[1], min_distance
-        else:
-            return False, None, None, min_distance
-
-    def run(self):
-        """线程主循环"""
-        while True:
-            self.mutex.lock()
-
-            if not self.running:
-                self.mutex.unlock()
-                break
-
-            if not self.new_frame_available:
-                self.mutex.unlock()
-                self.msleep(20)
-                continue
-
-            current_frame = self.frame.copy()
-            self.new_frame_available = False
-            self.mutex.unlock()
-
-            gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-            )
-
-            for x, y, w, h in faces:
-                face_area = w * h
-
-                is_good_quality = face_area > self.threshold
-                self.faceQualityFeedback.emit((x, y, w, h), is_good_quality)
-
-                if is_good_quality:
-                    face_img = current_frame[y : y + h, x : x + w]
-                    self.faceDetected.emit(face_img, (x, y, w, h))
-                    is_match, user_id, username, distance = self.verify_face(face_img)
-
-                    if is_match:
-                        self.verificationResult.emit(True, user_id, username)
-                        self.stop_verification()
-                        return
-
-                    self.msleep(500)
-                    break
+        if context.match is not None:
+            user_id, username, distance = context.match
+            self.verificationResult.emit(True, user_id, username)
+            self.stop_verification()
 
 
 class FaceLoginInterface(QWidget):
@@ -247,6 +156,7 @@ class FaceLoginInterface(QWidget):
         self.verification_thread.faceDetected.connect(self.on_face_detected)
         self.verification_thread.faceQualityFeedback.connect(self.on_face_quality)
         self.verification_thread.verificationResult.connect(self.on_verification_result)
+        self.verification_thread.processingError.connect(self.on_processing_error)
 
         self.display_frame = None
         self.faces_feedback = []
@@ -263,6 +173,12 @@ class FaceLoginInterface(QWidget):
 
         self.state_tooltip = None
 
+        # 在用户选择人脸登录前后台加载模型，缩短首次识别的等待时间；
+        # 模型尚未下载时不预加载，避免从不使用人脸登录的用户也要下载模型
+        embedder = get_face_embedder()
+        if cfg.get(cfg.faceModelWarmup) and embedder.is_downloaded:
+            embedder.warm_up()
+
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(30, 30, 30, 30)
@@ -386,7 +302,8 @@ class FaceLoginInterface(QWidget):
             self.state_tooltip = None
 
     def update_frame(self, frame):
-        self.display_frame = frame.copy()
+        # 绘制时会先复制，这里直接保存引用
+        self.display_frame = frame
         self.verification_thread.process_frame(frame)
 
     def on_face_detected(self, face_img, coords):
@@ -476,6 +393,18 @@ class FaceLoginInterface(QWidget):
                 parent=self,
             )
 
+    def on_processing_error(self, error):
+        self.stop_capture()
+        InfoBar.error(
+            title="人脸识别出错",
+            content=f"处理摄像头画面时出错: {error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=5000,
+            parent=self,
+        )
+
     def emit_login_signal(self):
         user_data = {"id": self.verified_user_id, "username": self.verified_username}
         self.loginSuccessful.emit(user_data)
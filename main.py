@@ -4,6 +4,7 @@ import os
 from PyQt5.QtWidgets import QApplication
 from login.loginWindow import LoginWindow
 from PyQt5.QtCore import Qt
+from Database import ConnectionPool
 
 myappid = "SmartMemo"
 ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
@@ -19,3 +20,4 @@ if __name__ == "__main__":
     w = LoginWindow()
     w.show()
     app.exec()
+    ConnectionPool.close_all()
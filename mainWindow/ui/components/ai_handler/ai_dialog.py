@@ -9,7 +9,6 @@ from PyQt5.QtWidgets import (
     QWIDGETSIZE_MAX,
     QDialog,
 )
-from PyQt5.QtGui import QTextCursor
 
 from qfluentwidgets import (
     TextEdit,
@@ -24,7 +23,8 @@ from qfluentwidgets import (
     isDarkTheme,
 )
 
-from mainWindow.ui.components.ai_handler.ai_threads import AIWorkerThread, AIStreamWorkerThread
+from mainWindow.ui.components.ai_handler.stream_buffer import StreamBuffer
+from services.ai_scheduler import PRIORITY_DIALOG, get_ai_scheduler
 
 
 class AIDialog(Dialog):
@@ -35,7 +35,7 @@ class AIDialog(Dialog):
         self.input_text = text
         self.result_text = ""
         self.state_tooltip = None
-        self.worker_thread = None
+        self.request = None
 
         self.ai_service = ai_service
 
@@ -154,6 +154,8 @@ class AIDialog(Dialog):
         self.result_edit.setMinimumHeight(200)
         self.result_edit.setObjectName("aiDialogResultEdit")
         result_layout.addWidget(self.result_edit)
+        # 流式输出按固定帧率写入结果框
+        self.stream_buffer = StreamBuffer(self.result_edit, parent=self)
 
         self.textLayout.addLayout(result_layout)
 
@@ -187,11 +189,6 @@ class AIDialog(Dialog):
 
         self.textLayout.addLayout(button_layout)
 
-        # 连接AI服务信号
-        if self.ai_service:
-            self.ai_service.resultReady.connect(self.handle_ai_result)
-            self.ai_service.errorOccurred.connect(self.handle_ai_error)
-
     def apply_custom_style(self):
         """应用自定义样式"""
         if isDarkTheme():
@@ -343,38 +340,34 @@ class AIDialog(Dialog):
         else:
             text = ""
 
+        self.stop_any_running_threads()
+
+        self.stream_buffer.reset()
         self.result_edit.clear()
         self.result_text = ""
 
-        self.stop_any_running_threads()
-
+        self.request = get_ai_scheduler().generate(
+            text,
+            self.mode,
+            aux_prompt,
+            stream=self.use_streaming,
+            priority=PRIORITY_DIALOG,
+            ai_service=self.ai_service,
+        )
         if self.use_streaming:
-            self.worker_thread = AIStreamWorkerThread(
-                self.ai_service,
-                self.mode,
-                text,
-                aux_prompt=aux_prompt,
-            )
-            self.worker_thread.chunkReceived.connect(self.handle_stream_chunk)
-            self.worker_thread.finished.connect(self.handle_stream_finished)
-            self.worker_thread.error.connect(self.handle_ai_error)
+            self.request.chunkReceived.connect(self.handle_stream_chunk)
+            self.request.resultReady.connect(self.handle_stream_finished)
             self.stop_button.setEnabled(True)
         else:
-            self.worker_thread = AIWorkerThread(
-                self.ai_service,
-                self.mode,
-                text,
-                aux_prompt=aux_prompt,
-            )
-            self.worker_thread.finished.connect(self.handle_ai_result)
-            self.worker_thread.error.connect(self.handle_ai_error)
-
-        self.worker_thread.start()
+            self.request.resultReady.connect(self.handle_ai_result)
+        self.request.error.connect(self.handle_ai_error)
 
     def stop_generation(self):
         """停止生成过程"""
-        if self.worker_thread and isinstance(self.worker_thread, AIStreamWorkerThread):
-            self.worker_thread.stop()
+        if self.request and self.request.active and self.use_streaming:
+            self.request.cancel()
+            self.stream_buffer.flush()
+            self.result_text = self.stream_buffer.text()
             self.stop_button.setEnabled(False)
 
             self.generate_button.setEnabled(True)
@@ -393,25 +386,16 @@ class AIDialog(Dialog):
                     QTimer.singleShot(1000, lambda: self.safely_close_tooltip())
 
     def stop_any_running_threads(self):
-        """停止任何正在运行的线程"""
-        if self.worker_thread and self.worker_thread.isRunning():
-            if isinstance(self.worker_thread, AIStreamWorkerThread):
-                self.worker_thread.stop()
-            self.worker_thread.terminate()
-            self.worker_thread.wait()
+        """取消正在进行的请求"""
+        if self.request:
+            self.request.cancel()
+            self.request = None
 
     @pyqtSlot(str)
     def handle_stream_chunk(self, chunk):
         """处理流式响应的文本块"""
         try:
-            self.result_text += chunk
-
-            self.result_edit.setText(self.result_text)
-
-            cursor = self.result_edit.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.result_edit.setTextCursor(cursor)
-
+            self.stream_buffer.append(chunk)
         except Exception as e:
             print(f"处理流数据块时出错: {str(e)}")
 
@@ -419,6 +403,9 @@ class AIDialog(Dialog):
     def handle_stream_finished(self):
         """处理流式响应完成"""
         try:
+            self.stream_buffer.flush()
+            self.result_text = self.stream_buffer.text()
+
             self.generate_button.setEnabled(True)
             self.use_button.setEnabled(True)
             self.cancel_button.setEnabled(True)
@@ -461,6 +448,7 @@ class AIDialog(Dialog):
     def handle_ai_error(self, error_message):
         """处理 AI 生成错误"""
         try:
+            self.stream_buffer.reset()
             self.result_edit.setText(f"错误: {error_message}")
             self.generate_button.setEnabled(True)
             self.cancel_button.setEnabled(True)
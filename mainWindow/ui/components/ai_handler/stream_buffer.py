@@ -0,0 +1,52 @@
+# coding:utf-8
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QTextCursor
+
+
+class StreamBuffer(QObject):
+    """流式文本缓冲区
+
+    收到的文本块先暂存，每隔 interval 毫秒一次性追加到文本框末尾，
+    避免每个文本块都重新设置全部文本、触发重新排版。
+    没有新文本时定时器停止，不产生空转。
+    """
+
+    def __init__(self, text_edit, interval=33, parent=None):
+        super().__init__(parent)
+        self.text_edit = text_edit
+        self._parts = []  # 全部文本块，结束时再拼接
+        self._pending = []  # 尚未写入文本框的文本块
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+    def text(self):
+        return "".join(self._parts)
+
+    def append(self, chunk):
+        self._parts.append(chunk)
+        self._pending.append(chunk)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """把暂存的文本写入文本框"""
+        if not self._pending:
+            self._timer.stop()
+            return
+
+        text = "".join(self._pending)
+        self._pending = []
+
+        cursor = self.text_edit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.text_edit.setTextCursor(cursor)
+        self.text_edit.ensureCursorVisible()
+
+    def reset(self):
+        """丢弃缓冲的文本（不修改文本框）"""
+        self._timer.stop()
+        self._parts = []
+        self._pending = []
@@ -49,11 +49,7 @@ class AppCard(CardWidget):
         # 文本区域
         self.titleLabel = SubtitleLabel(title, self)
         # 只在UI中显示截断内容，完整内容已存储在self.full_content中
-        first_line = content.split("\n")[0] if content else ""  # 获取第一行
-        truncated_content = (
-            first_line[:20] + "..." if len(first_line) > 20 else first_line
-        )
-        self.contentLabel = BodyLabel(truncated_content, self)
+        self.contentLabel = BodyLabel(self._preview_text(content), self)
         self.contentLabel.setWordWrap(True)
 
         # 操作按钮
@@ -72,6 +68,23 @@ class AppCard(CardWidget):
 
         self.construct_layout()
 
+    @staticmethod
+    def _preview_text(content):
+        """获取内容预览：第一行的前20个字符"""
+        first_line = content.split("\n")[0] if content else ""  # 获取第一行
+        return first_line[:20] + "..." if len(first_line) > 20 else first_line
+
+    def set_memo(self, title, content, memo_id=None, modified_time=None, category=None):
+        """重新绑定卡片显示的备忘录，供虚拟化列表复用卡片"""
+        self.memo_id = memo_id
+        self.modified_time = modified_time
+        self.category = category
+        self.full_content = content
+
+        self.titleLabel.setText(title)
+        self.contentLabel.setText(self._preview_text(content))
+        self.timeLabel.setText(str(modified_time) if modified_time else "No time")
+
     def construct_layout(self):
         # 中间文本
         self.mainLayout.addSpacing(15)
@@ -257,17 +270,13 @@ class AppCard(CardWidget):
 
                     if self.memo_id:
                         # 查询备忘录的所有相关信息
-                        db.cursor.execute(
-                            "SELECT title, content, category FROM memos WHERE id = ?",
-                            (self.memo_id,),
-                        )
-                        result = db.cursor.fetchone()
+                        result = db.get_memo_by_id(self.memo_id)
 
                         if result:
                             # 找到记录，解密内容
-                            title = db.decrypt(result[0])
-                            content = db.decrypt(result[1])
-                            category = result[2]
+                            title = result["title"]
+                            content = result["content"]
+                            category = result["category"]
 
                             # 填充标题
                             main_window.memoInterface.lineEdit.setText(title)
@@ -0,0 +1,210 @@
+# coding:utf-8
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QEvent
+
+from mainWindow.ui.components.mainpage.AppCard import AppCard
+
+
+class MemoListModel(QAbstractListModel):
+    """备忘录列表模型
+
+    只保存数据库行（标题和内容仍为密文），视图请求某一行时才解密，
+    解密结果由 DatabaseManager 的缓存复用。
+    完整列表按页从数据库加载（不含正文的摘要行），滚动到末尾时再取下一页。
+    """
+
+    MemoIdRole = Qt.UserRole + 1
+    TitleRole = Qt.UserRole + 2
+    ContentRole = Qt.UserRole + 3
+    ModifiedTimeRole = Qt.UserRole + 4
+    CategoryRole = Qt.UserRole + 5
+
+    PAGE_SIZE = 50
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._memos = []
+        self._query = None  # 分页查询参数
+        self._cursor = None  # 下一页游标，为 None 表示已全部加载
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._memos)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._memos):
+            return None
+
+        memo = self._memos[index.row()]
+        if role == self.MemoIdRole:
+            return memo[0]
+        if role == self.ModifiedTimeRole:
+            return memo[3]
+        if role == self.CategoryRole:
+            return memo[6]
+        if role in (Qt.DisplayRole, self.TitleRole):
+            return self.db.decrypt_memo(memo)[0]
+        if role == self.ContentRole:
+            return self.db.get_memo_content(memo)
+        return None
+
+    def set_memos(self, memos):
+        """替换列表数据，memos 为按显示顺序排列的数据库行"""
+        self.beginResetModel()
+        self._memos = list(memos)
+        self._query = None
+        self._cursor = None
+        self.endResetModel()
+
+    def load_memos(self, user_id, sort="modified_time", descending=True):
+        """按排序方式重新加载用户的备忘录，先只读取第一页"""
+        rows, cursor = self.db.get_memo_page(
+            user_id, sort, descending, limit=self.PAGE_SIZE
+        )
+        self.beginResetModel()
+        self._memos = list(rows)
+        self._query = (user_id, sort, descending)
+        self._cursor = cursor
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._cursor is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        """加载下一页"""
+        if not self.canFetchMore(parent):
+            return
+
+        user_id, sort, descending = self._query
+        rows, self._cursor = self.db.get_memo_page(
+            user_id, sort, descending, after=self._cursor, limit=self.PAGE_SIZE
+        )
+        if not rows:
+            return
+
+        first = len(self._memos)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._memos.extend(rows)
+        self.endInsertRows()
+
+
+class MemoCardListView(QWidget):
+    """虚拟化的备忘录卡片列表
+
+    放在滚动区域中，按行数撑开高度，但只为可见区域创建 AppCard，
+    滚动时复用这些卡片绑定到新的行，卡片数量与备忘录总数无关。
+    """
+
+    ROW_HEIGHT = 96  # 与 AppCard 的固定高度一致
+    SPACING = 8
+    MARGIN = 9
+    PREFETCH_ROWS = 10  # 距离已加载末尾不足该行数时加载下一页
+
+    def __init__(self, scroll_area, model, parent=None):
+        super().__init__(parent)
+        self.scroll_area = scroll_area
+        self.model = model
+        self._cards = []  # 可复用的卡片池
+
+        self.model.modelReset.connect(self._on_model_changed)
+        self.model.rowsInserted.connect(self._on_model_changed)
+        self.model.rowsRemoved.connect(self._on_model_changed)
+        self.model.dataChanged.connect(self._on_data_changed)
+
+        self.scroll_area.verticalScrollBar().valueChanged.connect(
+            self._update_visible_cards
+        )
+        self._viewport = self.scroll_area.viewport()
+        self._viewport.installEventFilter(self)
+
+        self._on_model_changed()
+
+    def _stride(self):
+        return self.ROW_HEIGHT + self.SPACING
+
+    def _on_model_changed(self, *args):
+        """行数变化时更新占位高度并重新绑定可见卡片"""
+        row_count = self.model.rowCount()
+        height = 2 * self.MARGIN + max(0, row_count * self._stride() - self.SPACING)
+        self.setMinimumHeight(height)
+        self._update_visible_cards()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=None):
+        # 强制重新绑定受影响的行
+        for card in self._cards:
+            row = card.property("row")
+            if row is not None and top_left.row() <= row <= bottom_right.row():
+                card.memo_id = None
+        self._update_visible_cards()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize and obj is self._viewport:
+            self._update_visible_cards()
+        return super().eventFilter(obj, event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_visible_cards()
+
+    def _visible_rows(self):
+        """计算当前视口内可见的行范围 [first, last)"""
+        row_count = self.model.rowCount()
+        if row_count == 0:
+            return 0, 0
+
+        # 视图在滚动内容中的偏移
+        offset = self.scroll_area.verticalScrollBar().value() - self.y()
+        viewport_height = self.scroll_area.viewport().height()
+        stride = self._stride()
+
+        first = max(0, (offset - self.MARGIN) // stride)
+        last = (offset + viewport_height - self.MARGIN) // stride + 1
+        return min(first, row_count), max(0, min(last, row_count))
+
+    def _update_visible_cards(self, *args):
+        first, last = self._visible_rows()
+
+        row_count = self.model.rowCount()
+        if last + self.PREFETCH_ROWS >= row_count and self.model.canFetchMore():
+            self.model.fetchMore()
+            if self.model.rowCount() != row_count:
+                return  # 插入新行时已重新布局
+
+        while len(self._cards) < last - first:
+            card = AppCard("", "", parent=self)
+            card.hide()
+            self._cards.append(card)
+
+        width = self.width() - 2 * self.MARGIN
+        for i, card in enumerate(self._cards):
+            row = first + i
+            if row >= last:
+                card.setProperty("row", None)
+                card.hide()
+                continue
+
+            self._bind_card(card, row)
+            card.setGeometry(
+                self.MARGIN, self.MARGIN + row * self._stride(), width, self.ROW_HEIGHT
+            )
+            card.show()
+
+    def _bind_card(self, card, row):
+        """把卡片绑定到指定行，内容未变化时跳过"""
+        index = self.model.index(row)
+        memo_id = self.model.data(index, MemoListModel.MemoIdRole)
+        modified_time = self.model.data(index, MemoListModel.ModifiedTimeRole)
+
+        card.setProperty("row", row)
+        if card.memo_id == memo_id and card.modified_time == modified_time:
+            return
+
+        card.set_memo(
+            self.model.data(index, MemoListModel.TitleRole),
+            self.model.data(index, MemoListModel.ContentRole),
+            memo_id=memo_id,
+            modified_time=modified_time,
+            category=self.model.data(index, MemoListModel.CategoryRole),
+        )
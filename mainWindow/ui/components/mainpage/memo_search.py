@@ -0,0 +1,67 @@
+# coding:utf-8
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from Database import DatabaseManager
+
+
+class MemoSearchThread(QThread):
+    """在后台线程中执行备忘录全文检索
+
+    线程没有父对象，启动后由 _running 保持引用直到结束，
+    发起检索的界面先被销毁也不会销毁仍在运行的线程；程序退出前等待所有检索结束。
+    """
+
+    resultsReady = pyqtSignal(int, str, list)  # (请求序号, 查询文本, 备忘录行列表)
+    error = pyqtSignal(int, str)
+
+    _running = set()
+    _quit_connected = False
+
+    def __init__(self, request_id, user_id, text):
+        super().__init__()
+        self.request_id = request_id
+        self.user_id = user_id
+        self.text = text
+        self._cancelled = False
+
+    def run(self):
+        try:
+            db = DatabaseManager()
+            rows = db.search_memos(self.user_id, self.text)
+            if self._cancelled:
+                return
+
+            # 预先解密结果，界面线程显示时可直接命中缓存
+            db.decrypt_memos(rows)
+
+            if not self._cancelled:
+                self.resultsReady.emit(self.request_id, self.text, rows)
+        except Exception as e:
+            if not self._cancelled:
+                self.error.emit(self.request_id, str(e))
+
+    def cancel(self):
+        """取消检索，已被新输入取代的结果不会再发出"""
+        self._cancelled = True
+
+    def start(self):
+        MemoSearchThread._running.add(self)
+        self.finished.connect(self._on_finished)
+        if not MemoSearchThread._quit_connected:
+            app = QApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(MemoSearchThread.wait_all)
+                MemoSearchThread._quit_connected = True
+        super().start()
+
+    def _on_finished(self):
+        MemoSearchThread._running.discard(self)
+        self.deleteLater()
+
+    @classmethod
+    def wait_all(cls):
+        """取消并等待所有检索线程结束（程序退出时调用）"""
+        for thread in list(cls._running):
+            thread.cancel()
+            thread.wait()
@@ -112,13 +112,11 @@ class CloudCard(CardWidget):
             w2.show()
             # 解析备忘录数据
             memo_list = []
-            for memo in memos:
+            for memo, (title, content) in zip(memos, self.db.decrypt_memos(memos)):
                 memo_id = memo[0]
                 user_id = memo[1]
                 created_time = memo[2]
                 modified_time = memo[3]
-                title = self.db.decrypt(memo[4])
-                content = self.db.decrypt(memo[5])
                 category = memo[6]
                 memo_dict = {
                     "memo_id": memo_id,
@@ -677,24 +675,6 @@ class CloudCard(CardWidget):
             current_count = self.current_count
             memo_list = self.import_memo_list
 
-            if hasattr(self, "import_info_bar") and self.import_info_bar:
-                self.import_info_bar.close()
-                self.import_info_bar = InfoBar.info(
-                    title="导入中",
-                    content="正在删除现有备忘录...",
-                    orient=Qt.Horizontal,
-                    isClosable=False,
-                    position=InfoBarPosition.BOTTOM_RIGHT,
-                    duration=-1,
-                    parent=self.parent,
-                )
-
-            # 删除用户的所有备忘录
-            db.delete_memos_by_user(self.user_id)
-
-            # 导入统计
-            imported_count = 0
-
             if hasattr(self, "import_info_bar") and self.import_info_bar:
                 self.import_info_bar.close()
                 self.import_info_bar = InfoBar.info(
@@ -707,28 +687,39 @@ class CloudCard(CardWidget):
                     parent=self.parent,
                 )
 
-            # 逐条导入备忘录
-            for i, memo in enumerate(memo_list):
-                if i % (len(memo_list) // 5 or 1) == 0:
-                    if hasattr(self, "import_info_bar") and self.import_info_bar:
-                        progress = int((i / len(memo_list)) * 100)
-                        self.import_info_bar.close()
-                        self.import_info_bar = InfoBar.info(
-                            title="导入中",
-                            content=f"正在导入数据...{progress}%",
-                            orient=Qt.Horizontal,
-                            isClosable=False,
-                            position=InfoBarPosition.BOTTOM_RIGHT,
-                            duration=-1,
-                            parent=self.parent,
-                        )
+            shown_progress = 0
 
-                title = memo.get("title", "")
-                content = memo.get("content", "")
-                category = memo.get("category", "")
+            def show_progress(done, total):
+                # 每完成约 20% 更新一次进度提示
+                nonlocal shown_progress
+                progress = int((done / total) * 100)
+                if progress - shown_progress < 20 or done == total:
+                    return
+                shown_progress = progress
+                if hasattr(self, "import_info_bar") and self.import_info_bar:
+                    self.import_info_bar.close()
+                    self.import_info_bar = InfoBar.info(
+                        title="导入中",
+                        content=f"正在导入数据...{progress}%",
+                        orient=Qt.Horizontal,
+                        isClosable=False,
+                        position=InfoBarPosition.BOTTOM_RIGHT,
+                        duration=-1,
+                        parent=self.parent,
+                    )
 
-                db.create_memo(self.user_id, title, content, category)
-                imported_count += 1
+            # 在同一个事务中删除现有备忘录并批量导入，导入失败时原有备忘录保持不变
+            memos = [
+                (
+                    memo.get("title", ""),
+                    memo.get("content", ""),
+                    memo.get("category", ""),
+                )
+                for memo in memo_list
+            ]
+            imported_count = db.create_memos_bulk(
+                self.user_id, memos, progress_callback=show_progress, replace=True
+            )
 
             db.close()
 
@@ -15,7 +15,7 @@ from qfluentwidgets import (
 from PyQt5.QtCore import Qt
 import string
 import random
-from Database import DatabaseManager
+from services.credential_service import CredentialService
 
 
 class PasswordCard(ExpandGroupSettingCard):
@@ -60,6 +60,13 @@ class PasswordCard(ExpandGroupSettingCard):
         self.reviseButton.clicked.connect(self.revise_password)
         self.generateButton.clicked.connect(self.generate_password)
 
+        # 校验旧密码和计算新密码哈希在线程池中进行
+        self.credentialService = CredentialService(self)
+        self.credentialService.passwordChangeFinished.connect(
+            self._on_password_changed
+        )
+        self.credentialService.error.connect(self._on_password_error)
+
     def add(self, label=None, widget=None, button=None):
         w = QWidget()
         w.setFixedHeight(60)
@@ -170,47 +177,48 @@ class PasswordCard(ExpandGroupSettingCard):
             )
             return
 
-        db = None
-        try:
-            db = DatabaseManager()
-            username = self.parent.user_data["username"]
-            user_id = self.parent.user_data["id"]
-            result = db.check_password(username, old_password)
-            if result:
-                db.update_user(user_id, password=new_password)
-                InfoBar.success(
-                    title="密码修改成功",
-                    content="您的密码已经修改成功",
-                    orient=Qt.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.BOTTOM_RIGHT,
-                    duration=3000,
-                    parent=self.parent,
-                )
-                self.oldPassEdit.clear()
-                self.newPassEdit.clear()
-                self.confirmEdit.clear()
-            else:
-                InfoBar.error(
-                    title="密码修改失败",
-                    content="旧密码错误",
-                    orient=Qt.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.BOTTOM_RIGHT,
-                    duration=3000,
-                    parent=self.parent,
-                )
-        except Exception as e:
+        username = self.parent.user_data["username"]
+        user_id = self.parent.user_data["id"]
+        self.reviseButton.setEnabled(False)
+        self.credentialService.change_password(
+            user_id, username, old_password, new_password
+        )
+
+    def _on_password_changed(self, success, reason):
+        """密码修改完成"""
+        self.reviseButton.setEnabled(True)
+        if success:
+            InfoBar.success(
+                title="密码修改成功",
+                content="您的密码已经修改成功",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=3000,
+                parent=self.parent,
+            )
+            self.oldPassEdit.clear()
+            self.newPassEdit.clear()
+            self.confirmEdit.clear()
+        else:
             InfoBar.error(
                 title="密码修改失败",
-                content=f"修改密码时发生错误: {str(e)}",
+                content=reason,
                 orient=Qt.Horizontal,
                 isClosable=True,
                 position=InfoBarPosition.BOTTOM_RIGHT,
                 duration=3000,
                 parent=self.parent,
             )
-            print(f"密码修改错误: {str(e)}")
-        finally:
-            if db:
-                db.close()
+
+    def _on_password_error(self, message):
+        self.reviseButton.setEnabled(True)
+        InfoBar.error(
+            title="密码修改失败",
+            content=f"修改密码时发生错误: {message}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=3000,
+            parent=self.parent,
+        )
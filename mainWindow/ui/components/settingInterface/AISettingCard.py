@@ -24,7 +24,7 @@ from qfluentwidgets import (
 from PyQt5.QtCore import Qt
 from config import cfg
 import os
-from services.ai_service import AIService
+from services.ai_service import AIService, get_ai_service
 
 
 class AISettingCard(ExpandGroupSettingCard):
@@ -184,20 +184,8 @@ class AISettingCard(ExpandGroupSettingCard):
 
             os.environ["OPENAI_API_KEY"] = api_key
 
-            main_window = self.window()
-
-            # 重新初始化所有使用AI服务的组件
-            if hasattr(main_window, "memoInterface") and hasattr(
-                main_window.memoInterface, "ai_handler"
-            ):
-                new_ai_service = AIService()
-                main_window.memoInterface.ai_handler.ai_service = new_ai_service
-
-            if hasattr(main_window, "todoInterface") and hasattr(
-                main_window.todoInterface, "ai_handler"
-            ):
-                new_ai_service = AIService()
-                main_window.todoInterface.ai_handler.ai_service = new_ai_service
+            # 所有组件共用同一个AI服务，重新创建客户端即可
+            get_ai_service().refresh_client()
 
             InfoBar.success(
                 title="设置已应用",
@@ -0,0 +1,257 @@
+# coding:utf-8
+from bisect import bisect_right
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QEvent
+from PyQt5.QtWidgets import QWidget
+
+from mainWindow.ui.components.todoInterface.todo_card import TodoCardManager
+
+
+class TodoListModel(QAbstractListModel):
+    """待办列表模型
+
+    把待办按“置顶 / 待办 / 已完成”三个分组展开成一维行列表（包含分组标题和分隔线），
+    刷新时与旧列表比较，只对新增、删除或变化的行发出行级信号。
+    """
+
+    TodoRole = Qt.UserRole + 1
+    MAX_ROW_CHANGES = 32  # 超过该数量的行变化时改为整体重置
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []  # [(key, payload), ...]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+
+        key, payload = self._rows[index.row()]
+        if role == self.TodoRole:
+            return payload
+        if role == Qt.DisplayRole and key[0] == "todo":
+            return payload[1]
+        return None
+
+    def row_key(self, row):
+        return self._rows[row][0]
+
+    def set_todos(self, todos):
+        """用新的待办数据更新模型
+
+        todos 为 (id, task, deadline, category, is_done, is_pinned) 形式的元组列表。
+        """
+        self._apply_rows(self._build_rows(todos))
+
+    @staticmethod
+    def _build_rows(todos):
+        """按分组展开为行列表，分组与原先的界面布局一致"""
+        pinned_todos = []
+        regular_todos = []
+        completed_todos = []
+
+        for todo in todos:
+            todo = tuple(todo[:6])
+            is_done, is_pinned = todo[4], todo[5]
+            if is_done:
+                completed_todos.append(todo)
+            elif is_pinned:
+                pinned_todos.append(todo)
+            else:
+                regular_todos.append(todo)
+
+        rows = []
+        if pinned_todos:
+            rows.append((("header", "pinned"), None))
+            rows.extend((("todo", "pinned", todo[0]), todo) for todo in pinned_todos)
+
+        if pinned_todos and regular_todos:
+            rows.append((("separator", "regular"), None))
+            rows.append((("header", "regular"), None))
+        rows.extend((("todo", "regular", todo[0]), todo) for todo in regular_todos)
+
+        if (pinned_todos or regular_todos) and completed_todos:
+            rows.append((("separator", "completed"), None))
+            rows.append((("header", "completed"), None))
+        rows.extend(
+            (("todo", "completed", todo[0]), todo) for todo in completed_todos
+        )
+
+        if not todos:
+            rows.append((("empty",), None))
+        return rows
+
+    def _apply_rows(self, new_rows):
+        """把旧行列表变换为新行列表
+
+        先删除消失的行、再按位置插入新出现的行，每次只影响变化的行。
+        这要求新旧列表共有的行相对顺序不变；编辑后分组内重新排序时
+        （如修改截止日期），逐行比较到键不一致的位置就改为整体重置。
+        """
+        new_keys = {key for key, _ in new_rows}
+        old_keys = {key for key, _ in self._rows}
+
+        # 首次加载或变化较多时直接重置，避免逐行发出大量信号
+        changed = len(old_keys - new_keys) + len(new_keys - old_keys)
+        if not self._rows or changed > self.MAX_ROW_CHANGES:
+            self._reset_rows(new_rows)
+            return
+
+        for row in reversed(range(len(self._rows))):
+            if self._rows[row][0] not in new_keys:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+
+        old_keys = {key for key, _ in self._rows}
+        for row, (key, payload) in enumerate(new_rows):
+            if key not in old_keys:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._rows.insert(row, (key, payload))
+                self.endInsertRows()
+            elif self._rows[row][0] != key:
+                # 共有的行顺序发生了变化，无法逐行变换
+                self._reset_rows(new_rows)
+                return
+            elif self._rows[row][1] != payload:
+                self._rows[row] = (key, payload)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def _reset_rows(self, new_rows):
+        self.beginResetModel()
+        self._rows = list(new_rows)
+        self.endResetModel()
+
+
+class TodoListView(QWidget):
+    """虚拟化的待办列表
+
+    按各行高度撑开占位，只为滚动区域中可见的行创建控件；
+    模型发出行级变化时只重建受影响的行，其余可见控件仅调整位置。
+    """
+
+    SPACING = 15
+    MARGIN = 20
+    ROW_HEIGHTS = {"todo": 100, "header": 30, "separator": 32, "empty": 80}
+    SECTION_LABELS = {
+        "pinned": ("📌 置顶待办", "#D32F2F"),
+        "regular": ("📋 待办事项", "#2196F3"),
+        "completed": ("✅ 已完成", "gray"),
+    }
+
+    def __init__(self, scroll_area, model, card_factory, parent=None):
+        super().__init__(parent)
+        self.scroll_area = scroll_area
+        self.model = model
+        self.card_factory = card_factory  # todo -> 待办卡片
+        self._widgets = {}  # 行键 -> 当前显示的控件
+        self._offsets = []  # 每一行顶部的纵坐标
+
+        self.model.modelReset.connect(self._on_model_reset)
+        self.model.rowsInserted.connect(self._on_rows_changed)
+        self.model.rowsRemoved.connect(self._on_rows_changed)
+        self.model.dataChanged.connect(self._on_data_changed)
+
+        self.scroll_area.verticalScrollBar().valueChanged.connect(
+            self._update_visible_rows
+        )
+        self._viewport = self.scroll_area.viewport()
+        self._viewport.installEventFilter(self)
+
+        self._on_rows_changed()
+
+    def _row_height(self, row):
+        return self.ROW_HEIGHTS[self.model.row_key(row)[0]]
+
+    def _on_rows_changed(self, *args):
+        """行增删后重新计算各行位置和占位高度"""
+        offsets = []
+        y = self.MARGIN
+        for row in range(self.model.rowCount()):
+            offsets.append(y)
+            y += self._row_height(row) + self.SPACING
+        self._offsets = offsets
+
+        height = y - self.SPACING + self.MARGIN if offsets else 2 * self.MARGIN
+        self.setMinimumHeight(height)
+        self._update_visible_rows()
+
+    def _on_model_reset(self):
+        for widget in self._widgets.values():
+            self._discard(widget)
+        self._widgets.clear()
+        self._on_rows_changed()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=None):
+        # 数据变化的行需要重新创建控件
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            widget = self._widgets.pop(self.model.row_key(row), None)
+            if widget is not None:
+                self._discard(widget)
+        self._update_visible_rows()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize and obj is self._viewport:
+            self._update_visible_rows()
+        return super().eventFilter(obj, event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_visible_rows()
+
+    def _visible_rows(self):
+        """计算当前视口内可见的行范围 [first, last)"""
+        if not self._offsets:
+            return 0, 0
+
+        top = self.scroll_area.verticalScrollBar().value() - self.y()
+        bottom = top + self.scroll_area.viewport().height()
+
+        first = max(0, bisect_right(self._offsets, top) - 1)
+        last = bisect_right(self._offsets, bottom)
+        return first, last
+
+    def _update_visible_rows(self, *args):
+        first, last = self._visible_rows()
+        visible = {self.model.row_key(row): row for row in range(first, last)}
+
+        # 回收离开视口或已被删除的行
+        for key in list(self._widgets):
+            if key not in visible:
+                self._discard(self._widgets.pop(key))
+
+        width = self.width() - 2 * self.MARGIN
+        for key, row in visible.items():
+            widget = self._widgets.get(key)
+            if widget is None:
+                widget = self._create_widget(key, row)
+                self._widgets[key] = widget
+            widget.setGeometry(
+                self.MARGIN, self._offsets[row], width, self._row_height(row)
+            )
+            widget.show()
+
+    def _create_widget(self, key, row):
+        kind = key[0]
+        if kind == "todo":
+            todo = self.model.data(self.model.index(row), TodoListModel.TodoRole)
+            widget = self.card_factory(todo, pinned=key[1] == "pinned")
+        elif kind == "header":
+            widget = TodoCardManager.create_section_label(*self.SECTION_LABELS[key[1]])
+        elif kind == "separator":
+            widget = TodoCardManager.create_separator()
+        else:
+            widget = TodoCardManager.create_empty_label()
+
+        widget.setParent(self)
+        return widget
+
+    @staticmethod
+    def _discard(widget):
+        widget.hide()
+        widget.deleteLater()
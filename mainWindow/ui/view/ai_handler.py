@@ -16,7 +16,7 @@ import locale
 from datetime import datetime
 import traceback
 
-from services.ai_service import AIService
+from services.ai_service import AIService, AIServiceError, get_ai_service
 from mainWindow.ui.components.ai_handler.ai_dialog import AIDialog
 from mainWindow.ui.components.ai_handler.ai_parser import AIResultParser
 
@@ -57,7 +57,7 @@ class AIHandler:
             return
 
         self.parent = parent
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
 
         # 更新单例引用
         AIHandler._instance = self
@@ -158,11 +158,8 @@ class AIHandler:
         )
 
     def extract_todos_from_memo(self, memo_content, user_id):
-        """从备忘录内容中提取待办事项"""
+        """从备忘录内容中提取待办事项，AI 请求失败时抛出 AIServiceError"""
         try:
-            # 获取系统提示词
-            system_prompt = self.ai_service.AI_MODES["待办提取"]["system_prompt"]
-
             # 设置本地化
             try:
                 locale.setlocale(locale.LC_TIME, "zh_CN.UTF-8")
@@ -175,13 +172,17 @@ class AIHandler:
             # 创建提取待办事项的提示词
             prompt = AIResultParser.create_todo_prompt(memo_content)
 
-            # 生成内容
-            result = self.ai_service.generate_content(system_prompt + prompt,
-                                                      mode="自定义")
+            # 以"待办提取"模式生成（系统提示词由该模式提供）；
+            # 提示词包含当前日期，备忘录未修改时当天重复提取直接使用缓存
+            result = self.ai_service.generate_content(prompt,
+                                                      mode="待办提取",
+                                                      raise_errors=True)
 
             # 解析结果
             return AIResultParser.parse_todo_result(result)
 
+        except AIServiceError:
+            raise
         except Exception as e:
             print(f"提取待办事项失败: {str(e)}")
             traceback.print_exc()
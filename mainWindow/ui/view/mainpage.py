@@ -7,7 +7,7 @@ from PyQt5.QtWidgets import (
     QApplication,
     QActionGroup,
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from qfluentwidgets import (
     FluentIcon,
     SplitPushButton,
@@ -19,7 +19,11 @@ from qfluentwidgets import (
 )
 
 from mainWindow.ui.components.mainpage.Ui_mainpage import Ui_mainwindow
-from mainWindow.ui.components.mainpage.AppCard import AppCard  # 导入拆分出去的AppCard类
+from mainWindow.ui.components.mainpage.memo_list_view import (
+    MemoListModel,
+    MemoCardListView,
+)
+from mainWindow.ui.components.mainpage.memo_search import MemoSearchThread
 from Database import DatabaseManager
 
 
@@ -87,9 +91,21 @@ class MainInterface(Ui_mainwindow, QWidget):
         # 设置菜单
         self.sortButton.setFlyout(self.sortMenu)
 
+        # 初始化数据库连接
+        self.db = DatabaseManager()
+        self.user_id = user_id
+
+        # 备忘录列表采用模型/视图结构，只为可见区域创建卡片
+        self.memoModel = MemoListModel(self.db, self)
+        self.cardList = MemoCardListView(
+            self.scrollArea, self.memoModel, self.scrollAreaWidgetContents
+        )
+
         # 创建 QVBoxLayout
         self.cardLayout = QVBoxLayout()
         self.cardLayout.setAlignment(Qt.AlignTop)
+        self.cardLayout.setContentsMargins(0, 0, 0, 0)
+        self.cardLayout.addWidget(self.cardList)
 
         self.scrollAreaWidgetContents.setLayout(
             self.cardLayout
@@ -101,65 +117,41 @@ class MainInterface(Ui_mainwindow, QWidget):
 
         self.scrollAreaWidgetContents.setStyleSheet("QWidget{background: transparent}")
 
+        # 输入防抖：停止输入一段时间后才开始检索
+        self._search_request_id = 0
+        self._search_thread = None
+        self._search_notify = False
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(300)
+        self.searchTimer.timeout.connect(self._start_search)
+
         # 连接搜索框信号
         self.lineEdit.searchSignal.connect(self.search_memos)
         self.lineEdit.textChanged.connect(self.on_search_text_changed)
 
-        # 初始化数据库连接
-        self.db = DatabaseManager()
-        self.user_id = user_id
-
         # 初始加载备忘录列表
         self.update_memo_list()
 
     def update_memo_list(self):
         """从数据库获取备忘录并更新列表"""
-        # 清空现有布局
-        for i in reversed(range(self.cardLayout.count())):
-            widget = self.cardLayout.itemAt(i).widget()
-            if widget is not None:
-                widget.deleteLater()
-
-        # 从数据库获取备忘录
-        memos = self.db.get_memos(user_id=self.user_id)
+        # 刷新完整列表时，取消尚未完成的检索
+        self._cancel_search()
 
-        # 根据选中的排序选项进行排序
+        # 根据选中的排序选项确定排序字段，排序和分页由数据库完成
         if self.nameAction.isChecked():
-            # 按标题字母顺序排序
-            memos.sort(
-                key=lambda x: self.db.decrypt(x[4]).lower(),
-                reverse=not self.ascendAction.isChecked(),
-            )
+            sort = "title"
         elif self.createTimeAction.isChecked():
-            # 按创建时间排序
-            memos.sort(key=lambda x: x[2], reverse=not self.ascendAction.isChecked())
-        elif self.modifiedTimeAction.isChecked():
-            # 按修改时间排序
-            memos.sort(key=lambda x: x[3], reverse=not self.ascendAction.isChecked())
-
-        # 添加 AppCard 到 cardLayout
-        for memo in memos:
-            # 从数据库中获取的数据
-            memo_id = memo[0]
-            user_id = memo[1]
-            created_time = memo[2]
-            modified_time = memo[3]
-            title = self.db.decrypt(memo[4])  # 解密标题
-            content = self.db.decrypt(memo[5])  # 解密内容
-            category = memo[6]
-
-            self.cardLayout.addWidget(
-                AppCard(
-                    title,
-                    content,
-                    memo_id=memo_id,
-                    modified_time=modified_time,
-                    category=category,
-                    timer=None,  # 传递 timer
-                )
-            )  # 修改参数
-
-            self.memo_count_changed.emit(len(memos))
+            sort = "created_time"
+        else:
+            sort = "modified_time"
+
+        # 模型只加载第一页，滚动到末尾时再继续加载
+        self.scrollArea.verticalScrollBar().setValue(0)
+        self.memoModel.load_memos(
+            self.user_id, sort, descending=not self.ascendAction.isChecked()
+        )
+        self.memo_count_changed.emit(self.db.get_memo_count(self.user_id))
 
     def sync_memos(self):
         """手动同步备忘录数据"""
@@ -238,9 +230,10 @@ class MainInterface(Ui_mainwindow, QWidget):
         )
 
     def search_memos(self, text):
-        """根据输入文本搜索备忘录"""
+        """根据输入文本搜索备忘录（按下回车或点击搜索按钮时立即检索）"""
         if not text.strip():
             # 如果搜索文本为空，显示所有备忘录
+            self.searchTimer.stop()
             self.update_memo_list()
             return
 
@@ -255,42 +248,59 @@ class MainInterface(Ui_mainwindow, QWidget):
             parent=self,
         )
 
-        # 清空现有布局
-        for i in reversed(range(self.cardLayout.count())):
-            widget = self.cardLayout.itemAt(i).widget()
-            if widget is not None:
-                widget.deleteLater()
-
-        # 从数据库获取所有备忘录
-        all_memos = self.db.get_memos(user_id=self.user_id)
-        found_count = 0
-
-        # 筛选出标题包含搜索文本的备忘录
-        for memo in all_memos:
-            memo_id = memo[0]
-            user_id = memo[1]
-            created_time = memo[2]
-            modified_time = memo[3]
-            title = self.db.decrypt(memo[4])  # 解密标题
-            content = self.db.decrypt(memo[5])  # 解密内容
-            category = memo[6]
-
-            # 检查标题是否包含搜索文本（不区分大小写）
-            if text.lower() in title.lower():
-                # 创建并添加卡片
-                self.cardLayout.addWidget(
-                    AppCard(
-                        title,
-                        content,
-                        memo_id=memo_id,
-                        modified_time=modified_time,
-                        category=category,
-                        timer=None,
-                    )
-                )
-                found_count += 1
+        self.searchTimer.stop()
+        self._search_notify = True
+        self._start_search()
+
+    def on_search_text_changed(self, text):
+        """搜索框文本变化时进行防抖检索，文本为空则恢复显示所有备忘录"""
+        if not text.strip():
+            self.searchTimer.stop()
+            self.update_memo_list()
+            return
+
+        self._search_notify = False
+        self.searchTimer.start()
+
+    def _start_search(self):
+        """在后台线程中检索，新的检索会取消尚未完成的旧检索"""
+        text = self.lineEdit.text()
+        if not text.strip():
+            return
+
+        self._cancel_search()
+
+        self._search_request_id += 1
+        # 线程不以界面为父对象，自行保持到运行结束，界面关闭时只需取消
+        thread = MemoSearchThread(self._search_request_id, self.user_id, text)
+        thread.resultsReady.connect(self._on_search_results)
+        thread.error.connect(self._on_search_error)
+        self._search_thread = thread
+        thread.start()
+
+    def _cancel_search(self):
+        """取消正在进行的检索"""
+        if self._search_thread is not None:
+            self._search_thread.cancel()
+            self._search_thread = None
+        # 使已发出但尚未处理的结果失效
+        self._search_request_id += 1
+
+    def _on_search_results(self, request_id, text, results):
+        """应用检索结果（忽略已被新输入取代的结果）"""
+        if request_id != self._search_request_id:
+            return
+
+        self._search_thread = None
+        self.memoModel.set_memos(results)
+        self.scrollArea.verticalScrollBar().setValue(0)
+
+        if not self._search_notify:
+            return
+        self._search_notify = False
 
         # 显示搜索结果信息
+        found_count = len(results)
         if found_count > 0:
             InfoBar.success(
                 title="搜索完成",
@@ -312,11 +322,21 @@ class MainInterface(Ui_mainwindow, QWidget):
                 parent=self,
             )
 
-    def on_search_text_changed(self, text):
-        """当搜索框文本变化时，如果文本为空则恢复显示所有备忘录"""
-        if not text.strip():
-            self.update_memo_list()
+    def _on_search_error(self, request_id, error):
+        """检索出错时提示"""
+        if request_id != self._search_request_id:
+            return
 
+        self._search_thread = None
+        InfoBar.error(
+            title="搜索失败",
+            content=f"检索备忘录时出错: {error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self,
+        )
 
 if __name__ == "__main__":
     import sys
@@ -170,17 +170,10 @@ class SettingInterface(ScrollArea):
             api_key = self.api_key_edit.text().strip()
             if api_key:
                 cfg.set(cfg.apiKey, api_key)
-            from services.ai_service import AIService
+            from services.ai_service import get_ai_service
 
-            main_window = self.window()
-
-            if hasattr(main_window, "memo_interface") and hasattr(
-                    main_window.memo_interface, "ai_handler"):
-                main_window.memo_interface.ai_handler.ai_service = AIService()
-
-            if hasattr(main_window, "todo_interface") and hasattr(
-                    main_window.todo_interface, "ai_handler"):
-                main_window.todo_interface.ai_handler.ai_service = AIService()
+            # 所有组件共用同一个AI服务，重新创建客户端即可
+            get_ai_service().refresh_client()
 
             InfoBar.success(
                 title="设置已应用",
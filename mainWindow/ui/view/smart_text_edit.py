@@ -1,68 +1,36 @@
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QEvent
+from PyQt5.QtCore import Qt, QTimer, QEvent
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QTextCursor, QColor, QTextCharFormat, QPainter
 from qfluentwidgets import TextEdit, StateToolTip
-from services.ai_service import AIService
+from services.ai_scheduler import PRIORITY_INLINE, get_ai_scheduler
+from services.ai_service import get_ai_service
 from config import cfg
 
 
-class SuggestionThread(QThread):
-    """AI建议生成线程"""
+def generate_suggestion(ai_service, text):
+    """生成补全建议（在调度器的工作线程中执行）"""
+    last_chars = text[-50:] if len(text) > 50 else text
+    context = f"{text}\n[请续写内容，不要重复最后的文本：{last_chars}]"
 
-    suggestionReady = pyqtSignal(str)
+    result = ai_service.generate_content(context, "tab续写", raise_errors=True)
 
-    def __init__(self, ai_service, text):
-        super().__init__()
-        self.ai_service = ai_service
-        self.text = text
-
-    def run(self):
-        try:
-            last_chars = self.text[-50:] if len(self.text) > 50 else self.text
-            context = f"{self.text}\n[请续写内容，不要重复最后的文本：{last_chars}]"
-
-            result = self.ai_service.generate_content(context, "tab续写")
-
-            if result and last_chars and result.startswith(last_chars):
-                result = result[len(last_chars):]
-
-            self.suggestionReady.emit(result)
-        except Exception:
-            pass
-            self.suggestionReady.emit("")
-
-
-class TabContinuationThread(QThread):
-    """Tab键续写线程"""
-
-    resultReady = pyqtSignal(str)
-
-    def __init__(self, ai_service, context):
-        super().__init__()
-        self.ai_service = ai_service
-        self.context = context
-
-    def run(self):
-        try:
-            result = self.ai_service.generate_content(self.context, "tab续写")
-            self.resultReady.emit(result)
-        except Exception:
-            pass
-            self.resultReady.emit("")
+    if result and last_chars and result.startswith(last_chars):
+        result = result[len(last_chars):]
+    return result
 
 
 class SmartTextEdit(TextEdit):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
         self._init_ai_modes()
 
         self.current_suggestion = ""
         self.suggestion_start_pos = None
         self.suggestion_active = False
         self.is_composing = False
-        self.suggestion_thread = None
+        self.suggestion_request = None
         self.is_showing_suggestion = False
 
         self.normal_color = self.palette().text().color()
@@ -83,13 +51,13 @@ class SmartTextEdit(TextEdit):
 
         self.cursorPositionChanged.connect(self._on_cursor_position_changed)
 
-        self.destroyed.connect(self._cleanup_threads)
+        self.destroyed.connect(self._cancel_suggestion_request)
 
-    def _cleanup_threads(self):
-        """清理线程资源"""
-        if self.suggestion_thread and self.suggestion_thread.isRunning():
-            self.suggestion_thread.terminate()
-            self.suggestion_thread.wait()
+    def _cancel_suggestion_request(self):
+        """取消尚未返回的补全请求"""
+        if self.suggestion_request:
+            self.suggestion_request.cancel()
+            self.suggestion_request = None
 
     def inputMethodEvent(self, event):
         """处理输入法事件"""
@@ -149,15 +117,21 @@ class SmartTextEdit(TextEdit):
         if len(context.strip()) < 5:
             return
 
-        if self.suggestion_thread and self.suggestion_thread.isRunning():
-            self.suggestion_thread.terminate()
-            self.suggestion_thread.wait()
+        # 旧的建议已经过时，取消请求（不强行终止线程）
+        self._cancel_suggestion_request()
 
         try:
-            self.suggestion_thread = SuggestionThread(self.ai_service, context)
-            self.suggestion_thread.suggestionReady.connect(
+            self.suggestion_request = get_ai_scheduler().submit(
+                generate_suggestion,
+                self.ai_service,
+                context,
+                priority=PRIORITY_INLINE,
+                key=("suggestion", context),
+            )
+            self.suggestion_request.resultReady.connect(
                 self._handle_suggestion)
-            self.suggestion_thread.start()
+            self.suggestion_request.error.connect(
+                lambda _: self._handle_suggestion(""))
         except Exception:
             pass
 
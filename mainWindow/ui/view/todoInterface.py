@@ -34,6 +34,10 @@ from mainWindow.ui.components.todoInterface.todo_notifier import TodoNotifier
 from mainWindow.ui.components.todoInterface.sound_manager import SoundManager
 from mainWindow.ui.components.todoInterface.todo_card import TodoCardManager
 from mainWindow.ui.components.todoInterface.slide_panel import SlidePanelManager
+from mainWindow.ui.components.todoInterface.todo_list_view import (
+    TodoListModel,
+    TodoListView,
+)
 
 
 class TodoInterface(ScrollArea):
@@ -129,15 +133,34 @@ class TodoInterface(ScrollArea):
 
     def _setup_todo_list(self):
         """待办列表区域设置"""
-        self.todoGroup = QWidget()
+        # 待办列表采用模型/视图结构，只为可见的行创建控件
+        self.todoModel = TodoListModel(self)
+        self.todoGroup = TodoListView(self, self.todoModel, self._create_todo_card)
         self.todoGroup.setAttribute(Qt.WA_StyledBackground)
         self.todoGroup.setStyleSheet("background: transparent;")
-        self.todoLayout = QVBoxLayout(self.todoGroup)
-        self.todoLayout.setSpacing(15)
-        self.todoLayout.setAlignment(Qt.AlignTop)
-        self.todoLayout.setContentsMargins(20, 20, 20, 20)
         self.vBoxLayout.addWidget(self.todoGroup)
 
+    def _create_todo_card(self, todo, pinned=False):
+        """为列表视图创建单个待办卡片"""
+        todo_id, task, deadline, category, is_done, is_pinned = todo
+        card = TodoCardManager.create_todo_card(
+            todo_id=todo_id,
+            task=task,
+            deadline=deadline,
+            category=category,
+            is_done=bool(is_done),
+            parent=self,
+            on_status_toggled=self._on_status_toggled,
+        )
+
+        # 应用置顶样式
+        if pinned:
+            TodoCardManager.apply_pinned_style(card)
+
+        # 设置事件过滤器，处理右键菜单
+        card.installEventFilter(self)
+        return card
+
     def _setup_slide_panel(self):
         """新建待办的滑动面板"""
         # 创建滑动面板组件
@@ -240,126 +263,17 @@ class TodoInterface(ScrollArea):
             InfoBar.error("错误", f"添加失败: {str(e)}", parent=self)
 
     def _refresh_list(self):
-        """刷新待办列表"""
-        # 清空现有列表
-        for i in reversed(range(self.todoLayout.count())):
-            widget = self.todoLayout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-                widget.deleteLater()
-
-        # 从数据库加载
+        """刷新待办列表
+
+        模型与当前数据比较后只更新变化的行，视图只重建受影响且可见的卡片。
+        """
         try:
             # 查询全部待办
-            self.db.cursor.execute(
-                """
-                SELECT id, task, deadline, category, is_done, is_pinned
-                FROM todos 
-                WHERE user_id=?
-                ORDER BY is_pinned DESC, is_done ASC, deadline ASC
-                """,
-                (self.user_id,),
-            )
-            todos = self.db.cursor.fetchall()
-
-            # 分类待办事项
-            pinned_todos = []
-            regular_todos = []
-            completed_todos = []
-
-            for todo in todos:
-                todo_id, task, deadline, category, is_done, is_pinned = todo
-
-                if is_done:
-                    completed_todos.append(todo)
-                elif is_pinned:
-                    pinned_todos.append(todo)
-                else:
-                    regular_todos.append(todo)
-
-            # 添加置顶标签（如果有置顶项）
-            if pinned_todos:
-                pinned_label = TodoCardManager.create_section_label(
-                    "📌 置顶待办", "#D32F2F"
-                )
-                self.todoLayout.addWidget(pinned_label)
-
-            # 添加置顶待办事项
-            for todo in pinned_todos:
-                todo_id, task, deadline, category, is_done, is_pinned = todo
-                card = TodoCardManager.create_todo_card(
-                    todo_id=todo_id,
-                    task=task,
-                    deadline=deadline,
-                    category=category,
-                    is_done=is_done,
-                    parent=self,
-                    on_status_toggled=self._on_status_toggled,
-                )
-
-                # 应用置顶样式
-                TodoCardManager.apply_pinned_style(card)
-
-                # 添加到布局并设置事件过滤器
-                self.todoLayout.addWidget(card)
-                card.installEventFilter(self)
-
-            # 如果有置顶项和未完成项，添加分隔符
-            if pinned_todos and regular_todos:
-                separator = TodoCardManager.create_separator()
-                self.todoLayout.addWidget(separator)
-
-                # 添加未完成标签
-                regular_label = TodoCardManager.create_section_label(
-                    "📋 待办事项", "#2196F3"
-                )
-                self.todoLayout.addWidget(regular_label)
-
-            # 添加普通未完成待办事项
-            for todo in regular_todos:
-                todo_id, task, deadline, category, is_done, is_pinned = todo
-                card = TodoCardManager.create_todo_card(
-                    todo_id=todo_id,
-                    task=task,
-                    deadline=deadline,
-                    category=category,
-                    is_done=is_done,
-                    parent=self,
-                    on_status_toggled=self._on_status_toggled,
-                )
-                self.todoLayout.addWidget(card)
-                card.installEventFilter(self)
-
-            # 如果有未完成项和已完成项，添加分隔符
-            if (pinned_todos or regular_todos) and completed_todos:
-                separator = TodoCardManager.create_separator()
-                self.todoLayout.addWidget(separator)
-
-                # 添加已完成标签
-                completed_label = TodoCardManager.create_section_label(
-                    "✅ 已完成", "gray"
-                )
-                self.todoLayout.addWidget(completed_label)
-
-            # 添加已完成待办事项
-            for todo in completed_todos:
-                todo_id, task, deadline, category, is_done, is_pinned = todo
-                card = TodoCardManager.create_todo_card(
-                    todo_id=todo_id,
-                    task=task,
-                    deadline=deadline,
-                    category=category,
-                    is_done=True,  # 强制设为已完成状态
-                    parent=self,
-                    on_status_toggled=self._on_status_toggled,
-                )
-                self.todoLayout.addWidget(card)
-                card.installEventFilter(self)
-
-            # 如果没有任何待办事项，显示空状态
-            if not todos:
-                empty_label = TodoCardManager.create_empty_label()
-                self.todoLayout.addWidget(empty_label)
+            todos = [
+                todo[:6]
+                for todo in self.db.get_todos(self.user_id, show_completed=True)
+            ]
+            self.todoModel.set_todos(todos)
 
         except Exception as e:
             InfoBar.error(
@@ -397,12 +311,10 @@ class TodoInterface(ScrollArea):
     def _delete_todo(self, todo_id, card):
         """删除待办事项"""
         try:
-            self.db.cursor.execute("DELETE FROM todos WHERE id=?", (todo_id,))
-            self.db.conn.commit()
+            self.db.delete_todo(todo_id)
 
             # 从界面移除
-            card.setParent(None)
-            card.deleteLater()
+            self._refresh_list()
 
             todo_count = self.db.get_todo_count(self.user_id)
             self.todo_count_changed.emit(todo_count)
@@ -449,22 +361,12 @@ class TodoInterface(ScrollArea):
 
     def _is_todo_pinned(self, todo_id):
         """检查待办是否已置顶"""
-        try:
-            self.db.cursor.execute("SELECT is_pinned FROM todos WHERE id=?", (todo_id,))
-            result = self.db.cursor.fetchone()
-            return bool(result[0]) if result else False
-        except Exception as e:
-            print(f"检查待办置顶状态失败: {e}")
-            return False
+        return self.db.is_todo_pinned(todo_id)
 
     def _toggle_todo_pin(self, todo_id, pin_status):
         """切换待办的置顶状态"""
         try:
-            self.db.cursor.execute(
-                "UPDATE todos SET is_pinned=? WHERE id=?",
-                (1 if pin_status else 0, todo_id),
-            )
-            self.db.conn.commit()
+            self.db.update_todo_pin_status(todo_id, pin_status)
 
             # 刷新列表
             self._refresh_list()
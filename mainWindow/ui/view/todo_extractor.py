@@ -1,4 +1,4 @@
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -35,23 +35,7 @@ from PyQt5.QtCore import QDate, QTime, QEvent
 from datetime import datetime
 from Database import DatabaseManager
 from mainWindow.ui.view.ai_handler import AIHandler
-
-
-class TodoExtractThread(QThread):
-    """提取待办事项的工作线程"""
-
-    resultReady = pyqtSignal(int, list)
-
-    def __init__(self, ai_handler, memo_content, user_id):
-        super().__init__()
-        self.ai_handler = ai_handler
-        self.memo_content = memo_content
-        self.user_id = user_id
-
-    def run(self):
-        count, todos = self.ai_handler.extract_todos_from_memo(
-            self.memo_content, self.user_id)
-        self.resultReady.emit(count, todos)
+from services.ai_scheduler import PRIORITY_BACKGROUND, get_ai_scheduler
 
 
 class TodoExtractorDialog(Dialog):
@@ -387,13 +371,16 @@ class TodoExtractorDialog(Dialog):
             )
             return
 
-        added_count = todo_extractor._add_todos_to_database(
+        added_count, skipped_count = todo_extractor._add_todos_to_database(
             selected_todos, self.user_id)
 
         if added_count > 0:
+            content = f"已成功添加 {added_count} 个待办事项"
+            if skipped_count:
+                content += f"，{skipped_count} 个无效的待办事项已跳过"
             InfoBar.success(
                 title="添加成功",
-                content=f"已成功添加 {added_count} 个待办事项",
+                content=content,
                 parent=self.parent(),
                 position=InfoBarPosition.TOP,
                 duration=3000,
@@ -546,7 +533,7 @@ class TodoExtractor:
     def __init__(self, parent_widget):
         self.parent = parent_widget
         self.state_tooltip = None
-        self.todo_thread = None
+        self.todo_request = None
 
     def extract_todos(self, memo_content, user_id, ai_handler):
         """从备忘录内容中提取待办事项"""
@@ -572,11 +559,16 @@ class TodoExtractor:
         self.state_tooltip.show()
         QApplication.processEvents()
 
-        self.todo_thread = TodoExtractThread(ai_handler, memo_content, user_id)
-        self.todo_thread.resultReady.connect(
-            lambda count, todos: self._on_todos_extracted(
-                count, todos, user_id))
-        self.todo_thread.start()
+        self.todo_request = get_ai_scheduler().submit(
+            ai_handler.extract_todos_from_memo,
+            memo_content,
+            user_id,
+            priority=PRIORITY_BACKGROUND,
+            key=("todo", user_id, memo_content),
+        )
+        self.todo_request.resultReady.connect(
+            lambda result: self._on_todos_extracted(*result, user_id))
+        self.todo_request.error.connect(self._on_extract_failed)
 
     def _on_todos_extracted(self, count, todos, user_id):
         """待办事项提取完成的回调"""
@@ -595,6 +587,17 @@ class TodoExtractor:
         dialog = TodoExtractorDialog(todos, user_id, self.parent)
         dialog.exec_()
 
+    def _on_extract_failed(self, error_message):
+        """AI 请求失败的回调"""
+        self.safely_close_tooltip()
+        InfoBar.error(
+            title="提取失败",
+            content=error_message,
+            parent=self.parent,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+        )
+
     def safely_close_tooltip(self):
         """安全关闭提示框"""
         try:
@@ -605,28 +608,22 @@ class TodoExtractor:
             pass
 
     def _add_todos_to_database(self, todos, user_id):
-        """将待办事项添加到数据库"""
+        """将待办事项添加到数据库，返回 (添加数量, 跳过数量)"""
         db = DatabaseManager()
-        added_count = 0
 
+        rows = []
+        skipped = 0
         for todo in todos:
-            try:
-                task = todo.get("task", "")
-                deadline = todo.get("deadline", "")
-                category = todo.get("category", "其他")
+            task = todo.get("task", "")
+            deadline = todo.get("deadline", "")
+            category = todo.get("category", "其他")
 
-                if not task:
-                    continue
+            if not task:
+                skipped += 1
+                continue
 
-                todo_id = db.add_todo(user_id=user_id,
-                                      task=task,
-                                      deadline=deadline,
-                                      category=category)
-
-                if todo_id:
-                    added_count += 1
-
-            except Exception:
-                pass
+            rows.append((task, deadline, category))
 
-        return added_count
+        # 在同一个事务中写入所有待办，无效的记录单独跳过
+        added, failed = db.add_todos_bulk(user_id, rows)
+        return added, skipped + failed
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config import cfg
+
+
+def make_cache_key(user_id, model_id, mode, system_prompt, prompt, aux_prompt,
+                   temperature):
+    """由请求参数生成缓存键（SHA-256），任一参数变化都对应不同的键"""
+    payload = json.dumps(
+        [user_id, model_id, mode, system_prompt, prompt, aux_prompt,
+         temperature],
+        ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """AI 响应的内存缓存
+
+    响应包含润色后的笔记、提取的待办等用户内容，只保存在内存中，不写入磁盘，
+    程序退出后即清空。条目超过 ttl 秒后失效；总大小超过 max_bytes 时
+    淘汰最久未使用的条目。只缓存请求成功的响应。
+    """
+
+    def __init__(self, ttl=7 * 24 * 3600, max_bytes=32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # 请求在各 AI 工作线程中执行，由锁保护
+        self._entries = OrderedDict()  # key -> (响应, 字节数, 创建时间)
+        self._size = 0
+
+    def get(self, key):
+        """返回缓存的响应，不存在或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > self.ttl:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, response):
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (response, size, time.time())
+            self._size += size
+            self._evict()
+
+    def purge_expired(self):
+        deadline = time.time() - self.ttl
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if entry[2] < deadline]:
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def _evict(self):
+        """按最近使用时间淘汰条目，直到总大小不超过上限"""
+        while self._size > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._size -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache():
+    """获取共享的 AI 响应缓存，设置中关闭缓存时返回 None"""
+    global _cache
+    if not cfg.get(cfg.aiCacheEnabled):
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = AIResponseCache()
+        _cache.ttl = cfg.get(cfg.aiCacheTtlHours) * 3600
+        _cache.max_bytes = cfg.get(cfg.aiCacheSizeMb) * 1024 * 1024
+    return _cache
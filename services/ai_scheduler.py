@@ -0,0 +1,289 @@
+import asyncio
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from config import cfg
+
+# 优先级，数值越小越先执行
+PRIORITY_INLINE = 0  # 输入时的实时补全
+PRIORITY_DIALOG = 1  # AI 对话框中的生成
+PRIORITY_BACKGROUND = 2  # 待办提取等后台任务
+
+
+class AIRequest(QObject):
+    """一次 AI 请求的句柄，所有信号都在句柄所在（主）线程中发出
+
+    流式请求依次发出 chunkReceived、resultReady（完整文本）；
+    请求结束（成功或出错）后发出 finished。调用 cancel() 之后不再发出任何信号。
+    主线程来不及处理时，期间到达的文本块合并为一次 chunkReceived。
+    """
+
+    chunkReceived = pyqtSignal(str)
+    resultReady = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    _event = pyqtSignal(str, object)
+
+    def __init__(self, scheduler):
+        super().__init__()
+        self._scheduler = scheduler
+        self._job = None
+        self._cancelled = False
+        self._done = False
+        self._chunks = []  # 尚未投递到主线程的文本块
+        self._chunk_lock = threading.Lock()
+        # 始终排队投递：即使在主线程中补发已收到的文本块，也在调用方连接信号之后送达
+        self._event.connect(self._dispatch, Qt.QueuedConnection)
+
+    @property
+    def active(self):
+        return not (self._cancelled or self._done)
+
+    def cancel(self):
+        """取消请求；合并到同一任务的其他请求不受影响"""
+        if not self.active:
+            return
+        self._cancelled = True
+        if self._job is not None:
+            self._job.detach(self)
+        self._scheduler._release(self)
+
+    def _push_chunk(self, chunk):
+        """在工作线程中调用；已有未处理的投递时只追加文本，不再发送事件"""
+        with self._chunk_lock:
+            self._chunks.append(chunk)
+            if len(self._chunks) > 1:
+                return
+        self._event.emit("chunk", None)
+
+    def _dispatch(self, kind, value):
+        if kind == "chunk":
+            with self._chunk_lock:
+                chunks, self._chunks = self._chunks, []
+            if self.active and chunks:
+                self.chunkReceived.emit("".join(chunks))
+            return
+
+        if not self.active:
+            return
+
+        self._done = True
+        if kind == "result":
+            self.resultReady.emit(value)
+        else:
+            self.error.emit(value)
+        self.finished.emit()
+        self._scheduler._release(self)
+
+
+class _Job:
+    """调度器中的一个任务，相同的请求合并为同一个任务"""
+
+    def __init__(self, key, func, args, priority, stream):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.priority = priority
+        self.stream = stream
+        self.started = False
+        self.chunks = []  # 流式请求已收到的文本块
+        self.cancelled = threading.Event()
+        self._requests = []
+        self._lock = threading.Lock()
+
+    def attach(self, request):
+        """加入请求，并补发之前已收到的文本块"""
+        with self._lock:
+            for chunk in self.chunks:
+                request._push_chunk(chunk)
+            self._requests.append(request)
+        request._job = self
+
+    def detach(self, request):
+        """移除请求，没有请求等待结果时取消任务"""
+        with self._lock:
+            if request in self._requests:
+                self._requests.remove(request)
+            if not self._requests:
+                self.cancelled.set()
+
+    def add_chunk(self, chunk):
+        with self._lock:
+            self.chunks.append(chunk)
+            for request in self._requests:
+                request._push_chunk(chunk)
+
+    def emit(self, kind, value):
+        with self._lock:
+            requests, self._requests = self._requests, []
+        for request in requests:
+            request._event.emit(kind, value)
+
+
+class AIScheduler:
+    """AI 请求调度器
+
+    在后台线程中运行 asyncio 事件循环，max_concurrency 个工作协程按优先级
+    （实时补全 > 对话框生成 > 后台提取）从队列中取出任务，同一优先级先到先得。
+    AI 接口的 SDK 是同步的，实际请求在同样大小的线程池中执行，因此同时进行的请求
+    不超过 max_concurrency 个。
+
+    - 取消是协作式的：排队中的任务直接跳过，流式任务在收到下一个文本块时关闭连接，
+      非流式请求无法中断，完成后丢弃结果；不会强行终止线程。
+    - 带相同 key 的请求在完成前合并为一个任务，结果发给每个请求，
+      优先级按其中最高的计算。
+    """
+
+    def __init__(self, max_concurrency=3):
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_concurrency,
+                                            thread_name_prefix="ai-request")
+        self._jobs = {}  # key -> 未完成的任务，用于合并相同的请求
+        self._unfinished = set()  # 所有未完成的任务，退出时取消
+        self._requests = set()  # 未结束的请求，保持引用直到信号送达
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._queue = None
+
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready, ),
+                                        name="ai-scheduler", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def submit(self, func, *args, priority=PRIORITY_DIALOG, stream=False,
+               key=None):
+        """提交请求，返回 AIRequest（需在主线程中调用）
+
+        func(*args) 在工作线程中执行：非流式请求的返回值通过 resultReady 发出；
+        流式请求应返回文本块的迭代器（可选提供 close()，取消时调用）。
+        """
+        request = AIRequest(self)
+        self._requests.add(request)
+
+        with self._lock:
+            job = self._jobs.get(key) if key is not None else None
+            if job is None or job.cancelled.is_set():
+                job = _Job(key, func, args, priority, stream)
+                self._unfinished.add(job)
+                if key is not None:
+                    self._jobs[key] = job
+                enqueue = True
+            else:
+                # 合并到已有任务；优先级更高且尚未开始时按新的优先级重新排队
+                enqueue = priority < job.priority and not job.started
+                job.priority = min(job.priority, priority)
+            job.attach(request)
+
+        if enqueue:
+            self._loop.call_soon_threadsafe(
+                self._queue.put_nowait,
+                (job.priority, next(self._counter), job))
+        return request
+
+    def generate(self, prompt, mode="generate", aux_prompt="", stream=False,
+                 priority=PRIORITY_DIALOG, ai_service=None):
+        """提交一次内容生成请求，相同的请求会被合并"""
+        if ai_service is None:
+            from services.ai_service import get_ai_service
+
+            ai_service = get_ai_service()
+        if stream:
+            func = ai_service.stream_text
+        else:
+            # 出错时抛出异常，由 error 信号发出，而不是把错误信息当作结果
+            func = functools.partial(ai_service.generate_content,
+                                     raise_errors=True)
+        key = ("stream" if stream else "generate", mode, prompt, aux_prompt)
+        return self.submit(func, prompt, mode, aux_prompt, priority=priority,
+                           stream=stream, key=key)
+
+    def shutdown(self):
+        """取消所有任务，退出程序时不必等待排队中的请求
+
+        线程池中尚未开始的调用直接取消；进行中的流式响应在下一个文本块时关闭，
+        非流式请求最多等待到客户端的请求超时（REQUEST_TIMEOUT）。
+        """
+        with self._lock:
+            jobs = list(self._unfinished)
+            self._jobs = {}
+        for job in jobs:
+            job.cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, request):
+        self._requests.discard(request)
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.PriorityQueue()
+        for _ in range(self.max_concurrency):
+            self._loop.create_task(self._worker())
+        ready.set()
+        self._loop.run_forever()
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            with self._lock:
+                # 重新排队后留下的旧条目
+                if job.started:
+                    continue
+                job.started = True
+
+            kind, value = "result", None
+            try:
+                if not job.cancelled.is_set():
+                    value = await self._loop.run_in_executor(
+                        self._executor, self._run_job, job)
+            except asyncio.CancelledError:
+                # 退出时线程池取消了尚未开始的调用
+                kind, value = "error", "请求已取消"
+            except Exception as e:
+                kind, value = "error", str(e)
+
+            # 先移出合并表再发出结果，之后提交的相同请求会创建新任务
+            with self._lock:
+                self._unfinished.discard(job)
+                if job.key is not None and self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            if not job.cancelled.is_set():
+                job.emit(kind, value)
+
+    @staticmethod
+    def _run_job(job):
+        if not job.stream:
+            return job.func(*job.args)
+
+        chunks = job.func(*job.args)
+        try:
+            for chunk in chunks:
+                if job.cancelled.is_set():
+                    break
+                job.add_chunk(chunk)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        return "".join(job.chunks)
+
+
+_scheduler = None
+
+
+def get_ai_scheduler():
+    """获取进程内共享的 AI 请求调度器（首次调用需在主线程中）"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AIScheduler(cfg.get(cfg.aiMaxConcurrency))
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_scheduler.shutdown)
+    return _scheduler
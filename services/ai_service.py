@@ -1,7 +1,88 @@
 import os
+import threading
 import traceback
-from PyQt5.QtCore import QObject, pyqtSignal, QThread
+from PyQt5.QtCore import QObject, pyqtSignal
 from config import cfg  # 导入配置
+from services.ai_cache import get_ai_cache, make_cache_key
+from services.memory_context import MemoryContext
+
+# 请求超时（秒）和失败重试次数
+REQUEST_TIMEOUT = 60
+MAX_RETRIES = 1
+
+# (客户端参数, 客户端)，整体替换以保证读取时参数与客户端一致
+_client_entry = (None, None)
+_client_lock = threading.Lock()
+
+
+def _client_settings():
+    """当前配置对应的客户端参数 (模型, base_url, API密钥)"""
+    model = cfg.get(cfg.aiModel)
+    base_url = cfg.get(cfg.customBaseUrl) if model == "custom" else ""
+    return model, base_url, cfg.get(cfg.apiKey)
+
+
+def _create_client(model, base_url, api_key):
+    if not api_key:
+        return None
+
+    # 限制单次请求（流式响应为相邻两个文本块之间）的等待时间和重试次数，
+    # 取消或退出程序时进行中的请求不会长时间占用工作线程
+    options = {"timeout": REQUEST_TIMEOUT, "max_retries": MAX_RETRIES}
+    if model == "deepseek-chat":
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key, base_url="https://api.deepseek.com/v1",
+                      **options)
+    if model == "gpt-4o":
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key, **options)
+    if model == "glm-4-flash":
+        from zhipuai import ZhipuAI
+
+        return ZhipuAI(api_key=api_key, **options)
+    if model == "custom" and base_url:
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key, base_url=base_url, **options)
+    return None
+
+
+def get_ai_client():
+    """获取当前配置对应的共享 API 客户端，配置无效时返回 None
+
+    客户端（及其保持连接的 HTTP 连接池）在进程内复用，
+    只有模型、自定义地址或 API 密钥变化时才重新创建。
+    """
+    global _client_entry
+    settings = _client_settings()
+    key, client = _client_entry
+    if key == settings:
+        return client
+
+    with _client_lock:
+        key, client = _client_entry
+        if key != settings:
+            try:
+                client = _create_client(*settings)
+            except Exception:
+                traceback.print_exc()
+                client = None
+            # 旧客户端不主动关闭，正在进行的请求仍可使用，释放引用后自动回收
+            _client_entry = (settings, client)
+    return client
+
+
+def reset_ai_client():
+    """丢弃缓存的客户端，下次请求时按当前配置重新创建"""
+    global _client_entry
+    with _client_lock:
+        _client_entry = (None, None)
+
+
+class AIServiceError(Exception):
+    """AI 请求失败"""
 
 
 class AIService(QObject):
@@ -44,6 +125,14 @@ class AIService(QObject):
         },
     }
 
+    # 默认缓存响应的模式（生成和流式生成都适用）：输入不变时结果可以复用
+    CACHED_MODES = ("润色", "待办提取", "一句诗")
+
+    TEMPERATURE = 0.7
+
+    # 不附加记忆上下文的模式（输入时的实时补全，要求响应快）
+    NO_MEMORY_MODES = ("tab续写", "智能提示")
+
     # 定义 AI 模式配置
     AI_MODES = {
         "润色": {
@@ -155,6 +244,7 @@ class AIService(QObject):
         super().__init__()
 
         self._memory_context = ""
+        self._memory = None  # MemoryContext，登录后由 build_memory_context 创建
         self._max_memory_tokens = 2000
 
         self.api_key = cfg.get(cfg.apiKey)
@@ -163,45 +253,14 @@ class AIService(QObject):
         self._init_api_client()
 
     def _init_api_client(self):
-        """初始化API客户端"""
-        try:
-            api_key = cfg.get(cfg.apiKey)
-            self.api_key = api_key
-            if not api_key:
-                self.client = None
-                return
-
-            model = cfg.get(cfg.aiModel)
-
-            if model == "deepseek-chat":
-                from openai import OpenAI
-
-                self.client = OpenAI(api_key=api_key,
-                                     base_url="https://api.deepseek.com/v1")
-            elif model == "gpt-4o":
-                from openai import OpenAI
-
-                self.client = OpenAI(api_key=api_key)
-            elif model == "glm-4-flash":
-                from zhipuai import ZhipuAI
-
-                self.client = ZhipuAI(api_key=api_key)
-            elif model == "custom":
-                from openai import OpenAI
-
-                base_url = cfg.get(cfg.customBaseUrl)
-                if not base_url:
-                    self.client = None
-                    return
-                self.client = OpenAI(api_key=api_key, base_url=base_url)
-            else:
-                self.client = None
-
-        except Exception as e:
-            import traceback
+        """获取当前配置对应的API客户端，配置未变化时直接复用已有客户端"""
+        self.api_key = cfg.get(cfg.apiKey)
+        self.client = get_ai_client()
 
-            traceback.print_exc()
-            self.client = None
+    def refresh_client(self):
+        """设置修改后重新创建API客户端"""
+        reset_ai_client()
+        self._init_api_client()
 
     def _get_base_url(self, model):
         """根据模型返回对应的 API 基础 URL"""
@@ -218,47 +277,39 @@ class AIService(QObject):
         return 4096
 
     def build_memory_context(self, user_id, db):
-        """构建用户的记忆上下文"""
-        try:
-            memos = db.get_all_memos_by_user(user_id)
-
-            if not memos:
-                self._memory_context = ""
-                return
-
-            context_parts = []
-
-            for memo in memos:
-                memo_id = memo["id"]
-                title = memo["title"]
-                content = memo["content"]
-                category = memo["category"]
-
-                memo_context = f"标题: {title}\n分类: {category}\n内容: {content}\n"
-                context_parts.append(memo_context)
-
-            max_context_length = 4000
-            combined_context = "\n---\n".join(context_parts)
-
-            if len(combined_context) > max_context_length:
-                truncated_parts = []
-                current_length = 0
-
-                for part in reversed(context_parts):
-                    if current_length + len(part) <= max_context_length:
-                        truncated_parts.insert(0, part)
-                        current_length += len(part)
-                    else:
-                        break
-
-                combined_context = "\n---\n".join(truncated_parts)
+        """构建用户的记忆上下文
 
+        只重新处理修改时间变化的备忘录；提示词使用的上下文在请求时按相关度挑选。
+        """
+        try:
+            memory = getattr(self, "_memory", None)
+            if memory is None or memory.user_id != user_id:
+                self._memory = MemoryContext(user_id)
+            self._memory.refresh(db)
+            # 没有提示词时使用的默认上下文（最近修改的笔记）
+            self._memory_context = self._memory.build(
+                max_tokens=self._max_memory_tokens)
         except Exception as e:
             import traceback
 
             print(traceback.format_exc())
             self._memory_context = ""
 
+    def _get_memory_context(self, prompt, mode=None):
+        """挑选与提示词相关的记忆上下文，不超过 _max_memory_tokens"""
+        if mode in self.NO_MEMORY_MODES:
+            return ""
+        memory = getattr(self, "_memory", None)
+        if memory is None:
+            return getattr(self, "_memory_context", "")
+        try:
+            return memory.build(prompt, self._max_memory_tokens)
+        except Exception:
+            import traceback
+
+            print(traceback.format_exc())
+            return self._memory_context
+
     def _get_enhanced_prompt(self, mode, user_prompt, aux_prompt=""):
         """获取增强的提示词，统一处理所有模式的记忆上下文"""
         mode_config = self.AI_MODES.get(mode, self.AI_MODES.get("自定义"))
@@ -282,11 +333,12 @@ class AIService(QObject):
         else:
             enhanced_prompt = f"{system_prompt}\n\n{user_prompt}"
 
-        if hasattr(self, "_memory_context") and self._memory_context:
+        memory_context = self._get_memory_context(user_prompt, mode)
+        if memory_context:
             memory_prompt = f"""
             以下是用户之前创建的备忘录内容，你可以参考这些内容来更好地理解用户的需求和风格:
             
-            {self._memory_context}
+            {memory_context}
             
             请基于以上内容，更好地理解用户的风格和偏好。在大多数情况下，不要直接引用这些内容。
 但如果用户明确要求引用或者上下文高度相关时，可以适当引用，但需要明确指出这是来自用户之前的笔记。
@@ -305,74 +357,154 @@ class AIService(QObject):
         except Exception as e:
             raise Exception(f"AI 处理出错: {str(e)}")
 
-    def generate_content(self, prompt, mode="generate", aux_prompt=""):
-        """生成内容"""
-        try:
-            self._init_api_client()
-
-            if not self.client:
-                error_msg = "AI服务未初始化，请在设置中配置有效的API密钥"
-                self.errorOccurred.emit(error_msg)
-                return error_msg
-
-            mode_config = self.AI_MODES.get(mode, self.AI_MODES.get("自定义"))
-            system_prompt = mode_config["system_prompt"]
+    def _prepare_request(self, prompt, mode, aux_prompt=""):
+        """组装请求，返回 (模型, 模型ID, 消息列表)"""
+        mode_config = self.AI_MODES.get(mode, self.AI_MODES.get("自定义"))
+        system_prompt = mode_config["system_prompt"]
 
-            if hasattr(self, "_memory_context"):
-                if self._memory_context:
-                    memory_prompt = f"""
+        memory_context = self._get_memory_context(prompt, mode)
+        if memory_context:
+            memory_prompt = f"""
 以下是用户之前创建的备忘录内容，你可以参考这些内容来更好地理解用户的需求和风格:
 
-{self._memory_context}
+{memory_context}
 
 请基于以上内容，更好地理解用户的风格和偏好。在大多数情况下，不要直接引用这些内容。
 但如果用户明确要求引用或者上下文高度相关时，可以适当引用，但需要明确指出这是来自用户之前的笔记。
 """
-                    system_prompt = f"{memory_prompt}\n\n{system_prompt}"
-
-            if mode == "续写":
-                full_prompt = f"{prompt}"
-                if aux_prompt:
-                    full_prompt += f"\n\n额外要求：{aux_prompt}"
-            elif mode == "润色":
-                full_prompt = f"{prompt}"
-                if aux_prompt:
-                    full_prompt += f"\n\n额外要求：{aux_prompt}"
-            elif mode in ["朋友圈文案", "一句诗"]:
-                full_prompt = f"备忘录内容：{prompt}"
-                if aux_prompt:
-                    full_prompt += f"\n\n额外要求：{aux_prompt}"
-            else:
-                full_prompt = prompt
+            system_prompt = f"{memory_prompt}\n\n{system_prompt}"
 
-            model = cfg.get(cfg.aiModel)
-            model_config = self.MODEL_CONFIGS.get(model, {})
+        if mode == "续写":
+            full_prompt = f"{prompt}"
+            if aux_prompt:
+                full_prompt += f"\n\n额外要求：{aux_prompt}"
+        elif mode == "润色":
+            full_prompt = f"{prompt}"
+            if aux_prompt:
+                full_prompt += f"\n\n额外要求：{aux_prompt}"
+        elif mode in ["朋友圈文案", "一句诗"]:
+            full_prompt = f"备忘录内容：{prompt}"
+            if aux_prompt:
+                full_prompt += f"\n\n额外要求：{aux_prompt}"
+        else:
+            full_prompt = prompt
 
-            messages = []
+        model = cfg.get(cfg.aiModel)
+        model_config = self.MODEL_CONFIGS.get(model, {})
+        model_id = model_config.get("model_id") if model_config else model
 
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
+        messages = []
 
-            messages.append({"role": "user", "content": full_prompt})
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
 
-            model_id = model_config.get("model_id") if model_config else model
+        messages.append({"role": "user", "content": full_prompt})
+
+        return model, model_id, messages
+
+    def _get_response_cache(self, mode, use_cache):
+        """use_cache 为 None 时只缓存 CACHED_MODES 中的模式，True/False 强制使用或跳过缓存"""
+        if use_cache is None:
+            use_cache = mode in self.CACHED_MODES
+        return get_ai_cache() if use_cache else None
+
+    def _cache_key(self, model_id, mode, messages, aux_prompt):
+        system_prompt = messages[0]["content"] if len(messages) > 1 else ""
+        # 按当前登录用户区分缓存，不同用户的相同请求不共用响应
+        memory = getattr(self, "_memory", None)
+        user_id = memory.user_id if memory is not None else None
+        return make_cache_key(user_id, model_id, mode, system_prompt,
+                              messages[-1]["content"], aux_prompt,
+                              self.TEMPERATURE)
+
+    def generate_content(self, prompt, mode="generate", aux_prompt="",
+                         use_cache=None, raise_errors=False):
+        """生成内容
+
+        use_cache 为 None 时只缓存 CACHED_MODES 中的模式，True/False 强制使用或跳过缓存。
+        出错时默认返回错误信息文本；raise_errors 为 True 时抛出 AIServiceError，
+        通过调度器执行的请求使用这种方式，使错误经由请求的 error 信号发出。
+        """
+        try:
+            self._init_api_client()
+
+            if not self.client:
+                error_msg = "AI服务未初始化，请在设置中配置有效的API密钥"
+                self.errorOccurred.emit(error_msg)
+                if raise_errors:
+                    raise AIServiceError(error_msg)
+                return error_msg
+
+            model, model_id, messages = self._prepare_request(
+                prompt, mode, aux_prompt)
+
+            cache = self._get_response_cache(mode, use_cache)
+            if cache is not None:
+                cache_key = self._cache_key(model_id, mode, messages,
+                                            aux_prompt)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
 
             response = self.client.chat.completions.create(
                 model=model_id,
                 messages=messages,
-                temperature=0.7,
+                temperature=self.TEMPERATURE,
                 max_tokens=self._get_max_tokens(model),
             )
 
             generated_content = response.choices[0].message.content
 
+            if cache is not None and generated_content:
+                cache.put(cache_key, generated_content)
+
             return generated_content
 
+        except AIServiceError:
+            raise
         except Exception as e:
             error_msg = f"AI处理出错: {str(e)}"
             self.errorOccurred.emit(error_msg)
+            if raise_errors:
+                raise AIServiceError(error_msg) from e
             return error_msg
 
+    def stream_text(self, prompt, mode="generate", aux_prompt="",
+                    use_cache=None):
+        """逐块产生流式响应的文本，生成器关闭时同时关闭 HTTP 响应
+
+        命中缓存时把缓存的文本作为一个文本块返回；未命中时在完整接收后写入缓存，
+        中途取消的响应不写入。
+        """
+        model, model_id, messages = self._prepare_request(
+            prompt, mode, aux_prompt)
+
+        cache = self._get_response_cache(mode, use_cache)
+        if cache is not None:
+            cache_key = self._cache_key(model_id, mode, messages, aux_prompt)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        stream = self._create_stream(model, model_id, messages)
+        parts = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = getattr(chunk.choices[0].delta, "content", None)
+                if content:
+                    parts.append(content)
+                    yield content
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+        if cache is not None and parts:
+            cache.put(cache_key, "".join(parts))
+
     def _call_deepseek_api(self, prompt, system_prompt="你是一个有用的助手，擅长文字创作和润色。"):
         """调用 AI API"""
         try:
@@ -443,57 +575,21 @@ class AIService(QObject):
 
     def generate_content_stream(self, prompt, mode="generate", aux_prompt=""):
         """使用流式响应生成内容，适用于实时显示生成过程"""
-        try:
-            mode_config = self.AI_MODES.get(mode, self.AI_MODES.get("自定义"))
-            system_prompt = mode_config["system_prompt"]
-
-            if hasattr(self, "_memory_context") and self._memory_context:
-                memory_prompt = f"""
-以下是用户之前创建的备忘录内容，你可以参考这些内容来更好地理解用户的需求和风格:
-
-{self._memory_context}
-
-请基于以上内容，更好地理解用户的风格和偏好。在大多数情况下，不要直接引用这些内容。
-但如果用户明确要求引用或者上下文高度相关时，可以适当引用，但需要明确指出这是来自用户之前的笔记。
-"""
-                system_prompt = f"{memory_prompt}\n\n{system_prompt}"
-
-            if mode == "续写":
-                full_prompt = f"{prompt}"
-                if aux_prompt:
-                    full_prompt += f"\n\n额外要求：{aux_prompt}"
-            elif mode == "润色":
-                full_prompt = f"{prompt}"
-                if aux_prompt:
-                    full_prompt += f"\n\n额外要求：{aux_prompt}"
-            elif mode in ["朋友圈文案", "一句诗"]:
-                full_prompt = f"备忘录内容：{prompt}"
-                if aux_prompt:
-                    full_prompt += f"\n\n额外要求：{aux_prompt}"
-            else:
-                full_prompt = prompt
+        model, model_id, messages = self._prepare_request(
+            prompt, mode, aux_prompt)
+        return self._create_stream(model, model_id, messages)
 
-            if not self.client:
-                self._init_api_client()
+    def _create_stream(self, model, model_id, messages):
+        try:
+            self._init_api_client()
 
             if not self.client:
                 raise Exception("API 客户端未初始化，请检查API密钥配置")
 
-            messages = []
-
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-
-            messages.append({"role": "user", "content": full_prompt})
-
-            model = cfg.get(cfg.aiModel)
-            model_config = self.MODEL_CONFIGS.get(model, {})
-            model_id = model_config.get("model_id") if model_config else model
-
             stream = self.client.chat.completions.create(
                 model=model_id,
                 messages=messages,
-                temperature=0.7,
+                temperature=self.TEMPERATURE,
                 max_tokens=self._get_max_tokens(model),
                 stream=True,
             )
@@ -506,47 +602,12 @@ class AIService(QObject):
             raise Exception(error_msg)
 
 
-class AIWorkerThread(QThread):
-    """统一的AI工作线程"""
-
-    resultReady = pyqtSignal(str)
-    chunkReceived = pyqtSignal(str)
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-
-    def __init__(self, ai_service, mode, text, streaming=False):
-        super().__init__()
-        self.ai_service = ai_service
-        self.mode = mode
-        self.text = text
-        self.streaming = streaming
-        self._stop_requested = False
-
-    def run(self):
-        try:
-            if self.streaming:
-                stream = self.ai_service.generate_content_stream(
-                    self.text, self.mode)
-                full_response = ""
-
-                for chunk in stream:
-                    if self._stop_requested:
-                        break
-
-                    if hasattr(chunk.choices[0].delta, "content"):
-                        content = chunk.choices[0].delta.content
-                        if content:
-                            full_response += content
-                            self.chunkReceived.emit(content)
-
-                if not self._stop_requested:
-                    self.finished.emit()
-            else:
-                result = self.ai_service.generate_content(self.text, self.mode)
-                self.resultReady.emit(result)
+_service = None
 
-        except Exception as e:
-            self.error.emit(str(e))
 
-    def stop(self):
-        self._stop_requested = True
+def get_ai_service():
+    """获取进程内共享的 AIService（首次调用需在主线程中）"""
+    global _service
+    if _service is None:
+        _service = AIService()
+    return _service
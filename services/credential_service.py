@@ -0,0 +1,105 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from config import cfg
+from Database import DatabaseManager
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class _CredentialTask(QRunnable):
+    """在线程池中执行一次耗时的密码计算"""
+
+    def __init__(self, func, *args):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+class CredentialService(QObject):
+    """登录、注册和修改密码服务
+
+    PBKDF2 哈希计算耗时数百毫秒，这里把它们放到线程池中执行，
+    完成后通过信号在界面线程返回结果，界面不会卡顿。
+    """
+
+    loginFinished = pyqtSignal(object)  # 用户信息字典，验证失败为 None
+    registerFinished = pyqtSignal(bool, str)  # (是否成功, 用户名)
+    passwordChangeFinished = pyqtSignal(bool, str)  # (是否成功, 失败原因)
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self._tasks = set()  # 保持任务引用，直到结果送达
+
+    def login(self, username, password):
+        self._start(self._login, self.loginFinished.emit, username, password)
+
+    def register(self, username, password):
+        self._start(
+            self._register,
+            lambda success: self.registerFinished.emit(success, username),
+            username,
+            password,
+        )
+
+    def change_password(self, user_id, username, old_password, new_password):
+        self._start(
+            self._change_password,
+            lambda result: self.passwordChangeFinished.emit(*result),
+            user_id,
+            username,
+            old_password,
+            new_password,
+        )
+
+    def _start(self, func, on_finished, *args):
+        task = _CredentialTask(func, *args)
+        self._tasks.add(task)
+
+        def finished(result):
+            self._tasks.discard(task)
+            on_finished(result)
+
+        def failed(message):
+            self._tasks.discard(task)
+            print(f"密码操作出错: {message}")
+            self.error.emit(message)
+
+        task.signals.finished.connect(finished)
+        task.signals.failed.connect(failed)
+        self.pool.start(task)
+
+    # 以下方法在线程池中执行
+
+    @staticmethod
+    def _database():
+        db = DatabaseManager()
+        db.password_iterations = cfg.get(cfg.passwordIterations)
+        return db
+
+    def _login(self, username, password):
+        return self._database().account_login(username, password)
+
+    def _register(self, username, password):
+        return self._database().create_user(username, password)
+
+    def _change_password(self, user_id, username, old_password, new_password):
+        db = self._database()
+        if not db.check_password(username, old_password):
+            return False, "旧密码错误"
+        if not db.update_user(user_id, password=new_password):
+            return False, "更新密码失败"
+        return True, ""
@@ -0,0 +1,136 @@
+import os
+import threading
+import urllib.request
+
+import cv2
+import numpy as np
+
+from Database import resource_path
+from services.face_gallery import EMBEDDING_DIM
+
+MODEL_FILE = "faceRecognition/models/openface_nn4.small2.v1.t7"
+MODEL_URL = "https://github.com/pyannote/pyannote-data/raw/master/openface.nn4.small2.v1.t7"
+INPUT_SIZE = (96, 96)
+
+
+class FaceEmbedder:
+    """OpenFace 人脸特征提取引擎
+
+    模型只在第一次使用时加载一次，之后人脸登录和人脸录入共用同一个网络；
+    多张人脸通过 blobFromImages 合成一个批次，一次前向计算得到全部特征。
+    cv2.dnn 的网络对象不能并发调用，前向计算通过锁串行执行。
+    """
+
+    def __init__(self, model_file=MODEL_FILE):
+        self.model_file = resource_path(model_file)
+        self._net = None
+        self._load_lock = threading.Lock()
+        self._forward_lock = threading.Lock()
+        self._warmup_thread = None
+
+    @property
+    def is_loaded(self):
+        return self._net is not None
+
+    @property
+    def is_downloaded(self):
+        return os.path.exists(self.model_file)
+
+    def load(self):
+        """加载模型（模型文件不存在时先下载），已加载时直接返回"""
+        if self._net is not None:
+            return self._net
+
+        with self._load_lock:
+            if self._net is None:
+                if not os.path.exists(self.model_file):
+                    os.makedirs(os.path.dirname(self.model_file), exist_ok=True)
+                    print("需要下载人脸识别模型，这可能需要一些时间...")
+                    # 先下载到临时文件，避免下载中断后留下不完整的模型
+                    urllib.request.urlretrieve(MODEL_URL,
+                                               self.model_file + ".part")
+                    os.replace(self.model_file + ".part", self.model_file)
+                self._net = cv2.dnn.readNetFromTorch(self.model_file)
+        return self._net
+
+    def warm_up(self, background=True):
+        """预先加载模型并执行一次前向计算，默认在后台线程中进行"""
+        if background:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = threading.Thread(target=self._warm_up,
+                                                       daemon=True)
+                self._warmup_thread.start()
+            return
+        self._warm_up()
+
+    def _warm_up(self):
+        try:
+            self.embed([np.zeros(INPUT_SIZE + (3, ), dtype=np.uint8)])
+        except Exception as e:
+            print(f"预加载人脸识别模型失败: {e}")
+
+    def embed(self, face_images, batch_size=None):
+        """提取一组人脸图像的特征，返回 (图像数, 特征维度) 的 float32 矩阵
+
+        空图像会被跳过，返回的行只对应有效的图像。
+        batch_size 为每次前向计算的图像数，默认所有图像一次完成。
+        """
+        images = [image for image in face_images
+                  if image is not None and image.size > 0]
+        if not images:
+            return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+        net = self.load()
+        batch_size = batch_size or len(images)
+        batches = []
+        for start in range(0, len(images), batch_size):
+            batch = images[start:start + batch_size]
+            blob = cv2.dnn.blobFromImages(batch, 1.0 / 255, INPUT_SIZE,
+                                          (0, 0, 0), swapRB=True, crop=False)
+            with self._forward_lock:
+                net.setInput(blob)
+                features = net.forward()
+            batches.append(
+                np.asarray(features, dtype=np.float32).reshape(len(batch), -1))
+        return np.concatenate(batches)
+
+    def embed_one(self, face_image):
+        """提取单张人脸图像的特征向量"""
+        features = self.embed([face_image])
+        return features[0] if len(features) else None
+
+
+def build_template(features, method):
+    """由多条录入特征生成单个模板向量
+
+    method 为 "mean"（平均后归一化）或 "medoid"（与其余样本距离之和最小的样本），
+    其他取值返回 None。
+    """
+    features = np.asarray(features, dtype=np.float32)
+    if not len(features):
+        return None
+
+    if method == "mean":
+        template = features.mean(axis=0)
+        norm = np.linalg.norm(template)
+        # OpenFace 特征是单位向量，模板同样归一化以保持距离尺度一致
+        return template / norm if norm > 0 else template
+    if method == "medoid":
+        distances = np.linalg.norm(features[:, None, :] - features[None, :, :],
+                                   axis=2)
+        return features[int(np.argmin(distances.sum(axis=1)))].copy()
+    return None
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_face_embedder():
+    """获取进程内共享的人脸特征提取引擎"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = FaceEmbedder()
+    return _embedder
@@ -0,0 +1,151 @@
+import json
+import struct
+import threading
+
+import numpy as np
+
+# OpenFace nn4.small2 输出的特征维度
+EMBEDDING_DIM = 128
+
+
+# 二进制格式：8字节头（版本、数据类型、标志位、保留、维度、样本数）
+# + 模板向量（有模板时）+ 全部样本向量，按行连续存放
+EMBEDDING_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<BBBxHH")
+_DTYPES = {1: np.dtype("<f2"), 2: np.dtype("<f4")}
+_DTYPE_CODES = {dtype: code for code, dtype in _DTYPES.items()}
+_FLAG_TEMPLATE = 0x01
+
+# 默认以半精度保存，距离误差约千分之一，远小于匹配阈值
+STORAGE_DTYPE = np.dtype("<f2")
+
+
+def encode_embeddings(features, template=None, dtype=STORAGE_DTYPE):
+    """把录入的人脸特征编码为数据库中保存的二进制数据"""
+    dtype = np.dtype(dtype).newbyteorder("<")
+    samples = np.asarray(features, dtype=dtype).reshape(-1, EMBEDDING_DIM)
+    flags = 0
+    parts = []
+    if template is not None:
+        flags |= _FLAG_TEMPLATE
+        parts.append(np.asarray(template, dtype=dtype).tobytes())
+    parts.append(samples.tobytes())
+
+    header = _HEADER.pack(EMBEDDING_FORMAT_VERSION, _DTYPE_CODES[dtype], flags,
+                          samples.shape[1], samples.shape[0])
+    return header + b"".join(parts)
+
+
+def decode_embeddings(face_data):
+    """把数据库中保存的人脸特征解码为 (样本数, 维度) 的矩阵
+
+    二进制数据通过 np.frombuffer 直接读取，不复制。保存了模板时只返回模板，
+    人脸库中每个用户只占一行。仍兼容旧的 JSON 文本格式。
+    """
+    if isinstance(face_data, str):
+        samples, template = _parse_json_embeddings(face_data)
+        return samples if template is None else template.reshape(1, -1)
+
+    if len(face_data) < _HEADER.size:
+        raise ValueError("人脸特征数据不完整")
+    version, code, flags, dim, count = _HEADER.unpack_from(face_data)
+    if version != EMBEDDING_FORMAT_VERSION or code not in _DTYPES:
+        raise ValueError(f"不支持的人脸特征格式: 版本 {version}, 类型 {code}")
+
+    dtype = _DTYPES[code]
+    if flags & _FLAG_TEMPLATE:
+        count = 1
+    return np.frombuffer(face_data, dtype, count * dim,
+                         _HEADER.size).reshape(count, dim)
+
+
+def upgrade_embeddings(face_data, dtype=STORAGE_DTYPE):
+    """把旧的 JSON 文本格式转换为二进制格式"""
+    samples, template = _parse_json_embeddings(face_data)
+    return encode_embeddings(samples, template, dtype)
+
+
+def _parse_json_embeddings(face_data):
+    """解析旧格式（特征列表，或 {"template": 模板, "samples": 特征列表}），
+    返回 (样本矩阵, 模板或 None)"""
+    data = json.loads(face_data)
+    template = None
+    if isinstance(data, dict):
+        template = np.asarray(data["template"], dtype=np.float32)
+        data = data["samples"]
+    samples = np.asarray(data, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+    return samples, template
+
+
+class FaceGallery:
+    """已录入人脸特征的内存库
+
+    所有用户的特征只解码一次，按行拼接为连续的 float32 矩阵，
+    并用等长的数组记录每一行所属的用户。匹配时一次矩阵运算得到
+    到全部样本的距离，再取最小值，不再逐个用户、逐条特征循环。
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        self._usernames = {}  # user_id -> 用户名
+        self._lock = threading.Lock()
+        # (特征矩阵, 每行的平方范数, 每行的用户ID)，整体替换，匹配时无需加锁
+        self._state = (
+            np.empty((0, dim), dtype=np.float32),
+            np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.int64),
+        )
+
+    def __len__(self):
+        return len(self._usernames)
+
+    def __contains__(self, user_id):
+        return user_id in self._usernames
+
+    @property
+    def sample_count(self):
+        return len(self._state[2])
+
+    def set_user(self, user_id, username, features):
+        """添加或替换一个用户的全部特征"""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            self._usernames[user_id] = username
+            matrix, norms, user_ids = self._state
+            keep = user_ids != user_id
+            self._state = (
+                np.concatenate((matrix[keep], features)),
+                np.concatenate((norms[keep], np.einsum("ij,ij->i", features,
+                                                       features))),
+                np.concatenate((user_ids[keep],
+                                np.full(len(features), user_id,
+                                        dtype=np.int64))),
+            )
+
+    def remove_user(self, user_id):
+        with self._lock:
+            if user_id not in self._usernames:
+                return
+            matrix, norms, user_ids = self._state
+            keep = user_ids != user_id
+            self._state = (matrix[keep], norms[keep], user_ids[keep])
+            del self._usernames[user_id]
+
+    def rename_user(self, user_id, username):
+        with self._lock:
+            if user_id in self._usernames:
+                self._usernames[user_id] = username
+
+    def match(self, feature):
+        """返回与特征最接近的 (用户ID, 用户名, 欧氏距离)，库为空时返回 None"""
+        matrix, norms, user_ids = self._state
+        if not len(user_ids):
+            return None
+
+        feature = np.asarray(feature, dtype=np.float32).reshape(self.dim)
+        # |a - b|^2 = |a|^2 - 2a·b + |b|^2，矩阵向量乘法一次算出全部距离
+        distances = norms - 2.0 * (matrix @ feature)
+        best = int(np.argmin(distances))
+        distance = float(np.sqrt(max(distances[best] + feature @ feature, 0.0)))
+        user_id = int(user_ids[best])
+        return user_id, self._usernames.get(user_id), distance
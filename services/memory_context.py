@@ -0,0 +1,87 @@
+import math
+import threading
+
+from services.search_index import _CJK_PATTERN
+
+# 备忘录之间的分隔符
+SEPARATOR = "\n---\n"
+
+
+def estimate_tokens(text):
+    """粗略估计文本的 token 数：中文每字约 1 个，其他字符每 4 个约 1 个"""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+SEPARATOR_TOKENS = estimate_tokens(SEPARATOR)
+
+
+class MemoryContext:
+    """AI 记忆上下文
+
+    为提示词挑选用户的相关笔记。每条备忘录的上下文文本和 token 估计只在其
+    修改时间变化时重新生成（刷新时只读取 ID 和修改时间），
+    相关度使用数据库维护的 BM25 检索索引，结果不超过 token 预算。
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._entries = {}  # memo_id -> (修改时间, 上下文文本, token 数)
+        self._index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def refresh(self, db):
+        """同步备忘录的增删改，返回重新生成的条目数"""
+        versions = db.get_memo_versions(self.user_id)
+        changed = [
+            memo_id for memo_id, modified_time in versions.items()
+            if self._entries.get(memo_id, (None, ))[0] != modified_time
+        ]
+
+        rows = db.get_memos_by_ids(changed)
+        updates = {}
+        for memo, (title, content) in zip(rows, db.decrypt_memos(rows)):
+            text = f"标题: {title}\n分类: {memo[6]}\n内容: {content}\n"
+            updates[memo[0]] = (memo[3], text, estimate_tokens(text))
+        index = db.get_search_index(self.user_id)
+
+        with self._lock:
+            for memo_id in set(self._entries) - set(versions):
+                del self._entries[memo_id]
+            self._entries.update(updates)
+            self._index = index
+        return len(updates)
+
+    def build(self, prompt="", max_tokens=2000):
+        """按与提示词的相关度挑选笔记，其余预算用最近修改的笔记补足"""
+        with self._lock:
+            entries = dict(self._entries)
+            index = self._index
+
+        ranked = index.related(prompt) if index is not None and prompt else []
+        recent = sorted(entries, key=lambda memo_id: entries[memo_id][0],
+                        reverse=True)
+
+        parts = []
+        used = 0
+        selected = set()
+        for memo_id in ranked + recent:
+            if memo_id in selected or memo_id not in entries:
+                continue
+            _, text, tokens = entries[memo_id]
+            if parts:
+                tokens += SEPARATOR_TOKENS
+            # 放不下的笔记跳过，继续尝试更短的
+            if used + tokens > max_tokens:
+                continue
+            parts.append(text)
+            selected.add(memo_id)
+            used += tokens
+            if used >= max_tokens:
+                break
+        return SEPARATOR.join(parts)
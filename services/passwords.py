@@ -0,0 +1,61 @@
+import base64
+import hashlib
+import hmac
+import secrets
+
+# 新哈希格式："pbkdf2$迭代次数$盐$哈希"，迭代次数随哈希一起保存
+HASH_SCHEME = "pbkdf2"
+DEFAULT_ITERATIONS = 600000
+SALT_SIZE = 16
+HASH_SIZE = 32
+
+# 旧格式 "盐:哈希" 使用的参数
+LEGACY_ITERATIONS = 100000
+LEGACY_HASH_SIZE = 64
+
+
+def hash_password(password, iterations=None):
+    """计算密码哈希，返回 "pbkdf2$迭代次数$盐$哈希" 格式的字符串"""
+    iterations = iterations or DEFAULT_ITERATIONS
+    salt = secrets.token_bytes(SALT_SIZE)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt,
+                                 iterations, dklen=HASH_SIZE)
+    salt_b64 = base64.b64encode(salt).decode("utf-8")
+    hash_b64 = base64.b64encode(digest).decode("utf-8")
+    return f"{HASH_SCHEME}${iterations}${salt_b64}${hash_b64}"
+
+
+def _parse(stored_password):
+    """解析存储的哈希，返回 (迭代次数, 盐, 哈希)，格式错误时返回 None"""
+    try:
+        if stored_password.startswith(HASH_SCHEME + "$"):
+            _, iterations, salt_b64, hash_b64 = stored_password.split("$")
+            iterations = int(iterations)
+        else:
+            # 兼容旧格式
+            salt_b64, hash_b64 = stored_password.split(":")
+            iterations = LEGACY_ITERATIONS
+        return (iterations, base64.b64decode(salt_b64),
+                base64.b64decode(hash_b64))
+    except (AttributeError, ValueError):
+        return None
+
+
+def verify_password(password, stored_password):
+    """验证密码是否与存储的哈希匹配（支持新旧两种格式）"""
+    parsed = _parse(stored_password)
+    if parsed is None:
+        return False
+
+    iterations, salt, stored_hash = parsed
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt,
+                                 iterations, dklen=len(stored_hash))
+    return hmac.compare_digest(digest, stored_hash)
+
+
+def needs_rehash(stored_password, iterations=None):
+    """判断哈希是否需要按当前参数重新计算（旧格式或迭代次数偏低）"""
+    parsed = _parse(stored_password)
+    if parsed is None or not stored_password.startswith(HASH_SCHEME + "$"):
+        return True
+    return parsed[0] < (iterations or DEFAULT_ITERATIONS)
@@ -0,0 +1,256 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+# 中日韩统一表意文字及常用扩展区、日文假名、韩文音节
+_CJK_RANGES = ("\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff"
+               "\uac00-\ud7af\uf900-\ufaff")
+_TOKEN_PATTERN = re.compile(rf"[{_CJK_RANGES}]+|[^\W_{_CJK_RANGES}]+")
+_CJK_PATTERN = re.compile(rf"[{_CJK_RANGES}]")
+
+# 字段权重：标题 > 分类 > 内容
+FIELD_WEIGHTS = {"title": 3, "category": 2, "content": 1}
+
+
+def _is_cjk(token):
+    return bool(_CJK_PATTERN.match(token))
+
+
+def tokenize(text):
+    """把文本切分为索引词项
+
+    中文等无空格文字按单字和相邻双字（bigram）切分，
+    其他文字按单词切分并统一转为小写。
+    """
+    if not text:
+        return []
+
+    terms = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if _is_cjk(run):
+            terms.extend(run)
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
+
+
+def tokenize_query(text):
+    """把查询切分为词项，返回 [(词项, 是否前缀匹配), ...]
+
+    中文片段使用双字词项（单字片段使用单字），保证检索结果包含整个片段；
+    非中文单词按前缀匹配，输入一半的单词也能命中。
+    """
+    if not text:
+        return []
+
+    terms = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if _is_cjk(run):
+            if len(run) == 1:
+                terms.append((run, False))
+            else:
+                terms.extend((run[i:i + 2], False)
+                             for i in range(len(run) - 1))
+        else:
+            terms.append((run, True))
+    return terms
+
+
+class MemoSearchIndex:
+    """备忘录全文检索的内存倒排索引
+
+    索引只保存在内存中（登录后由解密数据重建），不会把明文写入磁盘；
+    之后随备忘录的创建、修改、删除增量更新。检索结果按 BM25 打分排序。
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings = {}  # 词项 -> {memo_id: 加权词频}
+        self._doc_terms = {}  # memo_id -> {词项: 加权词频}
+        self._doc_lengths = {}  # memo_id -> 加权文档长度
+        self._total_length = 0
+        self._vocabulary = []  # 排序后的词表，用于前缀匹配
+        self._vocabulary_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def __contains__(self, memo_id):
+        return memo_id in self._doc_terms
+
+    def add(self, memo_id, title, content, category):
+        """添加或替换一条备忘录的索引"""
+        weighted = Counter()
+        for field, text in (("title", title), ("content", content),
+                            ("category", category)):
+            weight = FIELD_WEIGHTS[field]
+            for term, freq in Counter(tokenize(text)).items():
+                weighted[term] += freq * weight
+
+        with self._lock:
+            self._remove_locked(memo_id)
+
+            for term, freq in weighted.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._vocabulary_dirty = True
+                postings[memo_id] = freq
+
+            length = sum(weighted.values())
+            self._doc_terms[memo_id] = dict(weighted)
+            self._doc_lengths[memo_id] = length
+            self._total_length += length
+
+    def remove(self, memo_id):
+        """从索引中删除一条备忘录"""
+        with self._lock:
+            self._remove_locked(memo_id)
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0
+            self._vocabulary = []
+            self._vocabulary_dirty = False
+
+    def search(self, query, limit=None):
+        """检索备忘录，返回按相关度从高到低排序的 memo_id 列表
+
+        查询中的所有词项都必须命中（AND 语义），非中文单词按前缀匹配。
+        """
+        query_terms = tokenize_query(query)
+        if not query_terms:
+            return []
+
+        with self._lock:
+            # 每个查询词项展开为若干索引词项（前缀匹配时可能有多个）
+            expanded = []
+            for term, is_prefix in query_terms:
+                matches = (self._prefix_terms(term)
+                           if is_prefix else [term] if term in self._postings
+                           else [])
+                if not matches:
+                    return []
+                expanded.append(matches)
+
+            candidates = None
+            # 先处理命中文档最少的词项，尽早缩小候选集
+            for matches in sorted(expanded, key=self._match_count):
+                docs = set()
+                for term in matches:
+                    docs.update(self._postings[term])
+                candidates = docs if candidates is None else candidates & docs
+                if not candidates:
+                    return []
+
+            doc_count = len(self._doc_terms)
+            avg_length = self._total_length / doc_count if doc_count else 1
+            k1, b = self.K1, self.B
+            doc_lengths = self._doc_lengths
+            norms = {
+                memo_id: k1 * (1 - b + b * doc_lengths[memo_id] / avg_length)
+                for memo_id in candidates
+            }
+            scores = dict.fromkeys(candidates, 0.0)
+            for matches in expanded:
+                for term in matches:
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) /
+                                   (len(postings) + 0.5))
+                    if len(postings) < len(candidates):
+                        hits = ((memo_id, freq)
+                                for memo_id, freq in postings.items()
+                                if memo_id in candidates)
+                    else:
+                        hits = ((memo_id, postings[memo_id])
+                                for memo_id in candidates
+                                if memo_id in postings)
+                    for memo_id, freq in hits:
+                        scores[memo_id] += idf * freq * (k1 + 1) / (
+                            freq + norms[memo_id])
+
+        if limit:
+            return heapq.nsmallest(limit,
+                                   scores,
+                                   key=lambda memo_id:
+                                   (-scores[memo_id], memo_id))
+        return sorted(scores, key=lambda memo_id: (-scores[memo_id], memo_id))
+
+    def related(self, text, limit=None, max_terms=64):
+        """按与一段文本的相关度排序备忘录（OR 语义），返回 memo_id 列表
+
+        用于为 AI 提示词挑选相关的笔记：文本中的词项只要命中一个即参与打分，
+        文本较长时只使用文档频率最低（区分度最高）的 max_terms 个词项。
+        """
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+
+        with self._lock:
+            terms = [term for term in terms if term in self._postings]
+            if len(terms) > max_terms:
+                terms = heapq.nsmallest(
+                    max_terms, terms, key=lambda t: (len(self._postings[t]), t))
+
+            doc_count = len(self._doc_terms)
+            avg_length = self._total_length / doc_count if doc_count else 1
+            k1, b = self.K1, self.B
+            scores = {}
+            for term in terms:
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) /
+                               (len(postings) + 0.5))
+                for memo_id, freq in postings.items():
+                    norm = k1 * (1 - b +
+                                 b * self._doc_lengths[memo_id] / avg_length)
+                    scores[memo_id] = scores.get(memo_id, 0.0) + idf * freq * (
+                        k1 + 1) / (freq + norm)
+
+        if limit:
+            return heapq.nsmallest(limit,
+                                   scores,
+                                   key=lambda memo_id:
+                                   (-scores[memo_id], memo_id))
+        return sorted(scores, key=lambda memo_id: (-scores[memo_id], memo_id))
+
+    def _remove_locked(self, memo_id):
+        terms = self._doc_terms.pop(memo_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(memo_id, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_dirty = True
+
+        self._total_length -= self._doc_lengths.pop(memo_id, 0)
+
+    def _prefix_terms(self, prefix):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        terms = []
+        index = bisect_left(self._vocabulary, prefix)
+        while (index < len(self._vocabulary)
+               and self._vocabulary[index].startswith(prefix)):
+            terms.append(self._vocabulary[index])
+            index += 1
+        return terms
+
+    def _match_count(self, matches):
+        return sum(len(self._postings[term]) for term in matches)
@@ -0,0 +1,68 @@
+"""测试共用的夹具"""
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+# 引入迁移框架之前的表结构（未记录 user_version）
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    face_data TEXT,
+    avatar TEXT,
+    register_time DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+CREATE TABLE memos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    created_time DATETIME DEFAULT (datetime('now', 'localtime')),
+    modified_time DATETIME DEFAULT (datetime('now', 'localtime')),
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    category TEXT,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE TRIGGER update_memo_time
+AFTER UPDATE ON memos
+BEGIN
+    UPDATE memos SET modified_time = datetime('now', 'localtime') WHERE id = OLD.id;
+END;
+CREATE TABLE todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    deadline DATETIME NOT NULL,
+    category TEXT DEFAULT '未分类',
+    is_done BOOLEAN DEFAULT FALSE,
+    is_pinned BOOLEAN DEFAULT 0,
+    created_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+    completed_time DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+CREATE TABLE tags (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    tag_name TEXT NOT NULL,
+    created_time DATETIME DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE(user_id, tag_name)
+);
+"""
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """返回 (数据库路径, 连接)，数据库为旧版表结构，可先写入旧格式数据再打开"""
+    from Database import ConnectionPool
+
+    path = str(tmp_path / "baseline.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    yield path, conn
+    conn.close()
+    ConnectionPool.close_all()
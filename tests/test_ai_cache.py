@@ -0,0 +1,109 @@
+"""AI 响应缓存：对话框的流式生成和待办提取都应命中缓存"""
+import os
+import sys
+import time
+import types
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+import services.ai_cache as ai_cache  # noqa: E402
+import services.ai_service as ai_service  # noqa: E402
+
+
+class FakeClient:
+    """记录请求次数的假 API 客户端，流式请求逐字返回"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+        self.chat = types.SimpleNamespace(
+            completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **kwargs):
+        self.calls += 1
+        if not stream:
+            message = types.SimpleNamespace(content=self.text)
+            return types.SimpleNamespace(
+                choices=[types.SimpleNamespace(message=message)])
+        return iter(
+            types.SimpleNamespace(choices=[
+                types.SimpleNamespace(delta=types.SimpleNamespace(content=ch))
+            ]) for ch in self.text)
+
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient("润色后的文本")
+    monkeypatch.setattr(ai_service, "get_ai_client", lambda: client)
+    monkeypatch.setattr(ai_cache, "_cache", ai_cache.AIResponseCache())
+    monkeypatch.setattr(ai_cache.cfg.aiCacheEnabled, "value", True)
+    return client
+
+
+def run_dialog(app, dialog):
+    dialog.generate_content()
+    deadline = time.time() + 5
+    while dialog.request is not None and dialog.request.active:
+        assert time.time() < deadline, "生成超时"
+        app.processEvents()
+        time.sleep(0.005)
+    app.processEvents()
+    return dialog.result_text
+
+
+def test_dialog_stream_hits_cache(app, client):
+    from mainWindow.ui.components.ai_handler.ai_dialog import AIDialog
+
+    service = ai_service.AIService()
+    dialog = AIDialog("润色", "原始文本", ai_service=service)
+    assert dialog.use_streaming
+
+    assert run_dialog(app, dialog) == "润色后的文本"
+    assert client.calls == 1
+
+    assert run_dialog(app, dialog) == "润色后的文本"
+    assert client.calls == 1
+    assert dialog.result_edit.toPlainText() == "润色后的文本"
+
+
+def test_uncached_mode_bypasses_cache(app, client):
+    service = ai_service.AIService()
+    assert list(service.stream_text("原始文本", "续写")) == list("润色后的文本")
+    assert list(service.stream_text("原始文本", "续写")) == list("润色后的文本")
+    assert client.calls == 2
+
+
+def test_todo_extraction_hits_cache(app, client):
+    service = ai_service.AIService()
+    first = service.generate_content("提取待办", mode="待办提取")
+    second = service.generate_content("提取待办", mode="待办提取")
+    assert first == second == "润色后的文本"
+    assert client.calls == 1
+
+
+def test_cache_is_scoped_per_user(app, client):
+    service = ai_service.AIService()
+    service._memory = types.SimpleNamespace(user_id=1)
+    service.generate_content("提取待办", mode="待办提取")
+    service._memory = types.SimpleNamespace(user_id=2)
+    service.generate_content("提取待办", mode="待办提取")
+    assert client.calls == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ai_cache.AIResponseCache(max_bytes=10)
+    cache.put("a", "12345")
+    cache.put("b", "12345")
+    assert cache.get("a") == "12345"
+    cache.put("c", "12345")
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == "12345"
@@ -0,0 +1,73 @@
+"""AI 请求调度器：出错的请求应通过 error 信号返回"""
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+import services.ai_service as ai_service  # noqa: E402
+from services.ai_scheduler import AIScheduler  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def wait(app, request):
+    deadline = time.time() + 5
+    while request.active:
+        assert time.time() < deadline, "请求超时"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_generate_error_fires_error_signal(app, monkeypatch):
+    monkeypatch.setattr(ai_service, "get_ai_client", lambda: None)
+    scheduler = AIScheduler(1)
+    results, errors = [], []
+
+    request = scheduler.generate("文本", "润色",
+                                 ai_service=ai_service.AIService())
+    request.resultReady.connect(results.append)
+    request.error.connect(errors.append)
+    wait(app, request)
+    scheduler.shutdown()
+
+    assert results == []
+    assert errors and "API密钥" in errors[0]
+
+
+def test_shutdown_cancels_queued_and_streaming_jobs(app):
+    scheduler = AIScheduler(1)
+    release = threading.Event()
+    ran = []
+
+    def blocking():
+        release.wait(5)
+        ran.append("blocking")
+
+    def stream():
+        for i in range(1000):
+            release.wait(0.01)
+            yield str(i)
+
+    scheduler.submit(blocking)
+    streaming = scheduler.submit(stream, stream=True)
+    queued = scheduler.submit(lambda: ran.append("queued"))
+    time.sleep(0.05)
+
+    scheduler.shutdown()
+    release.set()
+    time.sleep(0.2)
+    app.processEvents()
+
+    assert "queued" not in ran
+    assert not scheduler._unfinished
+    # 退出时被取消的请求不再发出结果信号
+    assert streaming.active and queued.active
@@ -0,0 +1,48 @@
+"""人脸检测后端：YuNet 模型在后台下载，下载完成前使用 Haar"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faceRecognition.detection as detection  # noqa: E402
+
+
+class FakeHaar:
+    name = "haar"
+
+    def detect(self, image, min_size):
+        return [self.name]
+
+
+class FakeYuNet(FakeHaar):
+    name = "yunet"
+
+    def __init__(self, model_file):
+        self.model_file = model_file
+
+
+def test_yunet_downloads_in_background(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def urlretrieve(url, path):
+        release.wait(5)
+        with open(path, "wb") as f:
+            f.write(b"model")
+
+    monkeypatch.setattr(detection, "resource_path",
+                        lambda path: str(tmp_path / os.path.basename(path)))
+    monkeypatch.setattr(detection.urllib.request, "urlretrieve", urlretrieve)
+    monkeypatch.setattr(detection, "HaarFaceDetector", FakeHaar)
+    monkeypatch.setattr(detection, "YuNetFaceDetector", FakeYuNet)
+
+    # 下载未完成时立即返回，先用 Haar 检测
+    detector = detection.create_face_detector("yunet")
+    assert detector.name == "haar"
+    assert detector.detect(None, 30) == ["haar"]
+
+    release.set()
+    detection._download_thread.join(5)
+    assert detection.yunet_model_downloaded()
+    assert detector.detect(None, 30) == ["yunet"]
+    assert detector.name == "yunet"
@@ -0,0 +1,79 @@
+"""人脸特征的二进制格式：编码解码往返、兼容旧 JSON 文本，以及 v3 迁移"""
+import json
+
+import numpy as np
+import pytest
+
+from Database import DatabaseManager
+from services.face_gallery import (EMBEDDING_DIM, decode_embeddings,
+                                   encode_embeddings, upgrade_embeddings)
+
+
+def features(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(count, EMBEDDING_DIM)).astype(np.float32) * 0.1
+
+
+def test_round_trip():
+    samples = features(5)
+    data = encode_embeddings(samples)
+    assert len(data) == 8 + 5 * EMBEDDING_DIM * 2  # 默认半精度
+    decoded = decode_embeddings(data)
+    assert decoded.shape == (5, EMBEDDING_DIM)
+    assert np.allclose(decoded, samples, atol=1e-3)
+
+    data = encode_embeddings(samples, dtype="<f4")
+    assert np.array_equal(decode_embeddings(data), samples)
+
+
+def test_template_is_returned_alone():
+    samples = features(5)
+    template = samples.mean(axis=0)
+    decoded = decode_embeddings(encode_embeddings(samples, template))
+    assert decoded.shape == (1, EMBEDDING_DIM)
+    assert np.allclose(decoded[0], template, atol=1e-3)
+
+
+def test_invalid_data_is_rejected():
+    data = encode_embeddings(features(1))
+    with pytest.raises(ValueError):
+        decode_embeddings(data[:4])
+    with pytest.raises(ValueError):
+        decode_embeddings(b"\x09" + data[1:])
+
+
+def test_legacy_json_formats():
+    samples = features(3)
+    text = json.dumps(samples.tolist())
+    assert np.allclose(decode_embeddings(text), samples)
+    assert np.allclose(decode_embeddings(upgrade_embeddings(text)), samples,
+                       atol=1e-3)
+
+    template = samples.mean(axis=0)
+    text = json.dumps({"template": template.tolist(),
+                       "samples": samples.tolist()})
+    assert np.allclose(decode_embeddings(text), template[None, :])
+    assert np.allclose(decode_embeddings(upgrade_embeddings(text)),
+                       template[None, :], atol=1e-3)
+
+
+def test_v3_migrates_json_face_data(baseline_db):
+    path, conn = baseline_db
+    samples = features(4)
+    conn.executemany(
+        "INSERT INTO users (username, password, face_data) VALUES (?, '', ?)",
+        [("a", json.dumps(samples.tolist())), ("b", "不是 JSON"),
+         ("c", None)])
+    conn.commit()
+
+    db = DatabaseManager(path)
+    rows = dict(conn.execute("SELECT username, face_data FROM users"))
+    assert isinstance(rows["a"], bytes)
+    assert np.allclose(decode_embeddings(rows["a"]), samples, atol=1e-3)
+    assert rows["b"] == "不是 JSON"  # 无法解析的旧数据保持原样
+    assert rows["c"] is None
+
+    gallery = db.get_face_gallery()
+    assert 1 in gallery and 2 not in gallery
+    user_id, username, distance = gallery.match(samples[2])
+    assert (user_id, username) == (1, "a") and distance < 1e-2
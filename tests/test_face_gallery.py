@@ -0,0 +1,62 @@
+"""人脸特征库：矩阵运算的匹配结果与逐条计算一致，增删改用户后结果同步"""
+import numpy as np
+
+from services.face_gallery import EMBEDDING_DIM, FaceGallery
+
+
+def random_features(rng, count):
+    features = rng.normal(size=(count, EMBEDDING_DIM)).astype(np.float32)
+    return features / np.linalg.norm(features, axis=1, keepdims=True)
+
+
+def brute_force(users, feature):
+    best = None
+    for user_id, (username, features) in users.items():
+        for row in features:
+            distance = float(np.linalg.norm(row - feature))
+            if best is None or distance < best[2]:
+                best = (user_id, username, distance)
+    return best
+
+
+def test_match_agrees_with_brute_force():
+    rng = np.random.default_rng(0)
+    users = {user_id: (f"user{user_id}", random_features(rng, 5))
+             for user_id in range(1, 21)}
+    gallery = FaceGallery()
+    for user_id, (username, features) in users.items():
+        gallery.set_user(user_id, username, features)
+    assert len(gallery) == 20 and gallery.sample_count == 100
+
+    for probe in random_features(rng, 10):
+        user_id, username, distance = gallery.match(probe)
+        expected = brute_force(users, probe)
+        assert (user_id, username) == expected[:2]
+        assert abs(distance - expected[2]) < 1e-4
+
+    # 与某个样本几乎相同的特征匹配到对应用户，距离接近 0
+    user_id, _, distance = gallery.match(users[7][1][2] + 1e-4)
+    assert user_id == 7 and distance < 1e-2
+
+
+def test_set_remove_and_rename_user():
+    rng = np.random.default_rng(1)
+    a, b = random_features(rng, 3), random_features(rng, 3)
+    gallery = FaceGallery()
+    assert gallery.match(a[0]) is None
+
+    gallery.set_user(1, "a", a)
+    gallery.set_user(2, "b", b)
+    assert gallery.match(a[0])[0] == 1
+
+    # 重新录入时替换原有特征
+    gallery.set_user(1, "a", a[1:2])
+    assert gallery.sample_count == 4
+    assert gallery.match(a[0])[2] > 0.5
+    user_id, _, distance = gallery.match(a[1])
+    assert user_id == 1 and distance < 1e-3
+
+    gallery.rename_user(2, "bb")
+    gallery.remove_user(1)
+    assert 1 not in gallery and gallery.sample_count == 3
+    assert gallery.match(b[1])[:2] == (2, "bb")
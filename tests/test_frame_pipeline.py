@@ -0,0 +1,64 @@
+"""人脸帧处理流水线：阶段出错时跳过该帧，连续出错时停止并发出 processingError"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from faceRecognition.pipeline import FramePipeline  # noqa: E402
+
+
+class FlakyStage:
+    name = "flaky"
+
+    def __init__(self, failing):
+        self.failing = failing  # 每一帧是否出错
+        self.processed = []
+
+    def process(self, context):
+        if self.failing[len(self.processed)]:
+            self.processed.append(None)
+            raise RuntimeError("模型加载失败")
+        self.processed.append(context.frame)
+        return True
+
+
+def feed(app, pipeline, frames):
+    pipeline.start_pipeline()
+    for frame in frames:
+        pipeline.submit(frame)
+        deadline = time.time() + 2
+        while (len(pipeline.stages[0].processed) <= frames.index(frame)
+               and not pipeline.slot.closed):
+            assert time.time() < deadline
+            time.sleep(0.001)
+    pipeline.stop_pipeline()
+    app.processEvents()
+
+
+def test_single_failure_skips_frame():
+    app = QApplication.instance() or QApplication([])
+    stage = FlakyStage([False, True, False, True, False])
+    pipeline = FramePipeline([stage], max_failures=2)
+    errors = []
+    pipeline.processingError.connect(errors.append)
+
+    feed(app, pipeline, [1, 2, 3, 4, 5])
+    assert stage.processed == [1, None, 3, None, 5]
+    assert errors == []
+
+
+def test_repeated_failures_stop_pipeline():
+    app = QApplication.instance() or QApplication([])
+    stage = FlakyStage([True, True, False])
+    pipeline = FramePipeline([stage], max_failures=2)
+    errors = []
+    pipeline.processingError.connect(errors.append)
+
+    feed(app, pipeline, [1, 2, 3])
+    assert stage.processed == [None, None]
+    assert pipeline.slot.closed and not pipeline.isRunning()
+    assert errors == ["模型加载失败"]
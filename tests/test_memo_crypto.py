@@ -0,0 +1,64 @@
+"""备忘录加密：旧的 AES-CBC 文本在读取时升级为按用户密钥加密的 AES-GCM 格式"""
+import base64
+import os
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from Database import CIPHER_VERSION_AESGCM, DatabaseManager
+
+LEGACY_KEY = b"ThisIsA32ByteKeyForAES256Encrypt"
+
+
+def legacy_encrypt(text):
+    """旧版本写入的 "iv:密文" 格式（AES-256-CBC + PKCS7）"""
+    plaintext = text.encode("utf-8")
+    iv = os.urandom(16)
+    padding = 16 - len(plaintext) % 16
+    encryptor = Cipher(algorithms.AES(LEGACY_KEY), modes.CBC(iv)).encryptor()
+    ciphertext = encryptor.update(plaintext + bytes([padding]) * padding)
+    ciphertext += encryptor.finalize()
+    return (f"{base64.b64encode(iv).decode('utf-8')}:"
+            f"{base64.b64encode(ciphertext).decode('utf-8')}")
+
+
+def test_legacy_memos_are_upgraded_on_read(baseline_db):
+    path, conn = baseline_db
+    conn.execute("INSERT INTO users (username, password) VALUES ('u', 'x')")
+    conn.executemany(
+        "INSERT INTO memos (user_id, title, content, category, modified_time) "
+        "VALUES (1, ?, ?, '工作', '2024-01-01 08:00:00')",
+        [(legacy_encrypt(f"标题{i}"), legacy_encrypt(f"内容{i}"))
+         for i in range(3)])
+    conn.commit()
+
+    db = DatabaseManager(path)
+    memos = db.get_memos(1)
+    assert db.decrypt_memos(memos) == [(f"标题{i}", f"内容{i}")
+                                       for i in range(3)]
+
+    rows = conn.execute(
+        "SELECT title, content, modified_time FROM memos").fetchall()
+    for title, content, modified_time in rows:
+        assert isinstance(title, bytes) and isinstance(content, bytes)
+        assert title[0] == content[0] == CIPHER_VERSION_AESGCM
+        assert modified_time == "2024-01-01 08:00:00"
+
+    # 升级后的数据用新格式读取，清空缓存后结果不变
+    db.memo_cache.clear()
+    assert [db.decrypt_memo(memo) for memo in db.get_memos(1)] == [
+        (f"标题{i}", f"内容{i}") for i in range(3)]
+
+
+def test_ciphertext_is_bound_to_user(tmp_path):
+    db = DatabaseManager(str(tmp_path / "memo.db"))
+    with db.pool.writer() as cursor:
+        cursor.executemany("INSERT INTO users (username, password) VALUES (?, '')",
+                           [("a", ), ("b", )])
+    blob = db.encrypt_for_user(1, "秘密")
+    assert db.decrypt_for_user(1, blob) == "秘密"
+    assert db.decrypt_for_user(2, blob) == ""
+
+    # 篡改密文后校验失败
+    tampered = bytearray(blob)
+    tampered[-1] ^= 1
+    assert db.decrypt_for_user(1, bytes(tampered)) == ""
@@ -0,0 +1,73 @@
+"""备忘录分页：按标题排序在内存中完成，数据库中不保存明文标题"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from Database import ConnectionPool, DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "memo.db"))
+    with db.pool.writer() as cursor:
+        cursor.execute("INSERT INTO users (username, password) VALUES ('u', '')")
+    yield db
+    ConnectionPool.close_all()
+
+
+def collect(db, descending, limit, summary=True):
+    titles, after = [], None
+    while True:
+        rows, after = db.get_memo_page(1, "title", descending, after=after,
+                                       limit=limit, summary=summary)
+        titles.extend(db.decrypt_memo(row)[0] for row in rows)
+        if after is None:
+            return titles
+
+
+def test_title_pages_are_sorted_in_memory(db):
+    titles = ["banana", "Apple", "cherry", "apple", "Date", "elder"]
+    db.create_memos_bulk(1, [(title, "内容", "未分类") for title in titles])
+
+    expected = ["Apple", "apple", "banana", "cherry", "Date", "elder"]
+    assert collect(db, False, 4) == expected
+    assert collect(db, True, 2) == expected[::-1]
+    assert collect(db, False, 6) == expected
+
+    rows, _ = db.get_memo_page(1, "title", False, limit=2, summary=False)
+    assert [db.decrypt_memo(row) for row in rows] == [("Apple", "内容"),
+                                                      ("apple", "内容")]
+
+    db.update_memo(rows[0][0], title="zebra")
+    assert collect(db, False, 4)[-1] == "zebra"
+
+    # 数据库中只有加密后的标题
+    with db.pool.reader() as cursor:
+        cursor.execute("PRAGMA table_info(memos)")
+        assert "title_key" not in [column[1] for column in cursor.fetchall()]
+
+
+def test_title_order_is_built_once_and_kept_in_sync(db, monkeypatch):
+    db.create_memos_bulk(1, [(f"memo {i:02d}", "内容", "未分类")
+                             for i in range(10)])
+    rows, after = db.get_memo_page(1, "title", False, limit=4)
+
+    calls = []
+    decrypt = db.decrypt_for_user
+    monkeypatch.setattr(db, "decrypt_for_user",
+                        lambda *args: calls.append(args) or decrypt(*args))
+    rows, after = db.get_memo_page(1, "title", False, after=after, limit=4)
+    assert not calls  # 翻页不再解密所有标题
+    monkeypatch.undo()
+
+    memo_ids = [row[0] for row in rows]
+    db.delete_memo(memo_ids[0])
+    db.update_memo(memo_ids[1], title="aaa")
+    db.create_memo(1, "zzz", "内容", "未分类")
+    titles = collect(db, False, 3)
+    assert titles[0] == "aaa" and titles[-1] == "zzz"
+    assert "memo 04" not in titles and len(titles) == 10
+    assert collect(db, True, 3) == titles[::-1]
@@ -0,0 +1,56 @@
+"""备忘录检索线程：发起检索的界面销毁后线程继续运行到结束"""
+import os
+import sys
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import sip  # noqa: E402
+from PyQt5.QtCore import QEventLoop  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QWidget  # noqa: E402
+
+import mainWindow.ui.components.mainpage.memo_search as memo_search  # noqa: E402
+
+
+class SlowDatabase:
+    release = threading.Event()
+
+    def search_memos(self, user_id, text):
+        self.release.wait(5)
+        return []
+
+    def decrypt_memos(self, rows):
+        return []
+
+
+class Receiver(QWidget):
+
+    def __init__(self):
+        super().__init__()
+        self.results = []
+
+    def on_results(self, request_id, text, rows):
+        self.results.append(rows)
+
+
+def test_thread_outlives_destroyed_receiver(monkeypatch):
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(memo_search, "DatabaseManager", SlowDatabase)
+
+    receiver = Receiver()
+    thread = memo_search.MemoSearchThread(1, 1, "text")
+    thread.resultsReady.connect(receiver.on_results)
+    thread.start()
+    finished = []
+    thread.finished.connect(lambda: finished.append(True))
+
+    sip.delete(receiver)
+    SlowDatabase.release.set()
+
+    loop = QEventLoop()
+    thread.finished.connect(loop.quit)
+    if not finished:
+        loop.exec_()
+    app.processEvents()
+    assert not memo_search.MemoSearchThread._running
@@ -0,0 +1,76 @@
+"""结构迁移：旧版数据库升级到最新版本，已是最新版本时不再执行迁移"""
+import pytest
+
+from Database import ConnectionPool, DatabaseManager
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def index_names(conn):
+    return {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND name NOT LIKE 'sqlite_%'")}
+
+
+def test_baseline_upgrades_to_latest(baseline_db):
+    path, conn = baseline_db
+    conn.execute("INSERT INTO users (username, password) VALUES ('u', 'x')")
+    conn.execute("INSERT INTO memos (user_id, title, content) "
+                 "VALUES (1, 't', 'c')")
+    conn.commit()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+
+    db = DatabaseManager(path)
+    latest = db._migrations()[-1][0]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == latest
+    assert "key_salt" in table_columns(conn, "users")
+    assert index_names(conn) == {
+        "idx_memos_user_created_time", "idx_memos_user_modified_time",
+        "idx_todos_user_order", "idx_todos_user_category",
+        "idx_tags_user_created"
+    }
+    # v2 删除了修改时间触发器，数据保持不变
+    assert conn.execute("SELECT name FROM sqlite_master "
+                        "WHERE type = 'trigger'").fetchall() == []
+    assert conn.execute("SELECT COUNT(*) FROM memos").fetchone()[0] == 1
+
+
+def test_new_database_matches_upgraded_schema(baseline_db, tmp_path):
+    path, conn = baseline_db
+    DatabaseManager(path)
+    fresh = DatabaseManager(str(tmp_path / "fresh.db"))
+    with fresh.pool.reader() as cursor:
+        fresh_conn = cursor.connection
+        for table in ("users", "memos", "todos", "tags"):
+            assert table_columns(fresh_conn, table) == table_columns(
+                conn, table)
+        assert index_names(fresh_conn) == index_names(conn)
+
+
+def test_migrations_run_once(baseline_db, monkeypatch):
+    path, conn = baseline_db
+    DatabaseManager(path)
+    ConnectionPool.close_all()
+
+    def fail(self, cursor):
+        raise AssertionError("已是最新版本时不应再执行迁移")
+
+    monkeypatch.setattr(DatabaseManager, "_migrate_v1", fail)
+    DatabaseManager(path)
+
+
+def test_failed_migration_rolls_back(baseline_db, monkeypatch):
+    path, conn = baseline_db
+
+    def fail(self, cursor):
+        cursor.execute("ALTER TABLE users ADD COLUMN key_salt BLOB")
+        raise RuntimeError("迁移失败")
+
+    monkeypatch.setattr(DatabaseManager, "_migrate_v2", fail)
+    with pytest.raises(RuntimeError):
+        DatabaseManager(path)
+    # v1 已提交，v2 的修改连同版本号一起回滚
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+    assert "key_salt" not in table_columns(conn, "users")
@@ -0,0 +1,61 @@
+"""密码哈希：新旧格式的解析与验证，登录时按当前参数重新计算旧哈希"""
+import base64
+import hashlib
+import os
+
+from Database import DatabaseManager
+from services import passwords
+
+
+def legacy_hash(password):
+    """旧版本写入的 "盐:哈希" 格式（PBKDF2-SHA256，10万次迭代，64字节）"""
+    salt = os.urandom(32)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt,
+                                 100000, dklen=64)
+    return (f"{base64.b64encode(salt).decode('utf-8')}:"
+            f"{base64.b64encode(digest).decode('utf-8')}")
+
+
+def test_hash_format_and_verify():
+    stored = passwords.hash_password("密码123", iterations=1000)
+    scheme, iterations, salt, digest = stored.split("$")
+    assert (scheme, iterations) == ("pbkdf2", "1000")
+    assert len(base64.b64decode(salt)) == passwords.SALT_SIZE
+    assert len(base64.b64decode(digest)) == passwords.HASH_SIZE
+
+    assert passwords.verify_password("密码123", stored)
+    assert not passwords.verify_password("密码124", stored)
+    assert passwords.verify_password("old", legacy_hash("old"))
+    for malformed in ("", "pbkdf2$x$y", "pbkdf2$abc$AA==$AA==", None):
+        assert not passwords.verify_password("old", malformed)
+
+
+def test_needs_rehash():
+    assert passwords.needs_rehash(legacy_hash("old"))
+    assert passwords.needs_rehash("garbage")
+    stored = passwords.hash_password("p", iterations=1000)
+    assert passwords.needs_rehash(stored, iterations=2000)
+    assert not passwords.needs_rehash(stored, iterations=1000)
+
+
+def test_login_rehashes_legacy_password(baseline_db):
+    path, conn = baseline_db
+    conn.execute("INSERT INTO users (username, password) VALUES ('u', ?)",
+                 (legacy_hash("secret"), ))
+    conn.commit()
+
+    db = DatabaseManager(path)
+    db.password_iterations = 1000
+    assert db.account_login("u", "wrong") is None
+    assert conn.execute("SELECT password FROM users").fetchone()[0].count(
+        ":") == 1  # 密码错误时不修改
+
+    assert db.account_login("u", "secret")["id"] == 1
+    stored = conn.execute("SELECT password FROM users").fetchone()[0]
+    assert stored.startswith("pbkdf2$1000$")
+    assert passwords.verify_password("secret", stored)
+    assert db.check_password("u", "secret")
+
+    # 已是当前参数的哈希不再重新计算
+    db.account_login("u", "secret")
+    assert conn.execute("SELECT password FROM users").fetchone()[0] == stored
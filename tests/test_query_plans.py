@@ -0,0 +1,94 @@
+"""常用查询的执行计划：按用户访问的查询都应使用索引
+
+在临时数据库上建立最新的表结构，调用 DatabaseManager 中的真实方法，
+记录它们执行的 SELECT 语句并逐条执行 EXPLAIN QUERY PLAN，
+出现全表扫描或不应出现的临时排序时测试失败。
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from Database import ConnectionPool, DatabaseManager  # noqa: E402
+
+# (名称, 调用方式, 是否允许临时排序)
+HOT_QUERIES = [
+    ("get_memos", lambda db: db.get_memos(1), False),
+    ("get_memo_count", lambda db: db.get_memo_count(1), False),
+    ("get_memo_page(modified_time)",
+     lambda db: db.get_memo_page(1, "modified_time", True,
+                                 after=("2024-01-01 00:00:00", 1)), False),
+    ("get_memo_page(created_time)",
+     lambda db: db.get_memo_page(1, "created_time", False,
+                                 after=("2024-01-01 00:00:00", 1)), False),
+    ("get_title_order", lambda db: db.get_title_order(1), False),
+    ("get_recent_memos", lambda db: db.get_recent_memos(1), False),
+    ("get_memo_versions", lambda db: db.get_memo_versions(1), False),
+    ("get_todos", lambda db: db.get_todos(1, show_completed=True), False),
+    # is_done 不是索引前缀，只对单个用户的未完成待办做部分排序
+    ("get_todos(未完成，通知轮询)", lambda db: db.get_todos(1), True),
+    ("get_todos(按分类)",
+     lambda db: db.get_todos(1, show_completed=True, category_filter="未分类"),
+     True),
+    ("get_todo_count", lambda db: db.get_todo_count(1), False),
+    ("get_todo_categories", lambda db: db.get_todo_categories(1), False),
+    ("get_user_tags", lambda db: db.get_user_tags(1), False),
+    ("get_certain_user", lambda db: db.get_certain_user("u"), False),
+]
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    db = DatabaseManager(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    with db.pool.writer() as cursor:
+        cursor.execute("INSERT INTO users (username, password) VALUES ('u', '')")
+    yield db
+    ConnectionPool.close_all()
+
+
+def capture_statements(db, call):
+    """调用方法，返回其执行的 SELECT 语句（参数已代入）
+
+    测试中只有一个线程，读连接归还后下一次读取会复用同一个连接，
+    在该连接上设置跟踪回调即可记录方法执行的语句。
+    """
+    with db.pool.reader() as cursor:
+        conn = cursor.connection
+
+    statements = []
+    conn.set_trace_callback(
+        lambda sql: statements.append(sql)
+        if sql.lstrip().upper().startswith("SELECT") else None)
+    try:
+        call(db)
+    finally:
+        conn.set_trace_callback(None)
+    return statements
+
+
+def plan_problems(db, sql, allow_sort):
+    """返回执行计划中的问题列表"""
+    with db.pool.reader() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        rows = cursor.fetchall()
+
+    problems = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            problems.append(f"全表扫描: {detail}")
+        elif "TEMP B-TREE" in detail and not allow_sort:
+            problems.append(f"临时排序: {detail}")
+    return problems
+
+
+@pytest.mark.parametrize("name, call, allow_sort", HOT_QUERIES,
+                         ids=[query[0] for query in HOT_QUERIES])
+def test_query_uses_index(db, name, call, allow_sort):
+    db.pool.title_orders.clear()  # 标题顺序已构建时不再查询数据库
+    statements = capture_statements(db, call)
+    assert statements, f"{name} 没有执行任何查询"
+    for sql in statements:
+        assert plan_problems(db, sql, allow_sort) == [], sql
@@ -0,0 +1,75 @@
+"""备忘录全文检索索引：分词、前缀匹配、AND 语义、增量更新和 BM25 排序"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.search_index import (MemoSearchIndex, tokenize,  # noqa: E402
+                                   tokenize_query)
+
+
+def test_tokenize_cjk_and_words():
+    assert tokenize("开会 Meeting_Notes") == [
+        "开", "会", "开会", "meeting", "notes"
+    ]
+    assert tokenize("项目计划") == [
+        "项", "目", "计", "划", "项目", "目计", "计划"
+    ]
+    assert tokenize("") == []
+
+
+def test_tokenize_query():
+    assert tokenize_query("项目计划 rep") == [("项目", False), ("目计", False),
+                                          ("计划", False), ("rep", True)]
+    assert tokenize_query("会") == [("会", False)]
+
+
+def build(*memos):
+    index = MemoSearchIndex()
+    for memo_id, title, content in memos:
+        index.add(memo_id, title, content, "")
+    return index
+
+
+def test_prefix_and_and_semantics():
+    index = build((1, "weekly report", "项目进度"),
+                  (2, "report draft", "旅行计划"),
+                  (3, "shopping", "项目预算"))
+    assert sorted(index.search("rep")) == [1, 2]
+    assert index.search("rep 项目") == [1]
+    assert index.search("项目 旅行") == []
+    assert index.search("xyz") == []
+    # 中文片段按双字匹配，只包含其中单字的备忘录不命中
+    assert index.search("目进") == [1]
+
+
+def test_incremental_add_and_remove():
+    index = build((1, "alpha", ""), (2, "beta", ""))
+    assert index.search("alp") == [1]
+
+    # 新词项加入后前缀匹配的词表需要更新
+    index.add(3, "alphabet", "", "")
+    assert index._vocabulary_dirty
+    assert sorted(index.search("alp")) == [1, 3]
+    assert not index._vocabulary_dirty
+
+    # 替换内容后旧词项不再命中
+    index.add(1, "gamma", "", "")
+    assert index.search("alp") == [3]
+    assert index.search("gam") == [1]
+
+    index.remove(3)
+    assert index.search("alp") == []
+    assert 3 not in index and len(index) == 2
+    assert "alphabet" not in index._postings
+
+
+def test_bm25_weights_title_over_content():
+    index = build((1, "笔记", "预算 预算"), (2, "预算", "笔记"),
+                  (3, "其他", "无关内容"))
+    assert index.search("预算") == [2, 1]
+    assert index.search("预算", limit=1) == [2]
+
+    # 词频相同时较短的文档得分更高
+    index = build((1, "", "budget"), (2, "", "budget plus many other words"))
+    assert index.search("budget") == [1, 2]
@@ -0,0 +1,66 @@
+"""待办列表模型：刷新后行与新数据一致，只在必要时整体重置"""
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from mainWindow.ui.components.todoInterface.todo_list_view import (  # noqa: E402
+    TodoListModel)
+
+
+def todo(todo_id, deadline, is_done=0, is_pinned=0):
+    return (todo_id, f"任务{todo_id}", deadline, "未分类", is_done, is_pinned)
+
+
+@pytest.fixture
+def model():
+    QApplication.instance() or QApplication([])
+    model = TodoListModel()
+    model.signals = []
+    model.modelReset.connect(lambda: model.signals.append("reset"))
+    model.rowsInserted.connect(lambda *args: model.signals.append("insert"))
+    model.rowsRemoved.connect(lambda *args: model.signals.append("remove"))
+    model.dataChanged.connect(lambda *args: model.signals.append("change"))
+    return model
+
+
+def rows(model):
+    return [model.row_key(row) for row in range(model.rowCount())]
+
+
+def apply(model, todos):
+    model.signals.clear()
+    model.set_todos(todos)
+    assert rows(model) == [key for key, _ in TodoListModel._build_rows(todos)]
+
+
+def test_insert_and_remove_are_row_level(model):
+    apply(model, [todo(1, "2024-01-01"), todo(2, "2024-01-02")])
+    apply(model, [todo(1, "2024-01-01"), todo(3, "2024-01-03"),
+                  todo(2, "2024-01-04")])
+    assert model.signals == ["insert", "change"]
+
+    apply(model, [todo(1, "2024-01-01"), todo(2, "2024-01-04")])
+    assert model.signals == ["remove"]
+
+
+def test_reorder_within_group_resets(model):
+    apply(model, [todo(1, "2024-01-01"), todo(2, "2024-01-02"),
+                  todo(3, "2024-01-03")])
+    # 修改截止日期后 3 排到最前
+    apply(model, [todo(3, "2023-12-31"), todo(1, "2024-01-01"),
+                  todo(2, "2024-01-02")])
+    assert model.signals[-1] == "reset"
+    assert [model.data(model.index(row), TodoListModel.TodoRole)[0]
+            for row in range(model.rowCount())] == [3, 1, 2]
+
+
+def test_moving_between_groups(model):
+    apply(model, [todo(1, "2024-01-01"), todo(2, "2024-01-02")])
+    apply(model, [todo(2, "2024-01-02", is_pinned=1),
+                  todo(1, "2024-01-01", is_done=1)])
+    assert "reset" not in model.signals
@@ -0,0 +1,80 @@
+"""备忘录加解密性能对比
+
+比较旧格式逐条调用 encrypt/decrypt、批量接口 encrypt_many/decrypt_many，
+以及新格式（按用户密钥的 AES-GCM）的单条耗时和存储大小。
+
+用法：python tools/bench_crypto.py [备忘录数量]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Database import DatabaseManager, ConnectionPool  # noqa: E402
+
+
+def sample_texts(count):
+    """生成长度接近真实备忘录的标题和内容"""
+    texts = []
+    for i in range(count):
+        texts.append(f"备忘录标题 {i}")
+        texts.append(f"第 {i} 条备忘录的内容，包含一些中文和 English words。" * 8)
+    return texts
+
+
+def measure(func, count, repeat=3):
+    """返回多次运行中最快一次的单条备忘录耗时（微秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        run(DatabaseManager(os.path.join(tmp, "bench.db")), count)
+        ConnectionPool.close_all()
+
+
+def run(db, count):
+    texts = sample_texts(count)
+    encrypted = db.encrypt_many(texts)
+    assert db.decrypt_many(encrypted) == texts
+    assert [db.decrypt(text) for text in encrypted] == texts
+
+    db.create_user("bench", "bench")
+    user_id = db.get_certain_user("bench")["id"]
+    sealed = db.encrypt_many_for_user(user_id, texts)
+    assert [db.decrypt_for_user(user_id, value) for value in sealed] == texts
+
+    results = [
+        ("加密 encrypt", measure(lambda: [db.encrypt(t) for t in texts], count)),
+        ("加密 encrypt_many", measure(lambda: db.encrypt_many(texts), count)),
+        ("解密 decrypt", measure(lambda: [db.decrypt(t) for t in encrypted],
+                               count)),
+        ("解密 decrypt_many", measure(lambda: db.decrypt_many(encrypted),
+                                    count)),
+        ("加密 encrypt_many_for_user",
+         measure(lambda: db.encrypt_many_for_user(user_id, texts), count)),
+        ("解密 decrypt_for_user",
+         measure(lambda: [db.decrypt_for_user(user_id, v) for v in sealed],
+                 count)),
+    ]
+
+    print(f"{count} 条备忘录（标题 + 内容），单条耗时：")
+    for name, cost in results:
+        print(f"  {name:<28} {cost:8.2f} us")
+
+    old_size = sum(len(text) for text in encrypted) / count
+    new_size = sum(len(value) for value in sealed) / count
+    print(f"单条存储大小：旧格式 {old_size:.0f} 字节，新格式 {new_size:.0f} 字节")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""人脸检测后端对比
+
+对目录中的每张图片分别运行各检测后端（与登录时相同的缩小检测流程），
+统计精确率、召回率和单帧耗时。标注文件与图片同名、扩展名为 .txt，
+每行一个人脸框 "x y w h"（原图坐标）；没有标注文件的图片视为不含人脸。
+检测框与标注框的 IoU 不低于 0.5 视为命中。
+
+用法：python tools/bench_face_detectors.py 图片目录 [后端 ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+
+from faceRecognition.detection import (  # noqa: E402
+    FACE_DETECTORS, FaceDetectionStage)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+IOU_THRESHOLD = 0.5
+
+
+def load_samples(image_dir):
+    """读取图片和标注，返回 [(文件名, 图像, 标注框列表), ...]"""
+    samples = []
+    for name in sorted(os.listdir(image_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = cv2.imread(os.path.join(image_dir, name))
+        if image is None:
+            print(f"无法读取图片 {name}，已跳过")
+            continue
+
+        boxes = []
+        label_file = os.path.join(image_dir, os.path.splitext(name)[0] + ".txt")
+        if os.path.exists(label_file):
+            with open(label_file, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        boxes.append(tuple(int(float(v)) for v in line.split()[:4]))
+        samples.append((name, image, boxes))
+    return samples
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = min(ax + aw, bx + bw) - max(ax, bx)
+    h = min(ay + ah, by + bh) - max(ay, by)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / (aw * ah + bw * bh - inter)
+
+
+def count_matches(detected, expected):
+    """贪心匹配检测框和标注框，返回命中数"""
+    remaining = list(expected)
+    hits = 0
+    for box in detected:
+        best = max(remaining, key=lambda e: iou(box, e), default=None)
+        if best is not None and iou(box, best) >= IOU_THRESHOLD:
+            remaining.remove(best)
+            hits += 1
+    return hits
+
+
+def evaluate(backend, samples):
+    """返回 (精确率, 召回率, 单帧毫秒)"""
+    stage = FaceDetectionStage(FACE_DETECTORS[backend]())
+    stage.detect(samples[0][1])  # 预热，不计入耗时
+
+    hits = detected_total = expected_total = 0
+    elapsed = 0.0
+    for _, image, expected in samples:
+        stage.reset()  # 图片之间相互独立，不使用上一帧的人脸位置
+        start = time.perf_counter()
+        detected = stage.detect(image)
+        elapsed += time.perf_counter() - start
+
+        hits += count_matches(detected, expected)
+        detected_total += len(detected)
+        expected_total += len(expected)
+
+    precision = hits / detected_total if detected_total else 1.0
+    recall = hits / expected_total if expected_total else 1.0
+    return precision, recall, elapsed / len(samples) * 1000
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+
+    samples = load_samples(sys.argv[1])
+    if not samples:
+        print("目录中没有可用的图片")
+        return 1
+
+    backends = sys.argv[2:] or list(FACE_DETECTORS)
+    print(f"{len(samples)} 张图片，"
+          f"{sum(len(boxes) for _, _, boxes in samples)} 个标注人脸")
+    print(f"  {'后端':<8} {'精确率':>8} {'召回率':>8} {'单帧耗时':>10}")
+    for backend in backends:
+        try:
+            precision, recall, cost = evaluate(backend, samples)
+        except Exception as e:
+            print(f"  {backend:<8} 无法运行: {e}")
+            continue
+        print(f"  {backend:<8} {precision:8.1%} {recall:8.1%} {cost:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())